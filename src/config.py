@@ -4,9 +4,127 @@ from typing import Optional
 
 
 class Settings(BaseSettings):
-    apify_api_key: str
+    apify_api_key: str = ""
     redis_url: Optional[str] = "redis://localhost:6379/0"
 
+    # Shared Apify client connection pool
+    apify_pool_max_connections: int = 100
+    apify_pool_max_long_polls: int = 100
+    apify_pool_timeout_secs: float = 30.0
+    apify_client_timeout_secs: int = 360
+    apify_client_max_retries: int = 8
+
+    # Pool of Apify accounts runs are spread over (see src/services/accounts.py)
+    apify_accounts: list[dict] = []
+    account_failure_threshold: int = 3
+    account_failure_window_secs: int = 300
+
+    # Single-flight coalescing of identical actor runs
+    coalescing_enabled: bool = True
+    coalesce_lock_ttl_secs: int = 30
+
+    # Result cache (TTLs per operation, see src/services/cache.py)
+    cache_enabled: bool = True
+    cache_default_ttl_secs: int = 900
+    cache_ttl_overrides: dict[str, int] = {}
+    cache_stale_while_revalidate: bool = True
+    cache_stale_grace_secs: int = 3600
+    cache_refresh_lock_ttl_secs: int = 600
+
+    # Micro-batching of concurrent single-entity lookups (opt-in)
+    batching_enabled: bool = False
+    batch_window_ms: int = 50
+    batch_max_size: int = 25
+
+    # Streaming dataset reads
+    dataset_page_size: int = 1000
+    stream_cache_max_items: int = 5000
+    dataset_tail_enabled: bool = True
+    dataset_tail_poll_secs: float = 1.0
+    dataset_tail_max_poll_secs: float = 10.0
+    job_progress_interval_secs: float = 2.0
+
+    # Webhook-driven run completion (opt-in, see src/services/webhooks.py)
+    webhook_completion_enabled: bool = False
+    webhook_base_url: Optional[str] = None
+    webhook_secret: Optional[str] = None
+    webhook_fallback_poll_secs: float = 30.0
+
+    # Sharding of large input lists into concurrent runs
+    sharding_enabled: bool = True
+    shard_size: int = 50
+    shard_size_overrides: dict[str, int] = {}
+    shard_max_concurrency: int = 8
+
+    # Reuse of recent successful runs with identical input
+    run_reuse_enabled: bool = True
+    run_reuse_max_age_secs: int = 24 * 3600
+    run_reuse_list_recent: bool = False
+    run_reuse_sync_secs: int = 300
+    run_reuse_list_limit: int = 50
+
+    # Run memory/timeout sizing from the stats of earlier runs
+    run_sizing_enabled: bool = True
+    run_sizing_min_samples: int = 5
+    run_sizing_explore_ratio: float = 0.1
+    run_memory_min_mbytes: int = 256
+    run_memory_max_mbytes: int = 8192
+    run_memory_headroom: float = 1.5
+    run_timeout_min_secs: int = 60
+    run_timeout_max_secs: int = 3600
+    run_timeout_factor: float = 3.0
+
+    # Abort runs once every client waiting on them disconnected
+    abort_on_disconnect: bool = True
+
+    # Admission of new runs under concurrency limits (0 = no limit)
+    admission_actor_max_runs: int = 0
+    admission_actor_limits: dict[str, int] = {}
+    admission_actor_max_memory_mbytes: int = 0
+    admission_account_max_runs: int = 0
+    admission_account_max_memory_mbytes: int = 0
+    admission_default_memory_mbytes: int = 1024
+    admission_queue_timeout_secs: float = 60.0
+    admission_poll_secs: float = 0.5
+    admission_run_ttl_secs: int = 3600
+
+    # Retries of transient run failures and per-actor circuit breaking
+    run_retry_max_attempts: int = 3
+    run_retry_base_delay_secs: float = 1.0
+    run_retry_max_delay_secs: float = 30.0
+    run_retry_statuses: list[str] = ["FAILED", "TIMED-OUT"]
+    run_policy_overrides: dict[str, dict] = {}
+    breaker_enabled: bool = True
+    breaker_failure_threshold: int = 5
+    breaker_window_secs: int = 60
+    breaker_cooldown_secs: int = 30
+
+    # Adaptive Apify Proxy groups (see src/services/proxy_policy.py)
+    proxy_policy_enabled: bool = True
+    proxy_groups: list[str] = ["AUTO", "RESIDENTIAL"]
+    proxy_group_overrides: dict[str, list[str]] = {}
+    proxy_min_samples: int = 10
+    proxy_min_success_rate: float = 0.8
+    proxy_max_p90_secs: float = 0.0
+    proxy_probe_ratio: float = 0.05
+
+    # Hedged runs for API requests (opt-in per operation or platform)
+    hedging_operations: list[str] = []
+    hedging_budget_percent: float = 5.0
+
+    # Cost and resource stats of finished runs
+    run_stats_retention_days: int = 30
+
+    # Budget governor (USD and compute units, per platform and per tenant)
+    budget_platform_limits: dict[str, dict[str, float]] = {}
+    budget_tenant_limits: dict[str, dict[str, float]] = {}
+    # Tenant of requests without X-Tenant-Id (the header is trusted: set it at the gateway)
+    budget_default_tenant: str = "default"
+    budget_soft_ratio: float = 0.8
+    budget_downgrade_factor: float = 0.5
+    budget_min_downgrade_ratio: float = 0.1
+    budget_estimate_days: int = 7
+
     class Config:
         env_file = ".env"
 
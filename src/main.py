@@ -1,5 +1,9 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 
 from src.routes import (
     tiktok,
@@ -10,7 +14,27 @@ from src.routes import (
     linkedin,
     pinterest,
     jobs,
+    internal,
+    admin,
 )
+from src.services.apify_client import init_apify_client, close_apify_client
+from src.services.disconnects import CancelOnDisconnectMiddleware
+from src.services.redis_client import close_redis
+from src.services.webhooks import check_webhook_settings, poll_parked_runs, webhooks_enabled
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_webhook_settings()
+    client = init_apify_client()
+    # Picks up parked jobs whose run webhook was lost
+    poller = asyncio.create_task(poll_parked_runs(client)) if webhooks_enabled() else None
+    yield
+    if poller is not None:
+        poller.cancel()
+    await close_apify_client()
+    await close_redis()
+
 
 app = FastAPI(
     title="Social Media Scraper API",
@@ -40,6 +64,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -50,6 +75,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so a disconnect cancels the whole request
+app.add_middleware(CancelOnDisconnectMiddleware)
+
 # Register all platform routers
 app.include_router(tiktok.router, prefix="/api/v1")
 app.include_router(instagram.router, prefix="/api/v1")
@@ -59,6 +87,11 @@ app.include_router(threads.router, prefix="/api/v1")
 app.include_router(linkedin.router, prefix="/api/v1")
 app.include_router(pinterest.router, prefix="/api/v1")
 app.include_router(jobs.router, prefix="/api/v1")
+app.include_router(internal.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
+
+# Prometheus metrics
+app.mount("/metrics", make_asgi_app())
 
 
 @app.get("/", tags=["Health"])
@@ -0,0 +1,80 @@
+"""
+Admin API Routes - Operational insight
+
+- /runs/stats - Cost and resource stats of actor runs per operation
+"""
+
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from src.config import get_settings
+from src.services.run_costs import run_stats
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# =============================================================================
+# SCHEMAS
+# =============================================================================
+
+class OperationRunStats(BaseModel):
+    """Totals and ratios of the runs of an operation."""
+    operation: str
+    platform: str
+    caller: Optional[str] = None
+    tenant: Optional[str] = None
+    runs: int
+    succeeded: int
+    usd: float
+    compute_units: float
+    run_secs: float
+    items: int
+    usd_per_run: Optional[float] = None
+    usd_per_item: Optional[float] = None
+    compute_units_per_item: Optional[float] = None
+    secs_per_item: Optional[float] = None
+    avg_run_secs: Optional[float] = None
+    avg_peak_mbytes: Optional[float] = None
+    avg_input_size: Optional[float] = None
+
+
+class RunStatsResponse(BaseModel):
+    """Run stats of the last ``days`` UTC days, sorted by ``sort``."""
+    days: int
+    sort: str
+    operations: list[OperationRunStats]
+
+
+# =============================================================================
+# ENDPOINTS
+# =============================================================================
+
+@router.get("/runs/stats", response_model=RunStatsResponse)
+async def get_run_stats(
+    days: int = Query(default=1, ge=1, description="UTC days to sum, today included"),
+    platform: Optional[str] = Query(default=None, description="Only this platform, e.g. instagram"),
+    by_caller: bool = Query(default=False, description="Split API requests (api) from jobs (job)"),
+    by_tenant: bool = Query(default=False, description="Split by tenant (X-Tenant-Id)"),
+    tenant: Optional[str] = Query(default=None, description="Only this tenant; implies by_tenant"),
+    sort: Literal[
+        "usd_per_item", "secs_per_item", "usd_per_run", "usd", "runs", "items"
+    ] = Query(default="usd_per_item", description="Highest first"),
+):
+    """Rank operations by what their actor runs cost (USD, compute units, time) per item and per run."""
+    days = min(days, get_settings().run_stats_retention_days)
+    stats = await run_stats(days, by_caller, by_tenant or tenant is not None)
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Run stats are kept in Redis, which is unavailable")
+
+    if platform:
+        stats = [s for s in stats if s["platform"] == platform]
+    if tenant is not None:
+        stats = [s for s in stats if s["tenant"] == tenant]
+    stats.sort(key=lambda s: (s[sort] is not None, s[sort] or 0), reverse=True)
+    return RunStatsResponse(
+        days=days,
+        sort=sort,
+        operations=[OperationRunStats(**s) for s in stats],
+    )
@@ -12,9 +12,13 @@ Each route has a single responsibility:
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.instagram import (
     InstagramResponse,
     # Profile
@@ -49,7 +53,11 @@ from src.services.platforms.instagram import (
     search_places,
 )
 
-router = APIRouter(prefix="/instagram", tags=["Instagram"])
+router = APIRouter(
+    prefix="/instagram",
+    tags=["Instagram"],
+    dependencies=[Depends(run_options)],
+)
 
 
 # =============================================================================
@@ -62,14 +70,14 @@ router = APIRouter(prefix="/instagram", tags=["Instagram"])
     summary="Get profile metadata",
     description="Get Instagram profile metadata: bio, followers, following, posts count, etc.",
 )
-def get_profile_route(
+async def get_profile_route(
     username: str,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return get_profile(client, username)
+        return stream_response(await get_profile(client, username))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -78,14 +86,14 @@ def get_profile_route(
     summary="Get multiple profiles metadata",
     description="Get metadata for multiple Instagram profiles at once.",
 )
-def scrape_profiles_route(
+async def scrape_profiles_route(
     request: InstagramProfileRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return scrape_profiles(client, request)
+        return stream_response(await scrape_profiles(client, request))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 # =============================================================================
@@ -98,15 +106,15 @@ def scrape_profiles_route(
     summary="Get user posts",
     description="Get posts from a specific Instagram user.",
 )
-def get_user_posts_route(
+async def get_user_posts_route(
     username: str,
     limit: int = Query(default=20, ge=1, le=200),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return get_user_posts(client, username, limit)
+        return stream_response(await get_user_posts(client, username, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -115,16 +123,16 @@ def get_user_posts_route(
     summary="Get posts from multiple profiles",
     description="Get posts from multiple Instagram profiles at once.",
 )
-def scrape_posts_route(
+async def scrape_posts_route(
     request: InstagramPostsRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return scrape_posts(client, request)
+        return stream_response(await scrape_posts(client, request))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 # =============================================================================
@@ -137,15 +145,15 @@ def scrape_posts_route(
     summary="Get post comments",
     description="Get comments from a specific Instagram post.",
 )
-def get_post_comments_route(
+async def get_post_comments_route(
     url: str = Query(..., description="Instagram post URL"),
     limit: int = Query(default=100, ge=1, le=1000),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return get_post_comments(client, url, limit)
+        return stream_response(await get_post_comments(client, url, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -154,14 +162,14 @@ def get_post_comments_route(
     summary="Get comments from multiple posts",
     description="Get comments from multiple Instagram posts at once.",
 )
-def scrape_comments_route(
+async def scrape_comments_route(
     request: InstagramCommentsRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return scrape_comments(client, request)
+        return stream_response(await scrape_comments(client, request))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 # =============================================================================
@@ -174,15 +182,15 @@ def scrape_comments_route(
     summary="Get hashtag posts",
     description="Get posts from a specific hashtag.",
 )
-def get_hashtag_posts_route(
+async def get_hashtag_posts_route(
     hashtag: str,
     limit: int = Query(default=20, ge=1, le=200),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return get_hashtag_posts(client, hashtag, limit)
+        return stream_response(await get_hashtag_posts(client, hashtag, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -191,14 +199,14 @@ def get_hashtag_posts_route(
     summary="Get posts from multiple hashtags",
     description="Get posts from multiple hashtags at once.",
 )
-def scrape_hashtags_route(
+async def scrape_hashtags_route(
     request: InstagramHashtagRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return scrape_hashtag(client, request)
+        return stream_response(await scrape_hashtag(client, request))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 # =============================================================================
@@ -211,15 +219,15 @@ def scrape_hashtags_route(
     summary="Get user reels",
     description="Get reels from a specific Instagram user.",
 )
-def get_user_reels_route(
+async def get_user_reels_route(
     username: str,
     limit: int = Query(default=20, ge=1, le=200),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return get_user_reels(client, username, limit)
+        return stream_response(await get_user_reels(client, username, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -228,16 +236,16 @@ def get_user_reels_route(
     summary="Get reels from multiple profiles",
     description="Get reels from multiple Instagram profiles at once.",
 )
-def scrape_reels_route(
+async def scrape_reels_route(
     request: InstagramReelsRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return scrape_reels(client, request)
+        return stream_response(await scrape_reels(client, request))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 # =============================================================================
@@ -250,14 +258,14 @@ def scrape_reels_route(
     summary="Get post details",
     description="Get detailed information about a specific Instagram post.",
 )
-def get_post_details_route(
+async def get_post_details_route(
     url: str = Query(..., description="Instagram post URL"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return get_post_details(client, url)
+        return stream_response(await get_post_details(client, url))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -266,14 +274,14 @@ def get_post_details_route(
     summary="Get details from multiple posts",
     description="Get detailed information about multiple Instagram posts at once.",
 )
-def scrape_post_details_route(
+async def scrape_post_details_route(
     request: InstagramPostDetailRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return scrape_post_details(client, request)
+        return stream_response(await scrape_post_details(client, request))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 # =============================================================================
@@ -286,15 +294,15 @@ def scrape_post_details_route(
     summary="Search users",
     description="Search for Instagram users by name/username.",
 )
-def search_users_route(
+async def search_users_route(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=10, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return search_users(client, q, limit)
+        return stream_response(await search_users(client, q, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -303,15 +311,15 @@ def search_users_route(
     summary="Search hashtags",
     description="Search for Instagram hashtags.",
 )
-def search_hashtags_route(
+async def search_hashtags_route(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=10, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return search_hashtags(client, q, limit)
+        return stream_response(await search_hashtags(client, q, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -320,15 +328,15 @@ def search_hashtags_route(
     summary="Search places",
     description="Search for Instagram places/locations.",
 )
-def search_places_route(
+async def search_places_route(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=10, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return search_places(client, q, limit)
+        return stream_response(await search_places(client, q, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.post(
@@ -337,11 +345,11 @@ def search_places_route(
     summary="Search Instagram",
     description="Search Instagram for users, hashtags, or places.",
 )
-def search_route(
+async def search_route(
     request: InstagramSearchRequest,
-    client: ApifyClient = Depends(get_apify_client),
-) -> InstagramResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     try:
-        return search(client, request)
+        return stream_response(await search(client, request))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
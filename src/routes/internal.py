@@ -0,0 +1,34 @@
+"""
+Internal API Routes - Callbacks from Apify
+
+Not part of the public API and hidden from the docs:
+- /apify/webhook - Run finished webhooks registered in webhook mode
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from apify_client import ApifyClientAsync
+
+from src.services.apify_client import get_apify_client
+from src.services.webhooks import handle_webhook, verify_token
+
+router = APIRouter(prefix="/internal", tags=["Internal"], include_in_schema=False)
+
+
+@router.post("/apify/webhook", status_code=204)
+async def apify_webhook(
+    payload: dict = Body(...),
+    token: Optional[str] = Query(default=None),
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> Response:
+    """Resume the requests and jobs parked on a finished run."""
+    if not verify_token(token):
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+
+    try:
+        await handle_webhook(client, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(status_code=204)
@@ -34,30 +34,39 @@ class JobStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
-class InstagramPostsJobRequest(BaseModel):
+class JobOptions(BaseModel):
+    """Options shared by every job request."""
+    fields: Optional[list[str]] = Field(
+        default=None,
+        description="Item fields to return, e.g. [\"id\", \"caption\"]",
+    )
+    omit: Optional[list[str]] = Field(default=None, description="Item fields to leave out")
+
+
+class InstagramPostsJobRequest(JobOptions):
     """Request to submit Instagram posts scraping job."""
     usernames: list[str] = Field(..., description="List of Instagram usernames")
     limit: int = Field(default=20, ge=1, le=200)
 
 
-class InstagramProfileJobRequest(BaseModel):
+class InstagramProfileJobRequest(JobOptions):
     """Request to submit Instagram profile scraping job."""
     usernames: list[str] = Field(..., description="List of Instagram usernames")
 
 
-class InstagramHashtagJobRequest(BaseModel):
+class InstagramHashtagJobRequest(JobOptions):
     """Request to submit Instagram hashtag scraping job."""
     hashtags: list[str] = Field(..., description="List of hashtags (without #)")
     limit: int = Field(default=20, ge=1, le=200)
 
 
-class TikTokHashtagJobRequest(BaseModel):
+class TikTokHashtagJobRequest(JobOptions):
     """Request to submit TikTok hashtag scraping job."""
     hashtag: str = Field(..., description="Hashtag to scrape")
     limit: int = Field(default=10, ge=1, le=100)
 
 
-class YouTubeSearchJobRequest(BaseModel):
+class YouTubeSearchJobRequest(JobOptions):
     """Request to submit YouTube search job."""
     query: str = Field(..., description="Search query")
     limit: int = Field(default=10, ge=1, le=50)
@@ -71,7 +80,9 @@ class YouTubeSearchJobRequest(BaseModel):
     "/{job_id}",
     response_model=JobStatusResponse,
     summary="Get job status",
-    description="Check the status of a background job and get results when ready.",
+    description="Check the status of a background job and get results when ready. "
+    "While the actor runs, status is PROGRESS and result holds the items read so far "
+    "(WAITING with the run id when the job is parked on a run webhook).",
 )
 def get_job_status(job_id: str) -> JobStatusResponse:
     """Get the status and result of a job."""
@@ -87,6 +98,9 @@ def get_job_status(job_id: str) -> JobStatusResponse:
             response.result = result.get()
         else:
             response.error = str(result.result)
+    elif result.status in ("PROGRESS", "WAITING"):
+        # Items read so far, or the run a parked job is waiting for
+        response.result = result.info
 
     return response
 
@@ -106,6 +120,8 @@ def submit_instagram_posts_job(request: InstagramPostsJobRequest) -> JobSubmitRe
     task = tasks.instagram_scrape_posts.delay(
         usernames=request.usernames,
         limit=request.limit,
+        fields=request.fields,
+        omit=request.omit,
     )
 
     return JobSubmitResponse(
@@ -125,6 +141,8 @@ def submit_instagram_profile_job(request: InstagramProfileJobRequest) -> JobSubm
     """Submit Instagram profile scraping job."""
     task = tasks.instagram_scrape_profile.delay(
         usernames=request.usernames,
+        fields=request.fields,
+        omit=request.omit,
     )
 
     return JobSubmitResponse(
@@ -145,6 +163,8 @@ def submit_instagram_hashtag_job(request: InstagramHashtagJobRequest) -> JobSubm
     task = tasks.instagram_scrape_hashtag.delay(
         hashtags=request.hashtags,
         limit=request.limit,
+        fields=request.fields,
+        omit=request.omit,
     )
 
     return JobSubmitResponse(
@@ -169,6 +189,8 @@ def submit_tiktok_hashtag_job(request: TikTokHashtagJobRequest) -> JobSubmitResp
     task = tasks.tiktok_scrape_hashtag.delay(
         hashtag=request.hashtag,
         limit=request.limit,
+        fields=request.fields,
+        omit=request.omit,
     )
 
     return JobSubmitResponse(
@@ -193,6 +215,8 @@ def submit_youtube_search_job(request: YouTubeSearchJobRequest) -> JobSubmitResp
     task = tasks.youtube_search.delay(
         query=request.query,
         limit=request.limit,
+        fields=request.fields,
+        omit=request.omit,
     )
 
     return JobSubmitResponse(
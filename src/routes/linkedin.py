@@ -1,9 +1,13 @@
 """LinkedIn API Routes"""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.linkedin import (
     LinkedInResponse,
     scrape_profile_posts,
@@ -11,7 +15,11 @@ from src.services.platforms.linkedin import (
     search_posts,
 )
 
-router = APIRouter(prefix="/linkedin", tags=["LinkedIn"])
+router = APIRouter(
+    prefix="/linkedin",
+    tags=["LinkedIn"],
+    dependencies=[Depends(run_options)],
+)
 
 
 @router.get(
@@ -24,13 +32,13 @@ async def get_profile_posts(
     limit: int = Query(default=20, ge=1, le=100),
     include_comments: bool = Query(default=False, alias="includeComments"),
     include_reactions: bool = Query(default=True, alias="includeReactions"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> LinkedInResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get posts from a LinkedIn profile."""
     try:
-        return await scrape_profile_posts(client, url, limit, include_comments, include_reactions)
+        return stream_response(await scrape_profile_posts(client, url, limit, include_comments, include_reactions))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -43,13 +51,13 @@ async def get_company_posts(
     limit: int = Query(default=20, ge=1, le=100),
     include_comments: bool = Query(default=False, alias="includeComments"),
     include_reactions: bool = Query(default=True, alias="includeReactions"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> LinkedInResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get posts from a LinkedIn company page."""
     try:
-        return await scrape_company_posts(client, url, limit, include_comments, include_reactions)
+        return stream_response(await scrape_company_posts(client, url, limit, include_comments, include_reactions))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -60,10 +68,10 @@ async def get_company_posts(
 async def search_linkedin_posts(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=20, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> LinkedInResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Search LinkedIn posts."""
     try:
-        return await search_posts(client, q, limit)
+        return stream_response(await search_posts(client, q, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
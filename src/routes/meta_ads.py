@@ -1,9 +1,13 @@
 """Meta Ads (Facebook Ads) API Routes"""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.meta_ads import (
     MetaAdsResponse,
     META_ADS_COUNTRIES,
@@ -12,7 +16,11 @@ from src.services.platforms.meta_ads import (
     scrape_political_ads,
 )
 
-router = APIRouter(prefix="/meta-ads", tags=["Meta Ads"])
+router = APIRouter(
+    prefix="/meta-ads",
+    tags=["Meta Ads"],
+    dependencies=[Depends(run_options)],
+)
 
 
 @router.get(
@@ -25,13 +33,13 @@ async def get_page_ads(
     limit: int = Query(default=50, ge=1, le=500),
     country: str = Query(default="ALL", description=f"Country code: {', '.join(META_ADS_COUNTRIES)}"),
     ad_type: str = Query(default="all", alias="adType"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> MetaAdsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get ads from a Facebook Page."""
     try:
-        return await scrape_page_ads(client, url, limit, country, ad_type)
+        return stream_response(await scrape_page_ads(client, url, limit, country, ad_type))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -44,13 +52,13 @@ async def search_meta_ads(
     limit: int = Query(default=50, ge=1, le=500),
     country: str = Query(default="ALL"),
     ad_type: str = Query(default="all", alias="adType"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> MetaAdsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Search ads in the Meta Ad Library."""
     try:
-        return await search_ads(client, q, limit, country, ad_type)
+        return stream_response(await search_ads(client, q, limit, country, ad_type))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -61,10 +69,10 @@ async def search_meta_ads(
 async def get_political_ads(
     country: str = Query(default="US"),
     limit: int = Query(default=50, ge=1, le=500),
-    client: ApifyClient = Depends(get_apify_client),
-) -> MetaAdsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get political and issue ads."""
     try:
-        return await scrape_political_ads(client, country, limit)
+        return stream_response(await scrape_political_ads(client, country, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
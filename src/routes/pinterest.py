@@ -1,9 +1,13 @@
 """Pinterest API Routes"""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.pinterest import (
     PinterestResponse,
     scrape_board,
@@ -12,7 +16,11 @@ from src.services.platforms.pinterest import (
     get_pin,
 )
 
-router = APIRouter(prefix="/pinterest", tags=["Pinterest"])
+router = APIRouter(
+    prefix="/pinterest",
+    tags=["Pinterest"],
+    dependencies=[Depends(run_options)],
+)
 
 
 @router.get(
@@ -23,13 +31,13 @@ router = APIRouter(prefix="/pinterest", tags=["Pinterest"])
 async def get_board_pins(
     url: str = Query(..., description="Pinterest board URL"),
     limit: int = Query(default=20, ge=1, le=200),
-    client: ApifyClient = Depends(get_apify_client),
-) -> PinterestResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get pins from a Pinterest board."""
     try:
-        return await scrape_board(client, url, limit)
+        return stream_response(await scrape_board(client, url, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -40,13 +48,13 @@ async def get_board_pins(
 async def get_profile_pins(
     url: str = Query(..., description="Pinterest profile URL"),
     limit: int = Query(default=20, ge=1, le=200),
-    client: ApifyClient = Depends(get_apify_client),
-) -> PinterestResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get pins from a Pinterest profile."""
     try:
-        return await scrape_profile(client, url, limit)
+        return stream_response(await scrape_profile(client, url, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -57,13 +65,13 @@ async def get_profile_pins(
 async def search_pinterest(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=20, ge=1, le=200),
-    client: ApifyClient = Depends(get_apify_client),
-) -> PinterestResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Search Pinterest pins."""
     try:
-        return await search(client, q, limit)
+        return stream_response(await search(client, q, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -73,10 +81,10 @@ async def search_pinterest(
 )
 async def get_pin_details(
     url: str = Query(..., description="Pinterest pin URL"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> PinterestResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get Pinterest pin details."""
     try:
-        return await get_pin(client, url)
+        return stream_response(await get_pin(client, url))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
@@ -1,9 +1,13 @@
 """Threads API Routes"""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.threads import (
     ThreadsResponse,
     scrape_profile,
@@ -12,7 +16,11 @@ from src.services.platforms.threads import (
     get_thread,
 )
 
-router = APIRouter(prefix="/threads", tags=["Threads"])
+router = APIRouter(
+    prefix="/threads",
+    tags=["Threads"],
+    dependencies=[Depends(run_options)],
+)
 
 
 @router.get(
@@ -23,13 +31,13 @@ router = APIRouter(prefix="/threads", tags=["Threads"])
 async def get_profile_threads(
     username: str,
     limit: int = Query(default=20, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> ThreadsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get threads from a user profile."""
     try:
-        return await scrape_profile(client, username, limit)
+        return stream_response(await scrape_profile(client, username, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -40,13 +48,13 @@ async def get_profile_threads(
 async def get_hashtag_threads(
     hashtag: str,
     limit: int = Query(default=20, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> ThreadsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get threads by hashtag."""
     try:
-        return await scrape_hashtag(client, hashtag, limit)
+        return stream_response(await scrape_hashtag(client, hashtag, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -57,13 +65,13 @@ async def get_hashtag_threads(
 async def search_threads(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=20, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> ThreadsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Search Threads."""
     try:
-        return await search(client, q, limit)
+        return stream_response(await search(client, q, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -74,10 +82,10 @@ async def search_threads(
 async def get_thread_details(
     url: str = Query(..., description="Threads post URL"),
     include_replies: bool = Query(default=False, alias="includeReplies"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> ThreadsResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get thread details by URL."""
     try:
-        return await get_thread(client, url, include_replies)
+        return stream_response(await get_thread(client, url, include_replies))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
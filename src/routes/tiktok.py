@@ -1,9 +1,13 @@
 """TikTok API Routes"""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.tiktok import (
     TikTokResponse,
     scrape_hashtag,
@@ -12,7 +16,11 @@ from src.services.platforms.tiktok import (
     get_video,
 )
 
-router = APIRouter(prefix="/tiktok", tags=["TikTok"])
+router = APIRouter(
+    prefix="/tiktok",
+    tags=["TikTok"],
+    dependencies=[Depends(run_options)],
+)
 
 
 @router.get(
@@ -23,13 +31,13 @@ router = APIRouter(prefix="/tiktok", tags=["TikTok"])
 async def get_hashtag_videos(
     hashtag: str,
     limit: int = Query(default=10, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> TikTokResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get TikTok videos by hashtag."""
     try:
-        return await scrape_hashtag(client, hashtag, limit)
+        return stream_response(await scrape_hashtag(client, hashtag, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -40,13 +48,13 @@ async def get_hashtag_videos(
 async def get_profile_videos(
     username: str,
     limit: int = Query(default=10, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> TikTokResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get TikTok profile and videos by username."""
     try:
-        return await scrape_profile(client, username, limit)
+        return stream_response(await scrape_profile(client, username, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -57,13 +65,13 @@ async def get_profile_videos(
 async def search_tiktok(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=10, ge=1, le=100),
-    client: ApifyClient = Depends(get_apify_client),
-) -> TikTokResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Search TikTok videos."""
     try:
-        return await search(client, q, limit=limit)
+        return stream_response(await search(client, q, limit=limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -73,10 +81,10 @@ async def search_tiktok(
 )
 async def get_video_details(
     url: str = Query(..., description="TikTok video URL"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> TikTokResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get TikTok video details by URL."""
     try:
-        return await get_video(client, url)
+        return stream_response(await get_video(client, url))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
@@ -1,9 +1,13 @@
 """YouTube API Routes"""
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from apify_client import ApifyClient
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from apify_client import ApifyClientAsync
 
 from src.services.apify_client import get_apify_client
+from src.services.errors import http_error
+from src.services.run_options import run_options
+from src.services.streaming import stream_response
 from src.services.platforms.youtube import (
     YouTubeResponse,
     search,
@@ -12,7 +16,11 @@ from src.services.platforms.youtube import (
     scrape_playlist,
 )
 
-router = APIRouter(prefix="/youtube", tags=["YouTube"])
+router = APIRouter(
+    prefix="/youtube",
+    tags=["YouTube"],
+    dependencies=[Depends(run_options)],
+)
 
 
 @router.get(
@@ -24,13 +32,13 @@ async def search_youtube(
     q: str = Query(..., min_length=1),
     limit: int = Query(default=50, ge=1, le=500),
     include_shorts: bool = Query(default=True, alias="includeShorts"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> YouTubeResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Search YouTube videos."""
     try:
-        return await search(client, q, limit, include_shorts)
+        return stream_response(await search(client, q, limit, include_shorts))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -43,13 +51,13 @@ async def get_channel_videos(
     limit: int = Query(default=50, ge=1, le=500),
     include_shorts: bool = Query(default=True, alias="includeShorts"),
     include_streams: bool = Query(default=True, alias="includeStreams"),
-    client: ApifyClient = Depends(get_apify_client),
-) -> YouTubeResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get videos from a YouTube channel."""
     try:
-        return await scrape_channel(client, url, limit, include_shorts, include_streams)
+        return stream_response(await scrape_channel(client, url, limit, include_shorts, include_streams))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -61,13 +69,13 @@ async def get_video_details(
     url: str = Query(..., description="YouTube video URL"),
     include_comments: bool = Query(default=False, alias="includeComments"),
     max_comments: int = Query(default=100, alias="maxComments", ge=0),
-    client: ApifyClient = Depends(get_apify_client),
-) -> YouTubeResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get YouTube video details."""
     try:
-        return await get_video(client, url, include_comments, max_comments)
+        return stream_response(await get_video(client, url, include_comments, max_comments))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @router.get(
@@ -78,10 +86,10 @@ async def get_video_details(
 async def get_playlist_videos(
     url: str = Query(..., description="YouTube playlist URL"),
     limit: int = Query(default=50, ge=1, le=500),
-    client: ApifyClient = Depends(get_apify_client),
-) -> YouTubeResponse:
+    client: ApifyClientAsync = Depends(get_apify_client),
+) -> StreamingResponse:
     """Get videos from a YouTube playlist."""
     try:
-        return await scrape_playlist(client, url, limit)
+        return stream_response(await scrape_playlist(client, url, limit))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
@@ -0,0 +1,41 @@
+"""Response schemas shared by all platforms."""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class ScrapeResponse(BaseModel):
+    """Base response schema for scraping results."""
+
+    success: bool
+    data: list[dict]
+    total_results: int = Field(alias="totalResults")
+    run_id: Optional[str] = Field(default=None, alias="runId")
+    cached: bool = Field(
+        default=False,
+        description="Whether the data was served from the result cache",
+    )
+    cache_age_seconds: Optional[int] = Field(
+        default=None,
+        alias="cacheAgeSeconds",
+        description="Age of the cached data, when served from cache",
+    )
+    stale: bool = Field(
+        default=False,
+        description="Whether the cached data is past its TTL and being refreshed",
+    )
+    partial: bool = Field(
+        default=False,
+        description="Whether items are missing: some runs of a sharded request failed, "
+        "the request deadline passed while the run was going, "
+        "or item limits were cut to fit the Apify budget",
+    )
+    job_id: Optional[str] = Field(
+        default=None,
+        alias="jobId",
+        description="Job finishing the run after the deadline passed (onDeadline=job), "
+        "see /api/v1/jobs/{jobId}",
+    )
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,323 @@
+"""Pool of Apify accounts (API tokens) that runs are spread over.
+
+One token means one account's concurrency and memory limits for all traffic.
+``APIFY_ACCOUNTS`` configures a pool instead, as a JSON list such as::
+
+    [{"name": "main", "token": "apify_api_...", "weight": 2, "max_runs": 30},
+     {"name": "extra", "token": "apify_api_...", "max_memory_mbytes": 32768}]
+
+``weight`` (default 1) scales how much load an account takes; ``max_runs``
+and ``max_memory_mbytes`` (default ``ADMISSION_ACCOUNT_*``) are its limits
+for run admission (``src.services.admission``). Without ``APIFY_ACCOUNTS``
+the pool is the single ``APIFY_API_KEY`` account.
+
+Each new run goes to the healthy account with the fewest in-flight runs per
+weight; accounts at their run limit are skipped while another one has room.
+An account whose starts failed ``ACCOUNT_FAILURE_THRESHOLD`` times within
+``ACCOUNT_FAILURE_WINDOW_SECS`` (bad token, credits used up, rate limits) is
+unhealthy until a start on it succeeds again, or the window passes.
+
+The account a run was started on is recorded for the run and its default
+storages, so the process-wide ``PooledApifyClient`` sends every later call
+for them (waiting, aborting, dataset reads) to the account that owns them.
+"""
+
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from apify_client import ApifyClientAsync
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import ACCOUNT_FAILURES, ACCOUNT_IN_FLIGHT, ACCOUNT_RUNS_STARTED
+from src.services.redis_client import get_redis
+from src.services.run_policy import is_transient
+
+logger = logging.getLogger(__name__)
+
+OWNER_PREFIX = "accounts:owner:"
+RUNS_PREFIX = "accounts:runs:"
+FAILURES_PREFIX = "accounts:failures:"
+
+DEFAULT_ACCOUNT = "default"
+
+# Apify keeps unnamed datasets for 7 days, so their owner is kept as long
+OWNER_TTL_SECS = 7 * 24 * 3600
+
+# Apify errors that point at the account (token, credits, limits) rather than the run
+ACCOUNT_ERROR_STATUSES = frozenset({401, 402, 403, 429})
+
+# A place taken for a start that never reports back is freed after this long
+START_TTL_SECS = 120
+
+# Owners looked up in this process, bounded by a full reset
+MAX_LOCAL_OWNERS = 10_000
+
+
+@dataclass(frozen=True)
+class Account:
+    """An Apify account of the pool and the client that calls it."""
+
+    name: str
+    client: Any
+    weight: float = 1.0
+    max_runs: int = 0
+    max_memory_mbytes: int = 0
+    pooled: bool = False
+    """Part of an ``APIFY_ACCOUNTS`` pool, whose runs are routed and tracked."""
+
+
+def account_configs() -> list[dict]:
+    """The configured accounts (``APIFY_ACCOUNTS``, or ``APIFY_API_KEY`` alone)."""
+    settings = get_settings()
+    if settings.apify_accounts:
+        configs = [
+            {"name": config.get("name") or f"account{i}", **config}
+            for i, config in enumerate(settings.apify_accounts, start=1)
+        ]
+    elif settings.apify_api_key:
+        configs = [{"name": DEFAULT_ACCOUNT, "token": settings.apify_api_key}]
+    else:
+        raise RuntimeError("Set APIFY_API_KEY or APIFY_ACCOUNTS")
+
+    for config in configs:
+        config.setdefault("max_runs", settings.admission_account_max_runs)
+        config.setdefault("max_memory_mbytes", settings.admission_account_max_memory_mbytes)
+    return configs
+
+
+def single_account(client: ApifyClientAsync) -> Account:
+    """The account of a client that is not a pool."""
+    settings = get_settings()
+    return Account(
+        name=DEFAULT_ACCOUNT,
+        client=client,
+        max_runs=settings.admission_account_max_runs,
+        max_memory_mbytes=settings.admission_account_max_memory_mbytes,
+    )
+
+
+class PooledApifyClient:
+    """
+    Stand-in for ``ApifyClientAsync`` over a pool of accounts.
+
+    ``run``, ``dataset`` and ``key_value_store`` return clients whose calls go
+    to the account that owns the resource; ``actor`` uses the first account.
+    New runs are started on an account from ``place_run``.
+    """
+
+    def __init__(self, accounts: list[Account]):
+        self.accounts = accounts
+        self._by_name = {account.name: account for account in accounts}
+
+    def actor(self, actor_id: str):
+        return self.accounts[0].client.actor(actor_id)
+
+    def run(self, run_id: str):
+        return _OwnedResource(self, "run", run_id)
+
+    def dataset(self, dataset_id: str):
+        return _OwnedResource(self, "dataset", dataset_id)
+
+    def key_value_store(self, store_id: str):
+        return _OwnedResource(self, "key_value_store", store_id)
+
+    def account(self, name: Optional[str]) -> Account:
+        """The account called ``name``; the first one if unknown."""
+        return self._by_name.get(name) or self.accounts[0]
+
+
+class _OwnedResource:
+    """Resource client that resolves the owning account on each call."""
+
+    def __init__(self, pool: PooledApifyClient, kind: str, resource_id: str):
+        self._pool = pool
+        self._kind = kind
+        self._resource_id = resource_id
+
+    def __getattr__(self, method: str):
+        async def call(*args, **kwargs):
+            account = self._pool.account(await owner_of(self._resource_id))
+            resource = getattr(account.client, self._kind)(self._resource_id)
+            return await getattr(resource, method)(*args, **kwargs)
+
+        return call
+
+
+def accounts_of(client) -> list[Account]:
+    """The accounts behind ``client``."""
+    if isinstance(client, PooledApifyClient):
+        return client.accounts
+    return [single_account(client)]
+
+
+@dataclass(frozen=True)
+class Placement:
+    """A new run's place on an account, counted in flight from the moment it is picked."""
+
+    account: Account
+    ticket: str
+
+    async def bind(self, run: dict, timeout_secs: Optional[int]) -> None:
+        """Record that the account owns the started run and count the run in flight."""
+        ACCOUNT_RUNS_STARTED.labels(account=self.account.name).inc()
+        if not self.account.pooled:
+            return
+        name = self.account.name
+        ids = [run.get(k) for k in ("id", "defaultDatasetId", "defaultKeyValueStoreId")]
+        ids = [i for i in ids if i]
+        for resource_id in ids:
+            _remember(resource_id, name)
+
+        redis = get_redis()
+        if redis is None:
+            runs = _local_runs.setdefault(name, set())
+            runs.discard(self.ticket)
+            runs.add(run["id"])
+            return
+        expires = time.time() + (timeout_secs or get_settings().admission_run_ttl_secs)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                for resource_id in ids:
+                    pipe.set(OWNER_PREFIX + resource_id, name, ex=OWNER_TTL_SECS)
+                pipe.zrem(RUNS_PREFIX + name, self.ticket)
+                pipe.zadd(RUNS_PREFIX + name, {run["id"]: expires})
+                pipe.delete(FAILURES_PREFIX + name)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Redis unavailable for account pool: %s", e)
+
+    async def release(self, error: Optional[BaseException] = None) -> None:
+        """Give up the place of a run that did not start; ``error`` may count against the account."""
+        if not self.account.pooled:
+            return
+        name = self.account.name
+        failed = isinstance(error, Exception) and (
+            is_transient(error) or getattr(error, "status_code", None) in ACCOUNT_ERROR_STATUSES
+        )
+        if failed:
+            ACCOUNT_FAILURES.labels(account=name).inc()
+            logger.warning("Start on Apify account %s failed: %s", name, error)
+
+        redis = get_redis()
+        if redis is None:
+            _local_runs.get(name, set()).discard(self.ticket)
+            return
+        key = FAILURES_PREFIX + name
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(RUNS_PREFIX + name, self.ticket)
+                if failed:
+                    pipe.incr(key)
+                    pipe.expire(key, get_settings().account_failure_window_secs, nx=True)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Redis unavailable for account pool: %s", e)
+
+
+async def place_run(client) -> Placement:
+    """Pick the healthy account with the lowest weighted load for a new run."""
+    accounts = accounts_of(client)
+    ticket = f"start:{uuid.uuid4().hex}"
+    if len(accounts) == 1:
+        account = accounts[0]
+    else:
+        loads = {a.name: await _in_flight(a) for a in accounts}
+        healthy = [a for a in accounts if await _healthy(a)] or accounts
+        with_room = [a for a in healthy if not a.max_runs or loads[a.name] < a.max_runs] or healthy
+
+        lowest = min(loads[a.name] / a.weight for a in with_room)
+        candidates = [a for a in with_room if loads[a.name] / a.weight == lowest]
+        account = random.choices(candidates, weights=[a.weight for a in candidates])[0]
+
+    if account.pooled:
+        await _hold(account.name, ticket, time.time() + START_TTL_SECS)
+    return Placement(account=account, ticket=ticket)
+
+
+async def account_finished(run: Optional[dict]) -> None:
+    """Stop counting a finished run in flight on its account."""
+    if not run or not run.get("id") or not get_settings().apify_accounts:
+        return
+    name = await owner_of(run["id"])
+    if name is None:
+        return
+    redis = get_redis()
+    if redis is None:
+        _local_runs.get(name, set()).discard(run["id"])
+        return
+    try:
+        await redis.zrem(RUNS_PREFIX + name, run["id"])
+    except RedisError as e:
+        logger.warning("Redis unavailable for account pool: %s", e)
+
+
+async def owner_of(resource_id: str) -> Optional[str]:
+    """Name of the account a run, dataset or key-value store was started on."""
+    if resource_id in _local_owners:
+        return _local_owners[resource_id]
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        name = await redis.get(OWNER_PREFIX + resource_id)
+    except RedisError as e:
+        logger.warning("Redis unavailable for account pool: %s", e)
+        return None
+    if name is None:
+        return None
+    _remember(resource_id, name.decode())
+    return name.decode()
+
+
+_local_owners: dict[str, str] = {}
+_local_runs: dict[str, set[str]] = {}
+
+
+def _remember(resource_id: str, name: str) -> None:
+    if len(_local_owners) >= MAX_LOCAL_OWNERS:
+        _local_owners.clear()
+    _local_owners[resource_id] = name
+
+
+async def _hold(name: str, member: str, expires: float) -> None:
+    redis = get_redis()
+    if redis is None:
+        _local_runs.setdefault(name, set()).add(member)
+        return
+    try:
+        await redis.zadd(RUNS_PREFIX + name, {member: expires})
+    except RedisError as e:
+        logger.warning("Redis unavailable for account pool: %s", e)
+
+
+async def _in_flight(account: Account) -> int:
+    redis = get_redis()
+    if redis is None:
+        count = len(_local_runs.get(account.name, ()))
+    else:
+        try:
+            key = RUNS_PREFIX + account.name
+            await redis.zremrangebyscore(key, "-inf", time.time())
+            count = await redis.zcard(key)
+        except RedisError as e:
+            logger.warning("Redis unavailable for account pool: %s", e)
+            count = 0
+    ACCOUNT_IN_FLIGHT.labels(account=account.name).set(count)
+    return count
+
+
+async def _healthy(account: Account) -> bool:
+    redis = get_redis()
+    if redis is None:
+        return True
+    try:
+        failures = int(await redis.get(FAILURES_PREFIX + account.name) or 0)
+    except RedisError as e:
+        logger.warning("Redis unavailable for account pool: %s", e)
+        return True
+    return failures < get_settings().account_failure_threshold
@@ -0,0 +1,1088 @@
+"""Shared async Apify actor runner.
+
+All platform services execute actors through this module so that actor runs
+never block the event loop: the run is awaited on ``ApifyClientAsync`` and the
+event loop keeps serving other requests while Apify does the work.
+
+Results are served from the Redis cache while fresh (``src.services.cache``);
+shortly after expiry they are served stale while one background task
+refreshes them. Identical runs (same actor and canonical input) that are in
+flight at the same time are coalesced into one (``src.services.coalescing``).
+
+Datasets are read page by page. ``execute_actor`` collects the pages into a
+list; ``stream_actor`` hands them out as they are read so large results never
+have to be held in memory at once. With the ``tail`` run option, ``stream_actor``
+only starts the run and reads the dataset while the actor is still filling it.
+
+The ``projection`` run option (``fields``/``omit``/``clean``) is sent with the
+dataset reads. Projected results are cached apart from full ones; a cached
+full result is projected locally instead of running the actor again.
+
+In webhook mode (``src.services.webhooks``) runs are started with a
+completion webhook and awaited on it instead of long-polling Apify.
+
+Before a run is started, a recent successful run with the same input is
+looked up in ``src.services.run_index`` and its dataset read instead. New runs
+get the memory and timeout chosen by ``src.services.run_sizing`` from the
+stats of earlier runs and the proxy group chosen by
+``src.services.proxy_policy``, wait for a slot under the concurrency limits
+(``src.services.admission``) on the least-loaded account of the pool
+(``src.services.accounts``), and report back once finished (``run_finished``),
+which also records their cost (``src.services.run_costs``). Runs are
+held to the USD and compute unit budgets of ``src.services.budget``. Runs
+that every waiting client gave up on are aborted (``src.services.disconnects``).
+Transient failures are retried with backoff and actors that keep failing are
+shed by a circuit breaker (``src.services.run_policy``). Slow runs of API
+requests can be hedged with a second run (``src.services.hedging``).
+
+With a request deadline (``timeout``/``X-Request-Deadline``) the run is
+awaited until the deadline only. A run still going by then yields the items
+read so far with ``partial=True`` and is stopped (its ``timeout_secs`` is the
+deadline too), or with ``onDeadline=job`` is handed to a job that finishes it.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from apify_client import ApifyClientAsync
+
+from src.config import get_settings
+from src.services.apify_client import TERMINAL_STATUSES
+from src.services.accounts import account_finished, place_run
+from src.services.budget import plan_input, reserve, settle, was_downgraded
+from src.services.cache import (
+    FRESH,
+    STALE,
+    cache_age,
+    claim_refresh,
+    freshness,
+    get_cached,
+    release_refresh,
+    set_cached,
+    ttl_for,
+)
+from src.services.coalescing import (
+    coalesce_local,
+    coalesce_remote,
+    forget_running,
+    has_followers,
+    running_run,
+    share_running,
+)
+from src.services.disconnects import abandon_run, abort_later, add_reader, release_reader
+from src.services.hedging import count_run, hedge_delay, take_hedge
+from src.services.metrics import (
+    ACTOR_RUNS_COALESCED,
+    ACTOR_RUNS_STARTED,
+    CACHE_REQUESTS,
+    HEDGES_STARTED,
+    HEDGES_WON,
+)
+from src.services.projection import Projection
+from src.services.proxy_policy import choose_proxy, record_proxy_outcome, remember_proxy
+from src.services.run_index import find_recent_run, record_run, reuse_age
+from src.services.run_keys import run_key
+from src.services.run_options import background_options, get_run_options, use_run_options
+from src.services.run_policy import (
+    RunPolicy,
+    check_circuit,
+    is_transient,
+    policy_for,
+    record_failure,
+    record_outcome,
+    remember_run,
+    retry_delay,
+)
+from src.services.admission import admit, release_run
+from src.services.run_costs import record_run_cost, record_run_items, remember_cost
+from src.services.run_sizing import choose_sizing, record_run_stats, remember_start
+from src.services.webhooks import run_webhooks, wait_for_run, webhooks_enabled
+
+logger = logging.getLogger(__name__)
+
+# Strong references to background refreshes so they are not garbage collected
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+@dataclass
+class ActorRunResult:
+    """Outcome of an actor run and the items of its default dataset."""
+
+    run_id: Optional[str]
+    dataset_id: Optional[str]
+    items: list[dict] = field(default_factory=list)
+    cached: bool = False
+    cache_age_seconds: Optional[int] = None
+    stale: bool = False
+    partial: bool = False
+
+
+@dataclass
+class ActorRunStream:
+    """Outcome of an actor run whose dataset items are read as they are consumed."""
+
+    run_id: Optional[str]
+    dataset_id: Optional[str]
+    items: AsyncIterator[dict]
+    cached: bool = False
+    cache_age_seconds: Optional[int] = None
+    stale: bool = False
+    partial: bool = False
+    job_id: Optional[str] = None
+    """Job finishing the run, when the request deadline passed before it did."""
+
+
+class DeadlineExceeded(Exception):
+    """The request deadline passed while reading a run that is still going."""
+
+
+class RunFailed(RuntimeError):
+    """A tailed run finished without succeeding, after its items were read."""
+
+    def __init__(self, run: dict):
+        super().__init__(f"Actor run {run['id']} finished with status {run.get('status')}")
+        self.run = run
+        self.status = run.get("status")
+
+
+async def execute_actor(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str] = None,
+    use_cache: bool = True,
+    projection: Optional[Projection] = None,
+) -> ActorRunResult:
+    """
+    Execute an Apify actor and read its default dataset without blocking.
+
+    ``operation`` (e.g. ``"instagram.profile"``) selects the cache TTL.
+    ``use_cache=False`` skips the request-level cache for callers that cache
+    the result themselves (``src.services.entity_cache``). ``projection``
+    defaults to the one of the current run options.
+    """
+    if projection is None:
+        projection = get_run_options().projection
+    key = run_key(actor_id, actor_input)
+    label = operation or actor_id
+    # A TTL of 0 also keeps _run_and_read from storing the result
+    ttl = ttl_for(operation) if use_cache else 0
+
+    if use_cache:
+        cached = await _from_cache(client, actor_id, actor_input, key, ttl, label, projection)
+        if cached is not None:
+            return cached
+
+    max_age = reuse_age(ttl_for(operation))
+    if get_run_options().deadline is not None:
+        # Callers with a deadline wait on the run for themselves
+        run, _ = await _run_until_deadline(
+            client, actor_id, actor_input, operation, max_age, hand_off=False
+        )
+        if run.get("status") in TERMINAL_STATUSES:
+            return await _read_run(client, run, key, ttl, projection)
+        return await _read_partial(client, run, projection)
+
+    return await coalesce_local(
+        projection.cache_key(key),
+        actor_id,
+        lambda: _run_and_read(
+            client, actor_id, actor_input, key, ttl, projection, max_age, operation
+        ),
+    )
+
+
+async def stream_actor(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str] = None,
+    use_cache: bool = True,
+) -> ActorRunStream:
+    """
+    Execute an Apify actor and stream its default dataset page by page.
+
+    The run itself is awaited (and coalesced) before this returns, so run
+    errors are raised here; the items are read while ``items`` is iterated.
+    Results of up to ``STREAM_CACHE_MAX_ITEMS`` items are cached once fully read.
+    ``use_cache=False`` skips the cache lookup for callers that did it already
+    (``src.services.executor.lookup_cache``).
+
+    With the ``tail`` run option the run is only started, and items are read
+    while it is still running. A run that ends in a retry status is started
+    again for jobs, and for streams that did not send any item yet; otherwise
+    it raises ``RunFailed`` while iterating.
+
+    With a deadline, a run still going at the deadline yields the items read
+    so far with ``partial=True`` (and ``job_id`` with ``onDeadline=job``).
+    """
+    projection = get_run_options().projection
+    key = run_key(actor_id, actor_input)
+    ttl = ttl_for(operation)
+
+    if use_cache:
+        cached = await cached_result(client, actor_id, actor_input, operation)
+        if cached is not None:
+            return as_stream(cached)
+
+    max_age = reuse_age(ttl)
+    options = get_run_options()
+    if options.tail and get_settings().dataset_tail_enabled:
+        run = await start_actor(
+            client, actor_id, actor_input, max_age, operation, _deadline_timeout()
+        )
+        stream = ActorRunStream(
+            run_id=run.get("id"),
+            dataset_id=run.get("defaultDatasetId"),
+            items=_iterate([]),
+            partial=await was_downgraded(run),
+        )
+        # Cut short by the deadline, the items are neither cached nor indexed
+        stream.items = _partial_on_deadline(stream, _tail_with_retries(
+            client, stream, run, actor_id, actor_input, operation, key, ttl, projection
+        ))
+        return stream
+
+    if options.deadline is not None:
+        run, job_id = await _run_until_deadline(client, actor_id, actor_input, operation, max_age)
+        dataset_id = run.get("defaultDatasetId")
+        items = (
+            iterate_dataset(client, dataset_id, projection=projection)
+            if dataset_id else _iterate([])
+        )
+        if run.get("status") not in TERMINAL_STATUSES:
+            return ActorRunStream(
+                run_id=run.get("id"),
+                dataset_id=dataset_id,
+                items=items,
+                partial=True,
+                job_id=job_id,
+            )
+    else:
+        # Only the run is shared between concurrent callers; each reads the dataset itself
+        run = await coalesce_local(
+            f"{key}:run",
+            actor_id,
+            lambda: coalesce_remote(
+                key,
+                actor_id,
+                lambda: _call_actor(client, actor_id, actor_input, max_age, operation),
+            ),
+        )
+        dataset_id = run.get("defaultDatasetId")
+        items = (
+            iterate_dataset(client, dataset_id, projection=projection)
+            if dataset_id else _iterate([])
+        )
+
+    return ActorRunStream(
+        run_id=run.get("id"),
+        dataset_id=run.get("defaultDatasetId"),
+        items=_cache_when_read(items, run, key, ttl, projection),
+        partial=await was_downgraded(run),
+    )
+
+
+async def cached_result(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str] = None,
+) -> Optional[ActorRunResult]:
+    """Serve a run from the cache under the current run options, if possible."""
+    return await _from_cache(
+        client,
+        actor_id,
+        actor_input,
+        run_key(actor_id, actor_input),
+        ttl_for(operation),
+        operation or actor_id,
+        get_run_options().projection,
+    )
+
+
+async def start_actor(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    max_age: int = 0,
+    operation: Optional[str] = None,
+    timeout_secs: Optional[int] = None,
+) -> dict:
+    """
+    Start an actor run without waiting for it, sharing identical runs.
+
+    An identical run that is still going is returned instead, as is a
+    succeeded run of up to ``max_age`` seconds ago, if one is indexed.
+    ``operation`` selects the run stats the run is sized from;
+    ``timeout_secs`` caps the chosen timeout.
+    """
+    key = run_key(actor_id, actor_input)
+    # Started and finished runs are coalesced apart: a follower of the
+    # finished run must not get a run that is still filling its dataset
+    return await coalesce_local(
+        f"{key}:start",
+        actor_id,
+        lambda: coalesce_remote(
+            f"{key}:start",
+            actor_id,
+            lambda: _join_or_start(
+                client, actor_id, actor_input, max_age, operation, timeout_secs
+            ),
+        ),
+    )
+
+
+async def _join_or_start(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    max_age: int = 0,
+    operation: Optional[str] = None,
+    timeout_secs: Optional[int] = None,
+) -> dict:
+    """Join the identical run that is still going, or start one and share it."""
+    key = run_key(actor_id, actor_input)
+    shared = await running_run(key)
+    if shared is not None:
+        current = await client.run(shared["id"]).get()
+        if current is not None and current.get("status") not in TERMINAL_STATUSES:
+            ACTOR_RUNS_COALESCED.labels(actor_id=actor_id, scope="running").inc()
+            return current
+        # Finished without being reported (yet): its reader takes care of it
+        await forget_running(shared)
+
+    run = await _start_with_retries(client, actor_id, actor_input, max_age, operation, timeout_secs)
+    # Runs stopped at a caller's deadline are not shared with callers that have none
+    if timeout_secs is None and run.get("status") not in TERMINAL_STATUSES:
+        await share_running(key, run)
+    return run
+
+
+async def collect_run(
+    client: ApifyClientAsync,
+    run: dict,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str] = None,
+    projection: Optional[Projection] = None,
+) -> ActorRunResult:
+    """Read and cache the dataset of a run that was awaited elsewhere."""
+    return await _read_run(
+        client,
+        run,
+        run_key(actor_id, actor_input),
+        ttl_for(operation),
+        projection or Projection(),
+    )
+
+
+def as_stream(result: ActorRunResult) -> ActorRunStream:
+    """Wrap an already collected result so it can be served like a stream."""
+    return ActorRunStream(
+        run_id=result.run_id,
+        dataset_id=result.dataset_id,
+        items=_iterate(result.items),
+        cached=result.cached,
+        cache_age_seconds=result.cache_age_seconds,
+        stale=result.stale,
+        partial=result.partial,
+    )
+
+
+async def iterate_dataset(
+    client: ApifyClientAsync,
+    dataset_id: str,
+    page_size: Optional[int] = None,
+    projection: Optional[Projection] = None,
+) -> AsyncIterator[dict]:
+    """Read a dataset one page (``DATASET_PAGE_SIZE`` items) at a time."""
+    page_size = page_size or get_settings().dataset_page_size
+    params = projection.dataset_params() if projection else {}
+    offset = 0
+
+    while True:
+        page = await client.dataset(dataset_id).list_items(offset=offset, limit=page_size, **params)
+        for item in page.items:
+            yield item
+
+        # ``total`` can lag right after a run finishes, so read until a short page
+        if len(page.items) < page_size:
+            return
+        offset += len(page.items)
+
+
+async def tail_dataset(
+    client: ApifyClientAsync,
+    run: dict,
+    page_size: Optional[int] = None,
+    projection: Optional[Projection] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[dict]:
+    """
+    Read the dataset of a run that may still be running, as items are pushed.
+
+    Between empty reads the run is polled with a growing wait, from
+    ``DATASET_TAIL_POLL_SECS`` up to ``DATASET_TAIL_MAX_POLL_SECS``. The
+    dataset is drained once more after the run finishes; a run that did not
+    succeed raises ``RunFailed`` once its items have been yielded. A run whose last reader
+    stops early is aborted. Past ``deadline`` (Unix time) reading stops with
+    ``DeadlineExceeded``.
+    """
+    settings = get_settings()
+    page_size = page_size or settings.dataset_page_size
+    dataset = client.dataset(run["defaultDatasetId"])
+    wait = settings.dataset_tail_poll_secs
+    status = run.get("status")
+    current = run
+    params = projection.dataset_params() if projection else {}
+    offset = 0
+    left = "disconnect"
+
+    await add_reader(run["id"])
+    try:
+        while True:
+            finished = status in TERMINAL_STATUSES
+            page = await dataset.list_items(offset=offset, limit=page_size, **params)
+            for item in page.items:
+                yield item
+            offset += len(page.items)
+
+            if len(page.items) == page_size:
+                wait = settings.dataset_tail_poll_secs
+                continue
+            if finished:
+                break
+            if deadline is not None and time.time() >= deadline:
+                left = "deadline"
+                raise DeadlineExceeded(f"Deadline passed while run {run['id']} was going")
+
+            # Returns as soon as the run finishes, so the last items aren't delayed
+            if deadline is not None:
+                wait = min(wait, max(1, deadline - time.time()))
+            current = await client.run(run["id"]).wait_for_finish(wait_secs=max(1, round(wait)))
+            status = (current or {}).get("status", status)
+            wait = min(wait * 2, settings.dataset_tail_max_poll_secs)
+    finally:
+        release_reader(client, run["id"], finished=status in TERMINAL_STATUSES, reason=left)
+
+    await run_finished(current)
+    if status != "SUCCEEDED":
+        raise RunFailed({**run, **(current or {}), "status": status})
+
+
+async def _from_cache(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    key: str,
+    ttl: int,
+    label: str,
+    projection: Projection,
+) -> Optional[ActorRunResult]:
+    """
+    Serve a fresh or stale cached result, scheduling a refresh of stale ones.
+
+    A full result is preferred and projected locally; otherwise a result read
+    with the same projection is used.
+    """
+    options = get_run_options()
+    if options.cache_bypass:
+        CACHE_REQUESTS.labels(operation=label, result="bypass").inc()
+        return None
+
+    candidates = [Projection()] + ([projection] if projection else [])
+    for stored in candidates:
+        entry = await get_cached(stored.cache_key(key))
+        state = freshness(entry, options.max_age, options.max_stale) if entry else None
+        if state in (FRESH, STALE):
+            break
+    else:
+        CACHE_REQUESTS.labels(operation=label, result="miss").inc()
+        return None
+
+    CACHE_REQUESTS.labels(operation=label, result="hit" if state == FRESH else "stale").inc()
+    if state == STALE:
+        await _schedule_refresh(client, actor_id, actor_input, key, ttl, stored, label)
+    return ActorRunResult(
+        run_id=entry.get("run_id"),
+        dataset_id=entry.get("dataset_id"),
+        items=entry["items"] if stored else projection.apply(entry["items"]),
+        cached=True,
+        cache_age_seconds=cache_age(entry),
+        stale=state == STALE,
+    )
+
+
+async def _schedule_refresh(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    key: str,
+    ttl: int,
+    projection: Projection,
+    operation: Optional[str] = None,
+) -> None:
+    """Start one background refresh of a stale entry, unless one is running."""
+    cache_key = projection.cache_key(key)
+    if not await claim_refresh(cache_key):
+        return
+
+    async def refresh():
+        try:
+            # Not held to the deadline (or hedging) of the request that found the entry stale
+            with use_run_options(background_options()):
+                await coalesce_local(
+                    cache_key,
+                    actor_id,
+                    lambda: _run_and_read(
+                        client, actor_id, actor_input, key, ttl, projection, reuse_age(ttl), operation
+                    ),
+                )
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", actor_id, e)
+        finally:
+            await release_refresh(cache_key)
+
+    task = asyncio.create_task(refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _run_and_read(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    key: str,
+    ttl: int,
+    projection: Projection,
+    max_age: int = 0,
+    operation: Optional[str] = None,
+) -> ActorRunResult:
+    run = await coalesce_remote(
+        key,
+        actor_id,
+        lambda: _call_actor(client, actor_id, actor_input, max_age, operation),
+    )
+    return await _read_run(client, run, key, ttl, projection)
+
+
+async def _read_run(
+    client: ApifyClientAsync,
+    run: dict,
+    key: str,
+    ttl: int,
+    projection: Projection,
+) -> ActorRunResult:
+    dataset_id = run.get("defaultDatasetId")
+    items = []
+
+    if dataset_id:
+        items = [item async for item in iterate_dataset(client, dataset_id, projection=projection)]
+
+    # Items of a failed, aborted or downgraded run are returned but neither cached nor reused
+    downgraded = await was_downgraded(run)
+    if run.get("status") == "SUCCEEDED" and not downgraded:
+        await set_cached(projection.cache_key(key), {
+            "run_id": run.get("id"),
+            "dataset_id": dataset_id,
+            "items": items,
+        }, ttl)
+        await record_run(key, run)
+    await record_run_items(run, len(items))
+
+    return ActorRunResult(
+        run_id=run.get("id"),
+        dataset_id=dataset_id,
+        items=items,
+        partial=downgraded,
+    )
+
+
+async def _cache_when_read(
+    items: AsyncIterator[dict],
+    run: dict,
+    key: str,
+    ttl: int,
+    projection: Projection,
+) -> AsyncIterator[dict]:
+    """
+    Yield dataset items, caching them at the end if the result is small enough.
+
+    The run is cached and indexed for reuse once it was read to the end, unless
+    it failed, was aborted or was started with its item limits cut by budgets.
+    """
+    limit = get_settings().stream_cache_max_items
+    buffer: Optional[list[dict]] = []
+    count = 0
+
+    async for item in items:
+        count += 1
+        if buffer is not None:
+            buffer.append(item)
+            if len(buffer) > limit:
+                buffer = None
+        yield item
+
+    # A tailed run that was read to the end has succeeded
+    status = run.get("status")
+    if (status == "SUCCEEDED" or status not in TERMINAL_STATUSES) and not await was_downgraded(run):
+        if buffer is not None:
+            await set_cached(projection.cache_key(key), {
+                "run_id": run.get("id"),
+                "dataset_id": run.get("defaultDatasetId"),
+                "items": buffer,
+            }, ttl)
+        await record_run(key, run)
+    await record_run_items(run, count)
+
+
+async def _tail_with_retries(
+    client: ApifyClientAsync,
+    stream: ActorRunStream,
+    run: dict,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    key: str,
+    ttl: int,
+    projection: Projection,
+) -> AsyncIterator[dict]:
+    """
+    Tail a run, starting it again like ``_call_actor`` when it ends in a retry status.
+
+    A retried run replaces ``stream.run_id``; jobs drop the items of the
+    failed run when it changes (``ActorExecutor.collect``). Streams that
+    already sent items cannot take them back, so they are not retried.
+    """
+    options = get_run_options()
+    policy = policy_for(operation)
+    attempt = 1
+    while True:
+        sent = 0
+        try:
+            async for item in _cache_when_read(
+                tail_dataset(client, run, projection=projection, deadline=options.deadline),
+                run,
+                key,
+                ttl,
+                projection,
+            ):
+                sent += 1
+                yield item
+            return
+        except RunFailed as e:
+            if (
+                e.status not in policy.retry_statuses
+                or (sent and options.interactive)
+                or not _may_retry(policy, attempt)
+            ):
+                raise
+            logger.warning("Retrying run of %s after run %s ended %s", actor_id, run.get("id"), e.status)
+            await retry_delay(policy, attempt, operation, e.status.lower())
+
+        # Other readers of the failed run retry on the same new run
+        run = await start_actor(
+            client, actor_id, actor_input, operation=operation, timeout_secs=_deadline_timeout()
+        )
+        stream.run_id = run.get("id")
+        stream.dataset_id = run.get("defaultDatasetId")
+        stream.partial = stream.partial or await was_downgraded(run)
+        attempt += 1
+
+
+async def _iterate(items: list[dict]) -> AsyncIterator[dict]:
+    for item in items:
+        yield item
+
+
+async def _start_actor(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    max_age: int = 0,
+    operation: Optional[str] = None,
+    timeout_secs: Optional[int] = None,
+) -> dict:
+    recent = await find_recent_run(client, actor_id, actor_input, max_age)
+    if recent is not None:
+        return recent
+
+    probe = await check_circuit(actor_id)
+    # Only runs that actually start are cut to fit the budgets, so cached and
+    # reused results of the full input are still found under its run key
+    actor_input, downgraded = await plan_input(operation, actor_input)
+    sizing = await choose_sizing(actor_id, operation, actor_input)
+    if timeout_secs is not None:
+        timeout_secs = min(timeout_secs, sizing.timeout_secs or timeout_secs)
+    timeout_secs = timeout_secs or sizing.timeout_secs
+
+    reservation = await reserve(operation, actor_input, downgraded)
+    run_input, proxy_group = await choose_proxy(actor_id, operation, actor_input)
+    placement = await place_run(client)
+    try:
+        lease = await admit(actor_id, sizing.memory_mbytes, placement.account)
+    except BaseException:
+        await placement.release()
+        await reservation.release()
+        raise
+    ACTOR_RUNS_STARTED.labels(actor_id=actor_id).inc()
+    webhooks = run_webhooks() if webhooks_enabled() else None
+    try:
+        run = await placement.account.client.actor(actor_id).start(
+            run_input=run_input,
+            memory_mbytes=sizing.memory_mbytes,
+            timeout_secs=timeout_secs,
+            webhooks=webhooks,
+        )
+    except BaseException as e:
+        if lease is not None:
+            await lease.release()
+        await placement.release(e)
+        await reservation.release()
+        raise
+
+    if lease is not None:
+        await lease.bind(run, timeout_secs)
+    await asyncio.gather(
+        placement.bind(run, timeout_secs),
+        reservation.bind(run),
+        remember_start(run, actor_id, operation, actor_input),
+        remember_proxy(run, actor_id, operation, proxy_group),
+        remember_cost(run, actor_id, operation, actor_input),
+        remember_run(run, actor_id, operation, probe),
+        count_run(),
+    )
+    return run
+
+
+async def run_finished(run: Optional[dict]) -> None:
+    """Record the stats of a finished run started by this API and free its run slot."""
+    await asyncio.gather(
+        record_run_stats(run),
+        release_run(run),
+        account_finished(run),
+        record_proxy_outcome(run),
+        record_run_cost(run),
+        settle(run),
+        record_outcome(run),
+        forget_running(run),
+    )
+
+
+async def _start_with_retries(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    max_age: int = 0,
+    operation: Optional[str] = None,
+    timeout_secs: Optional[int] = None,
+) -> dict:
+    """``_start_actor``, retrying starts that failed for a transient reason."""
+    policy = policy_for(operation)
+    attempt = 1
+    while True:
+        try:
+            return await _start_actor(
+                client, actor_id, actor_input, max_age, operation, timeout_secs
+            )
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            await record_failure(actor_id)
+            if not _may_retry(policy, attempt):
+                raise
+            logger.warning("Retrying start of %s after error: %s", actor_id, e)
+            await retry_delay(policy, attempt, operation, "error")
+        attempt += 1
+
+
+async def _call_actor(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    max_age: int = 0,
+    operation: Optional[str] = None,
+) -> dict:
+    recent = await find_recent_run(client, actor_id, actor_input, max_age)
+    if recent is not None:
+        return recent
+
+    # Transient errors and runs that ended in a retry status (FAILED,
+    # TIMED-OUT) get a new run; the last failed run is returned as is
+    policy = policy_for(operation)
+    attempt = 1
+    while True:
+        try:
+            run = await _call_once(client, actor_id, actor_input, operation)
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            await record_failure(actor_id)
+            if not _may_retry(policy, attempt):
+                raise
+            logger.warning("Retrying run of %s after error: %s", actor_id, e)
+            await retry_delay(policy, attempt, operation, "error")
+        else:
+            # The run's outcome was already reported to the breaker by run_finished
+            status = run.get("status")
+            if status == "SUCCEEDED" or status not in policy.retry_statuses:
+                return run
+            if not _may_retry(policy, attempt):
+                return run
+            logger.warning("Retrying run of %s after run %s ended %s", actor_id, run.get("id"), status)
+            await retry_delay(policy, attempt, operation, status.lower())
+        attempt += 1
+
+
+async def _call_once(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+) -> dict:
+    # Started and awaited apart (rather than ``call``) so the run can be
+    # aborted once every caller went away
+    runs = [await _start_actor(client, actor_id, actor_input, operation=operation)]
+    try:
+        run = await _wait_hedged(client, runs, actor_id, actor_input, operation)
+    except asyncio.CancelledError:
+        # Cancelled by coalesce_local after the last local caller left; other
+        # processes may still wait on the run, so see it through for them
+        if await has_followers(run_key(actor_id, actor_input)):
+            run = await _wait_hedged(client, runs, actor_id, actor_input, operation, hedge=False)
+        else:
+            for started in runs:
+                abandon_run(client, started["id"])
+            raise
+
+    await run_finished(run)
+    return run
+
+
+async def _wait_hedged(
+    client: ApifyClientAsync,
+    runs: list[dict],
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    hedge: bool = True,
+) -> dict:
+    """
+    Wait for the first of ``runs`` to succeed, hedging a slow run first.
+
+    The hedge run is started while the first run is still watched, so a
+    hedge held up by admission is dropped once the first run succeeds. A
+    hedge run is appended to ``runs``. The runs that did not win are aborted
+    if still going, or reported finished.
+    """
+    waits = {asyncio.ensure_future(_wait_for_finish(client, run)): run for run in runs}
+    delay = await hedge_delay(actor_id, operation, actor_input) if hedge and len(runs) == 1 else None
+    winner = None
+    hedging = None
+    try:
+        pending = set(waits)
+        if delay is not None:
+            done, _ = await asyncio.wait(waits, timeout=delay)
+            if not done and await take_hedge(operation):
+                hedging = asyncio.ensure_future(_start_hedge(client, actor_id, actor_input, operation))
+                pending.add(hedging)
+
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # A hedge run that started is watched (and settled) even if a run won meanwhile
+            for task in sorted(done, key=lambda task: task is not hedging):
+                if task is hedging:
+                    hedge_run = task.result()
+                    if hedge_run is not None:
+                        runs.append(hedge_run)
+                        wait = asyncio.ensure_future(_wait_for_finish(client, hedge_run))
+                        waits[wait] = hedge_run
+                        pending.add(wait)
+                elif task.exception() is None and task.result().get("status") == "SUCCEEDED":
+                    winner = task
+                    break
+        if winner is None:
+            # Nothing succeeded: the first run's outcome stands
+            return next(iter(waits)).result()
+        if waits[winner] is not runs[0]:
+            HEDGES_WON.labels(operation=operation or actor_id).inc()
+        return winner.result()
+    finally:
+        if hedging is not None and not hedging.done():
+            # Still waiting for admission (or starting): its slot and budget are given back
+            hedging.cancel()
+        if len(waits) > 1:
+            await _settle_losers(client, waits, winner)
+        for task in waits:
+            task.cancel()
+
+
+async def _start_hedge(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+) -> Optional[dict]:
+    try:
+        run = await _start_actor(client, actor_id, actor_input, operation=operation)
+    except Exception as e:
+        logger.warning("Could not start hedge run of %s: %s", actor_id, e)
+        return None
+    HEDGES_STARTED.labels(operation=operation or actor_id).inc()
+    logger.info("Hedging slow run of %s with run %s", actor_id, run["id"])
+    return run
+
+
+async def _settle_losers(
+    client: ApifyClientAsync,
+    waits: dict[asyncio.Future, dict],
+    winner: Optional[asyncio.Future],
+) -> None:
+    """Abort hedged runs that are still going and report finished ones."""
+    for task, run in waits.items():
+        if task is winner or winner is None and task is next(iter(waits)):
+            continue
+        if task.done() and not task.cancelled() and task.exception() is None:
+            await run_finished(task.result())
+        elif winner is not None:
+            abort_later(client, run["id"], reason="hedge")
+
+
+def _may_retry(policy: RunPolicy, attempt: int) -> bool:
+    """Whether another attempt is allowed and there is time left for it."""
+    left = get_run_options().time_left()
+    return attempt < policy.max_attempts and (left is None or left > policy.max_delay_secs)
+
+
+async def _wait_for_finish(client: ApifyClientAsync, run: dict) -> dict:
+    if webhooks_enabled():
+        # Parked on the run's webhook instead of long-polling Apify
+        return await wait_for_run(client, run)
+
+    finished = await client.run(run["id"]).wait_for_finish()
+    if finished is None:
+        raise RuntimeError(f"Actor run {run['id']} could not be found")
+    return finished
+
+
+# =============================================================================
+# DEADLINES
+# =============================================================================
+
+def _deadline_timeout() -> Optional[int]:
+    """Run timeout for a caller whose run is stopped at its deadline."""
+    options = get_run_options()
+    left = options.time_left()
+    if left is None or options.on_deadline != "partial":
+        return None
+    return max(1, math.ceil(left))
+
+
+async def _run_until_deadline(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    max_age: int,
+    hand_off: bool = True,
+) -> tuple[dict, Optional[str]]:
+    """
+    Start a run and wait for it until the request deadline.
+
+    Returns the latest state of the run and, if it is still going and the
+    caller asked for ``onDeadline=job`` (and ``hand_off`` allows it), the id
+    of the job that finishes it. Otherwise an unfinished run is aborted once
+    no other reader is left.
+    """
+    options = get_run_options()
+    run = await start_actor(
+        client, actor_id, actor_input, max_age, operation, _deadline_timeout()
+    )
+    if run.get("status") in TERMINAL_STATUSES:
+        return run, None
+
+    job_id = None
+    left = "disconnect"
+    await add_reader(run["id"])
+    try:
+        run = await _wait_until_deadline(client, run, options.time_left())
+        left = "deadline"
+        if run.get("status") in TERMINAL_STATUSES:
+            await run_finished(run)
+        elif hand_off and options.on_deadline == "job":
+            job_id = await continue_as_job(run, actor_id, actor_input, operation)
+    finally:
+        release_reader(client, run["id"], finished=run.get("status") in TERMINAL_STATUSES, reason=left)
+    return run, job_id
+
+
+async def _wait_until_deadline(client: ApifyClientAsync, run: dict, left: float) -> dict:
+    if left <= 0:
+        return await client.run(run["id"]).get() or run
+
+    if webhooks_enabled():
+        try:
+            return await asyncio.wait_for(wait_for_run(client, run), left)
+        except asyncio.TimeoutError:
+            return await client.run(run["id"]).get() or run
+
+    current = await client.run(run["id"]).wait_for_finish(wait_secs=max(1, math.ceil(left)))
+    return current or run
+
+
+async def _read_partial(
+    client: ApifyClientAsync,
+    run: dict,
+    projection: Projection,
+) -> ActorRunResult:
+    """Read the items a still running run has pushed so far, without caching them."""
+    dataset_id = run.get("defaultDatasetId")
+    items = []
+    if dataset_id:
+        items = [item async for item in iterate_dataset(client, dataset_id, projection=projection)]
+    return ActorRunResult(run_id=run.get("id"), dataset_id=dataset_id, items=items, partial=True)
+
+
+async def _partial_on_deadline(
+    stream: ActorRunStream,
+    items: AsyncIterator[dict],
+) -> AsyncIterator[dict]:
+    """End a tailed stream quietly at the deadline, marking it partial."""
+    try:
+        async for item in items:
+            yield item
+    except DeadlineExceeded:
+        stream.partial = True
+
+
+async def continue_as_job(
+    run: dict,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+) -> str:
+    """
+    Hand a run whose caller's deadline passed to a ``jobs.finish_run`` job.
+
+    The job counts as a reader, so the run is not aborted when the caller
+    leaves. Returns the job id.
+    """
+    from src.worker.celery_app import celery_app
+
+    projection = get_run_options().projection
+    await add_reader(run["id"])
+    job = celery_app.send_task(
+        "jobs.finish_run",
+        args=[run, actor_id, actor_input, operation],
+        kwargs={
+            "fields": list(projection.fields) or None,
+            "omit": list(projection.omit) or None,
+            "clean": projection.clean,
+        },
+    )
+    return job.id
@@ -0,0 +1,268 @@
+"""Admission of new actor runs under the Apify account's concurrency limits.
+
+Apify limits how many runs (and how much memory) an account has going at
+once; a start beyond the limit fails with HTTP 402/429. Every process that
+starts runs (API replicas, Celery workers) takes a slot from Redis semaphores
+first:
+
+- per actor: ``ADMISSION_ACTOR_MAX_RUNS`` (with ``ADMISSION_ACTOR_LIMITS``
+  overrides per actor id) and ``ADMISSION_ACTOR_MAX_MEMORY_MBYTES``;
+- per account: ``ADMISSION_ACCOUNT_MAX_RUNS`` and
+  ``ADMISSION_ACCOUNT_MAX_MEMORY_MBYTES``, or the limits of each account of
+  an ``APIFY_ACCOUNTS`` pool (``src.services.accounts``).
+
+A limit of 0 is no limit. Starts beyond the limits wait in a FIFO queue (per
+actor and per account) until a slot frees up, for up to
+``ADMISSION_QUEUE_TIMEOUT_SECS`` or the request deadline, and then fail with
+``AdmissionTimeout``.
+
+A slot is held from the start until the run is seen to finish
+(``release_run``). Slots of runs nobody saw finish expire with the run's
+timeout, so a crashed process does not leak them.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.exceptions import RedisError, WatchError
+
+from src.config import get_settings
+from src.services.accounts import Account, account_configs
+from src.services.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT_SECONDS,
+)
+from src.services.redis_client import get_redis
+from src.services.run_options import get_run_options
+
+logger = logging.getLogger(__name__)
+
+HOLDERS_PREFIX = "admission:runs:"
+QUEUE_PREFIX = "admission:queue:"
+RUN_PREFIX = "admission:run:"
+
+ACCOUNT = "account"
+
+# A slot taken for a start that never reports back is freed after this long
+START_TTL_SECS = 120
+
+
+class AdmissionTimeout(Exception):
+    """No run slot freed up in time."""
+
+    def __init__(self, actor_id: str, waited: float):
+        super().__init__(f"No run slot for {actor_id} after waiting {waited:.0f}s")
+        self.actor_id = actor_id
+        self.waited = waited
+
+
+@dataclass(frozen=True)
+class Lease:
+    """A run slot in the semaphores of an actor and of the account."""
+
+    actor_id: str
+    member: str
+    account: str = ACCOUNT
+
+    async def bind(self, run: dict, timeout_secs: Optional[int]) -> None:
+        """Hold the slot for a started run until it finishes or times out."""
+        redis = get_redis()
+        if redis is None or not run.get("id"):
+            return
+        expires = time.time() + (timeout_secs or get_settings().admission_run_ttl_secs)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(HOLDERS_PREFIX + self.actor_id, {self.member: expires}, xx=True)
+                pipe.zadd(HOLDERS_PREFIX + self.account, {self.member: expires}, xx=True)
+                pipe.set(
+                    RUN_PREFIX + run["id"],
+                    f"{self.actor_id}|{self.account}|{self.member}",
+                    exat=int(expires) + 1,
+                )
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Redis unavailable for run admission: %s", e)
+
+    async def release(self) -> None:
+        """Give the slot back."""
+        await _release(self.actor_id, self.account, self.member)
+
+
+def governed() -> bool:
+    """Whether any admission limit is configured."""
+    settings = get_settings()
+    return any((
+        settings.admission_actor_max_runs,
+        settings.admission_actor_limits,
+        settings.admission_actor_max_memory_mbytes,
+        settings.admission_account_max_runs,
+        settings.admission_account_max_memory_mbytes,
+    )) or any(
+        config["max_runs"] or config["max_memory_mbytes"]
+        for config in account_configs()
+        if settings.apify_accounts
+    )
+
+
+async def admit(
+    actor_id: str,
+    memory_mbytes: Optional[int],
+    account: Optional[Account] = None,
+) -> Optional[Lease]:
+    """
+    Wait for a run slot for ``actor_id`` on ``account``; ``None`` when admission is off.
+
+    Raises ``AdmissionTimeout`` when no slot frees up in time.
+    """
+    redis = get_redis()
+    if redis is None or not governed():
+        return None
+
+    settings = get_settings()
+    memory = memory_mbytes or settings.admission_default_memory_mbytes
+    scope = _account_scope(account)
+    ticket = uuid.uuid4().hex
+    member = f"{ticket}|{memory}"
+    queued_at = time.time()
+
+    timeout = settings.admission_queue_timeout_secs
+    left = get_run_options().time_left()
+    if left is not None:
+        timeout = min(timeout, max(0.0, left))
+
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(QUEUE_PREFIX + actor_id, {ticket: queued_at})
+            pipe.zadd(QUEUE_PREFIX + scope, {ticket: queued_at})
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Redis unavailable for run admission, starting anyway: %s", e)
+        return None
+
+    try:
+        while True:
+            try:
+                admitted = await _try_admit(actor_id, account, ticket, member, memory)
+            except RedisError as e:
+                logger.warning("Redis unavailable for run admission, starting anyway: %s", e)
+                return None
+
+            waited = time.time() - queued_at
+            if admitted:
+                ADMISSION_WAIT_SECONDS.labels(actor_id=actor_id).observe(waited)
+                return Lease(actor_id=actor_id, member=member, account=scope)
+            if waited >= timeout:
+                ADMISSION_REJECTED.labels(actor_id=actor_id).inc()
+                raise AdmissionTimeout(actor_id, waited)
+            await asyncio.sleep(min(settings.admission_poll_secs, timeout - waited))
+    finally:
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(QUEUE_PREFIX + actor_id, ticket)
+                pipe.zrem(QUEUE_PREFIX + scope, ticket)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+
+async def release_run(run: Optional[dict]) -> None:
+    """Free the slot of a run that finished; later calls are no-ops."""
+    redis = get_redis()
+    if redis is None or not run or not run.get("id"):
+        return
+    try:
+        holder = await redis.getdel(RUN_PREFIX + run["id"])
+    except RedisError as e:
+        logger.warning("Redis unavailable for run admission: %s", e)
+        return
+    if holder is not None:
+        actor_id, scope, member = holder.decode().split("|", 2)
+        await _release(actor_id, scope, member)
+
+
+def _account_scope(account: Optional[Account]) -> str:
+    """Semaphore scope of an account; the single account keeps the plain one."""
+    if account is None or not account.pooled:
+        return ACCOUNT
+    return f"{ACCOUNT}:{account.name}"
+
+
+async def _try_admit(
+    actor_id: str,
+    account: Optional[Account],
+    ticket: str,
+    member: str,
+    memory: int,
+) -> bool:
+    """Take a slot if the limits allow it and no earlier start is queued for it."""
+    settings = get_settings()
+    redis = get_redis()
+    limits = {
+        actor_id: (
+            settings.admission_actor_limits.get(actor_id, settings.admission_actor_max_runs),
+            settings.admission_actor_max_memory_mbytes,
+        ),
+        _account_scope(account): (
+            account.max_runs if account else settings.admission_account_max_runs,
+            account.max_memory_mbytes if account else settings.admission_account_max_memory_mbytes,
+        ),
+    }
+    keys = [k for scope in limits for k in (HOLDERS_PREFIX + scope, QUEUE_PREFIX + scope)]
+    now = time.time()
+
+    async with redis.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(*keys)
+                allowed = True
+                for scope, (max_runs, max_memory) in limits.items():
+                    holders = [
+                        h.decode() for h in await pipe.zrangebyscore(HOLDERS_PREFIX + scope, now, "+inf")
+                    ]
+                    rank = await pipe.zrank(QUEUE_PREFIX + scope, ticket)
+                    ADMISSION_QUEUE_DEPTH.labels(scope=scope).set(
+                        await pipe.zcard(QUEUE_PREFIX + scope)
+                    )
+                    ADMISSION_IN_FLIGHT.labels(scope=scope).set(len(holders))
+
+                    used = sum(int(h.rsplit("|", 1)[1]) for h in holders)
+                    # Earlier starts in the queue go first, as far as there are slots
+                    if max_runs and len(holders) + (rank or 0) >= max_runs:
+                        allowed = False
+                    if max_memory and used + memory > max_memory and holders:
+                        allowed = False
+                    if max_memory and rank:
+                        allowed = False
+
+                if not allowed:
+                    await pipe.reset()
+                    return False
+
+                pipe.multi()
+                for scope in limits:
+                    pipe.zremrangebyscore(HOLDERS_PREFIX + scope, "-inf", now)
+                    pipe.zadd(HOLDERS_PREFIX + scope, {member: now + START_TTL_SECS})
+                    pipe.zrem(QUEUE_PREFIX + scope, ticket)
+                await pipe.execute()
+                return True
+            except WatchError:
+                continue
+
+
+async def _release(actor_id: str, scope: str, member: str) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(HOLDERS_PREFIX + actor_id, member)
+            pipe.zrem(HOLDERS_PREFIX + scope, member)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not free run slot of %s: %s", actor_id, e)
@@ -1,8 +1,173 @@
-from apify_client import ApifyClient
+"""Process-wide Apify client.
+
+A single ``ApifyClientAsync`` is created per process (FastAPI lifespan or
+Celery worker init) and shared by every request, so HTTP sessions and
+keep-alive connections are reused instead of rebuilt for each call.
+
+The client's HTTP transport keeps its own connection pool but has no size
+setting, so every request to the Apify API goes through a bounded pool here,
+which caps the connections the transport opens. Long-polls
+(``waitForFinish``) take slots of their own: each in-flight run holds one for
+up to a minute and would otherwise starve every other call. Pool usage is
+exported as metrics, per account and kind of request.
+
+With ``APIFY_ACCOUNTS`` the shared client is a ``PooledApifyClient`` over one
+client, with its own pool, per account (``src.services.accounts``).
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from apify_client import ApifyClientAsync
+
 from src.config import get_settings
+from src.services.accounts import DEFAULT_ACCOUNT, Account, PooledApifyClient, account_configs
+from src.services.metrics import (
+    APIFY_API_REQUESTS,
+    APIFY_CLIENTS_CREATED,
+    APIFY_POOL_IN_USE,
+    APIFY_POOL_SIZE,
+    APIFY_POOL_WAIT_SECONDS,
+    APIFY_POOL_WAITS,
+)
+
+# Run statuses after which an actor run does not change anymore
+TERMINAL_STATUSES = frozenset({"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"})
+
+REQUEST = "request"
+LONG_POLL = "long_poll"
+
+
+class ConnectionPool:
+    """Bound the number of concurrent Apify API requests of an account and track usage."""
+
+    def __init__(
+        self,
+        account: str,
+        max_connections: int,
+        max_long_polls: int,
+        timeout_secs: float,
+    ):
+        self.account = account
+        self.max_connections = max_connections
+        self.max_long_polls = max_long_polls
+        self.timeout_secs = timeout_secs
+        self._semaphores = {
+            REQUEST: asyncio.Semaphore(max_connections),
+            LONG_POLL: asyncio.Semaphore(max_long_polls),
+        }
+        APIFY_POOL_SIZE.labels(account=account, kind=REQUEST).set(max_connections)
+        APIFY_POOL_SIZE.labels(account=account, kind=LONG_POLL).set(max_long_polls)
+
+    async def acquire(self, kind: str = REQUEST) -> None:
+        """
+        Take a slot of ``kind``. Requests give up after ``timeout_secs``;
+        long-polls wait as long as it takes, as waiting is what they are for.
+        """
+        semaphore = self._semaphores[kind]
+        if semaphore.locked():
+            APIFY_POOL_WAITS.labels(account=self.account, kind=kind).inc()
+            started = time.monotonic()
+            timeout = self.timeout_secs if kind == REQUEST else None
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+            APIFY_POOL_WAIT_SECONDS.labels(account=self.account, kind=kind).observe(
+                time.monotonic() - started
+            )
+        else:
+            await semaphore.acquire()
+        APIFY_POOL_IN_USE.labels(account=self.account, kind=kind).inc()
+
+    def release(self, kind: str = REQUEST) -> None:
+        APIFY_POOL_IN_USE.labels(account=self.account, kind=kind).dec()
+        self._semaphores[kind].release()
+
+    def wrap(self, call):
+        """Wrap an HTTP client ``call`` coroutine so it runs inside the pool."""
+
+        async def pooled_call(*args, **kwargs):
+            APIFY_API_REQUESTS.labels(account=self.account, method=kwargs.get("method", "GET")).inc()
+            kind = LONG_POLL if _is_long_poll(kwargs.get("params")) else REQUEST
+            await self.acquire(kind)
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                self.release(kind)
 
+        return pooled_call
 
-def get_apify_client() -> ApifyClient:
-    """Get configured Apify client instance."""
+
+def _is_long_poll(params: Optional[dict]) -> bool:
+    """Whether a request waits server-side for a run to finish."""
+    return bool(params and params.get("waitForFinish"))
+
+
+_client: Optional[ApifyClientAsync] = None
+
+
+def create_apify_client(token: Optional[str] = None, account: str = DEFAULT_ACCOUNT) -> ApifyClientAsync:
+    """Build an Apify client whose API requests share the bounded pool of ``account``."""
     settings = get_settings()
-    return ApifyClient(settings.apify_api_key)
+    client = ApifyClientAsync(
+        token or settings.apify_api_key,
+        max_retries=settings.apify_client_max_retries,
+        timeout_secs=settings.apify_client_timeout_secs,
+    )
+    pool = ConnectionPool(
+        account,
+        settings.apify_pool_max_connections,
+        settings.apify_pool_max_long_polls,
+        settings.apify_pool_timeout_secs,
+    )
+    client.http_client.call = pool.wrap(client.http_client.call)
+    APIFY_CLIENTS_CREATED.inc()
+    return client
+
+
+def init_apify_client() -> ApifyClientAsync:
+    """Create the process-wide client. Called on API startup and worker init."""
+    global _client
+    if _client is None:
+        configs = account_configs()
+        if get_settings().apify_accounts:
+            _client = _create_pool(configs)
+        else:
+            _client = create_apify_client(configs[0]["token"])
+    return _client
+
+
+async def close_apify_client() -> None:
+    """Close the connections of the process-wide client and drop it."""
+    global _client
+    client, _client = _client, None
+    if isinstance(client, PooledApifyClient):
+        for account in client.accounts:
+            await _close(account.client)
+    elif client is not None:
+        await _close(client)
+
+
+async def _close(client: ApifyClientAsync) -> None:
+    # The transport clients have no close method of their own, only context managers
+    http = client.http_client
+    await http.impit_async_client.__aexit__(None, None, None)
+    http.impit_client.__exit__(None, None, None)
+
+
+def get_apify_client() -> ApifyClientAsync:
+    """Get the shared async Apify client instance."""
+    return _client or init_apify_client()
+
+
+def _create_pool(configs: list[dict]) -> PooledApifyClient:
+    return PooledApifyClient([
+        Account(
+            name=config["name"],
+            client=create_apify_client(config["token"], config["name"]),
+            weight=float(config.get("weight", 1)),
+            max_runs=config["max_runs"],
+            max_memory_mbytes=config["max_memory_mbytes"],
+            pooled=True,
+        )
+        for config in configs
+    ])
@@ -0,0 +1,115 @@
+"""Micro-batching of concurrent entity lookups into shared actor runs.
+
+Most actors accept a list of entities (usernames, URLs) and spend most of a
+run starting up, so scraping ten profiles in one run is far cheaper than ten
+runs of one profile. When ``BATCHING_ENABLED`` is set, lookups for the same
+actor and input shape that arrive within ``BATCH_WINDOW_MS`` of each other are
+collected, up to ``BATCH_MAX_SIZE`` entities, and fetched with a single call.
+
+Batches are per process; requests in different API replicas or Celery workers
+are not batched together. A batch runs for all of its requests, so it runs
+under default run options rather than the ones of the request that opened
+it; the tenant is kept when every request has the same one.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from src.config import get_settings
+from src.services.metrics import BATCH_REQUESTS, BATCH_SIZE
+from src.services.run_options import RunOptions, get_run_options, use_run_options
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Batch(Generic[T]):
+    label: str
+    fetch: Callable[[list[str]], Awaitable[T]]
+    done: asyncio.Future
+    entities: dict[str, None] = field(default_factory=dict)
+    requests: int = 0
+    tenants: set[Optional[str]] = field(default_factory=set)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+_pending: dict[str, _Batch] = {}
+# Strong references to running batches so they are not garbage collected
+_running: set[asyncio.Task] = set()
+
+
+async def batch_call(
+    key: str,
+    entities: list[str],
+    fetch: Callable[[list[str]], Awaitable[T]],
+    label: str,
+) -> tuple[T, bool]:
+    """
+    Fetch ``entities`` together with the other lookups under ``key``.
+
+    ``fetch`` is called once per batch with all of its entities; the result is
+    returned to every caller along with whether the batch was shared with
+    other requests.
+    """
+    settings = get_settings()
+    max_size = settings.batch_max_size
+
+    if len(entities) >= max_size:
+        return await fetch(entities), False
+
+    batch = _pending.get(key)
+    new = [e for e in entities if batch is None or e not in batch.entities]
+    if batch is not None and len(batch.entities) + len(new) > max_size:
+        _flush(key, batch)
+        batch = None
+
+    if batch is None:
+        loop = asyncio.get_running_loop()
+        batch = _Batch(label=label, fetch=fetch, done=loop.create_future())
+        batch.timer = loop.call_later(settings.batch_window_ms / 1000, _flush, key, batch)
+        _pending[key] = batch
+
+    batch.entities.update(dict.fromkeys(entities))
+    batch.requests += 1
+    batch.tenants.add(get_run_options().tenant)
+    if len(batch.entities) >= max_size:
+        _flush(key, batch)
+
+    # Shielded so a caller that goes away does not cancel the others' run
+    result = await asyncio.shield(batch.done)
+    return result, batch.requests > 1
+
+
+def _flush(key: str, batch: _Batch) -> None:
+    """Close ``batch`` to new lookups and start its run."""
+    if _pending.get(key) is batch:
+        del _pending[key]
+    if batch.timer is not None:
+        batch.timer.cancel()
+
+    task = asyncio.ensure_future(_run(batch))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+
+async def _run(batch: _Batch) -> None:
+    entities = list(batch.entities)
+    BATCH_SIZE.labels(operation=batch.label).observe(len(entities))
+    BATCH_REQUESTS.labels(operation=batch.label).observe(batch.requests)
+    logger.debug("Running batch of %d %s entities for %d requests",
+                 len(entities), batch.label, batch.requests)
+
+    # Not held to the deadline, hedging or budget of whichever request opened the batch
+    tenant = next(iter(batch.tenants)) if len(batch.tenants) == 1 else None
+    try:
+        with use_run_options(RunOptions(tenant=tenant)):
+            result = await batch.fetch(entities)
+        batch.done.set_result(result)
+    except Exception as e:
+        batch.done.set_exception(e)
+        # Retrieve the exception so it is not logged when every caller left
+        batch.done.exception()
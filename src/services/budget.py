@@ -0,0 +1,318 @@
+"""Budget governor for the USD and compute units actor runs spend.
+
+Budgets are set per platform with ``BUDGET_PLATFORM_LIMITS`` and per tenant
+(``X-Tenant-Id`` header) with ``BUDGET_TENANT_LIMITS``, as JSON objects of
+limits per platform or tenant, ``*`` being the default of each::
+
+    {"youtube": {"daily_usd": 20, "hourly_usd": 5, "daily_cu": 60}}
+
+Limits are ``hourly_usd``, ``daily_usd``, ``hourly_cu`` and ``daily_cu``,
+over UTC hours and days, counted in Redis across processes.
+
+Each run's cost is estimated before it starts, from the USD and compute
+units per unit of input size of the operation's earlier runs
+(``src.services.run_costs.unit_costs``). The estimate is reserved on every
+budget the run counts against and settled with the actual cost once the run
+finishes. As budgets get tight, calls degrade step by step:
+
+1. Downgrade: past ``BUDGET_SOFT_RATIO`` of a budget, or when the estimate
+   does not fit what is left, a new run is started with the input's item
+   limits cut (by ``BUDGET_DOWNGRADE_FACTOR``, or to what fits, but not below
+   ``BUDGET_MIN_DOWNGRADE_RATIO``) and the answer has ``partial=true``.
+   Cached results and reused runs of the full input are served as usual;
+   results of cut runs are neither cached nor reused.
+2. Throttle: once a budget is used up, new runs are refused with
+   ``BudgetExceeded`` (HTTP 429) until its hour or day is over.
+3. Stored data only: refused calls are answered from the result cache,
+   stale entries included, or from a recent run with the same input
+   (``src.services.run_index``), if there is one.
+
+Tenant budgets trust the ``X-Tenant-Id`` header, so it must be set (and
+overwritten) by a gateway in front of the API. Requests without it count
+against ``BUDGET_DEFAULT_TENANT``.
+
+Without Redis there are no shared counters, and nothing is governed.
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import BUDGET_DECISIONS, BUDGET_REMAINING
+from src.services.redis_client import get_redis
+from src.services.run_costs import platform_of, unit_costs
+from src.services.run_options import get_run_options
+from src.services.run_sizing import LIMIT_FIELDS, input_size
+
+logger = logging.getLogger(__name__)
+
+SPENT_PREFIX = "budget:spent:"
+RUN_PREFIX = "budget:run:"
+DOWNGRADED_PREFIX = "budget:downgraded:"
+
+WINDOWS = {"hourly": 3600, "daily": 86400}
+METRICS = ("usd", "cu")
+
+# A started run that never reports back is forgotten after this long
+RUN_TTL_SECS = 24 * 3600
+
+
+class BudgetExceeded(Exception):
+    """A budget is used up; new runs are refused until its window is over."""
+
+    def __init__(self, scope: str, limit: str, retry_after: int):
+        super().__init__(f"Budget {limit} of {scope} used up, retry in {retry_after}s")
+        self.scope = scope
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class Limit:
+    """One budget: ``value`` USD or compute units per hour or day of a scope."""
+
+    scope: str
+    window: str
+    metric: str
+    value: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.window}_{self.metric}"
+
+    def key(self, now: float) -> str:
+        return f"{SPENT_PREFIX}{self.scope}:{self.window}:{int(now // WINDOWS[self.window])}"
+
+    def retry_after(self, now: float) -> int:
+        seconds = WINDOWS[self.window]
+        return int(seconds - now % seconds) + 1
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """The estimated cost of a new run, held on its budgets until it finishes."""
+
+    keys: tuple[str, ...] = ()
+    cost: dict[str, float] = field(default_factory=dict)
+    downgraded: bool = False
+    """The run is started with its item limits cut."""
+
+    async def bind(self, run: dict) -> None:
+        """Keep the reservation with the started run, for settling once it finishes."""
+        redis = get_redis()
+        if not self.keys or redis is None or not run.get("id"):
+            return
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.set(
+                    RUN_PREFIX + run["id"],
+                    json.dumps({"keys": self.keys, "cost": self.cost}),
+                    ex=RUN_TTL_SECS,
+                )
+                if self.downgraded:
+                    pipe.set(DOWNGRADED_PREFIX + run["id"], 1, ex=RUN_TTL_SECS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Redis unavailable for budgets: %s", e)
+
+    async def release(self) -> None:
+        """Give back the reservation of a run that did not start."""
+        await _add(self.keys, {metric: -value for metric, value in self.cost.items()})
+
+
+def limits_for(operation: Optional[str]) -> list[Limit]:
+    """The budgets runs of ``operation`` in the current request count against."""
+    settings = get_settings()
+    scopes = []
+    platform = platform_of(operation)
+    platform_limits = settings.budget_platform_limits
+    if platform in platform_limits or "*" in platform_limits:
+        scopes.append((f"platform:{platform}", platform_limits.get(platform, platform_limits.get("*"))))
+    tenant = get_run_options().tenant or settings.budget_default_tenant
+    tenant_limits = settings.budget_tenant_limits
+    if tenant in tenant_limits or "*" in tenant_limits:
+        scopes.append((f"tenant:{tenant}", tenant_limits.get(tenant, tenant_limits.get("*"))))
+
+    return [
+        Limit(scope, window, metric, float(values[f"{window}_{metric}"]))
+        for scope, values in scopes
+        for window in WINDOWS
+        for metric in METRICS
+        if values.get(f"{window}_{metric}")
+    ]
+
+
+async def estimate(operation: Optional[str], actor_input: dict) -> dict[str, float]:
+    """Estimated USD and compute units of a run; zero without history."""
+    costs = await unit_costs(operation) if operation else None
+    if costs is None:
+        return dict.fromkeys(METRICS, 0.0)
+    size = input_size(actor_input)
+    return {"usd": costs[0] * size, "cu": costs[1] * size}
+
+
+async def plan_input(operation: Optional[str], actor_input: dict) -> tuple[dict, bool]:
+    """
+    The input to start a new run with under the current budgets, and whether
+    its item limits were cut.
+    """
+    limits = limits_for(operation)
+    redis = get_redis()
+    if not limits or redis is None:
+        return actor_input, False
+
+    cost = await estimate(operation, actor_input)
+    try:
+        spent = await _spent(limits, time.time())
+    except RedisError as e:
+        logger.warning("Redis unavailable for budgets: %s", e)
+        return actor_input, False
+
+    settings = get_settings()
+    factor = 1.0
+    for limit, used in zip(limits, spent):
+        left = limit.value - used
+        if left <= 0:
+            # Used up: the run is refused when it is about to start
+            return actor_input, False
+        if cost[limit.metric] > left:
+            factor = min(factor, left / cost[limit.metric])
+        if used >= limit.value * settings.budget_soft_ratio:
+            factor = min(factor, settings.budget_downgrade_factor)
+
+    factor = max(factor, settings.budget_min_downgrade_ratio)
+    downgraded = _scale_limits(actor_input, factor)
+    if downgraded == actor_input:
+        return actor_input, False
+    BUDGET_DECISIONS.labels(platform=platform_of(operation), decision="downgraded").inc()
+    logger.info("Item limits of %s cut to %.0f%% by budgets", operation, factor * 100)
+    return downgraded, True
+
+
+async def reserve(operation: Optional[str], actor_input: dict, downgraded: bool = False) -> Reservation:
+    """
+    Hold the estimated cost of a new run on its budgets; raise
+    ``BudgetExceeded`` if one is used up. ``downgraded`` marks a run started
+    with the item limits ``plan_input`` cut.
+    """
+    limits = limits_for(operation)
+    redis = get_redis()
+    if not limits or redis is None:
+        return Reservation()
+
+    now = time.time()
+    cost = await estimate(operation, actor_input)
+    keys = tuple(dict.fromkeys(limit.key(now) for limit in limits))
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                for metric in METRICS:
+                    pipe.hincrbyfloat(key, metric, cost[metric])
+                pipe.expire(key, WINDOWS["daily"] * 2)
+            results = iter(await pipe.execute())
+    except RedisError as e:
+        logger.warning("Redis unavailable for budgets: %s", e)
+        return Reservation()
+
+    spent = {}
+    for key in keys:
+        for metric in METRICS:
+            spent[key, metric] = float(next(results))
+        next(results)
+
+    reservation = Reservation(keys=keys, cost=cost, downgraded=downgraded)
+    platform = platform_of(operation)
+    for limit in limits:
+        used = spent[limit.key(now), limit.metric]
+        _report(limit, used)
+        # A run that starts within the budget may end past it; the next one waits
+        if used - cost[limit.metric] >= limit.value:
+            await reservation.release()
+            BUDGET_DECISIONS.labels(platform=platform, decision="throttled").inc()
+            raise BudgetExceeded(limit.scope, limit.name, limit.retry_after(now))
+
+    BUDGET_DECISIONS.labels(platform=platform, decision="run").inc()
+    return reservation
+
+
+async def settle(run: Optional[dict]) -> None:
+    """Replace the reserved estimate of a finished run with its actual cost; later calls are no-ops."""
+    redis = get_redis()
+    if redis is None or not run or not run.get("id"):
+        return
+    try:
+        reserved = await redis.getdel(RUN_PREFIX + run["id"])
+    except RedisError as e:
+        logger.warning("Redis unavailable for budgets: %s", e)
+        return
+    if reserved is None:
+        return
+
+    reserved = json.loads(reserved)
+    actual = {
+        "usd": run.get("usageTotalUsd") or 0,
+        "cu": (run.get("stats") or {}).get("computeUnits") or 0,
+    }
+    await _add(reserved["keys"], {
+        metric: actual[metric] - reserved["cost"].get(metric, 0) for metric in METRICS
+    })
+
+
+async def was_downgraded(run: Optional[dict]) -> bool:
+    """Whether a run was started with its item limits cut by budgets."""
+    redis = get_redis()
+    if redis is None or not run or not run.get("id"):
+        return False
+    try:
+        return bool(await redis.exists(DOWNGRADED_PREFIX + run["id"]))
+    except RedisError as e:
+        logger.warning("Redis unavailable for budgets: %s", e)
+        return False
+
+
+def fallback_options():
+    """Run options to answer a refused call from stored data: any cached entry, even stale."""
+    return replace(get_run_options(), cache_bypass=False, max_age=None, max_stale=None)
+
+
+def _scale_limits(actor_input: dict, factor: float) -> dict:
+    if factor >= 1:
+        return actor_input
+    return {
+        name: max(1, int(value * factor))
+        if name in LIMIT_FIELDS and isinstance(value, int) and value > 0 else value
+        for name, value in actor_input.items()
+    }
+
+
+async def _spent(limits: list[Limit], now: float) -> list[float]:
+    redis = get_redis()
+    spent = []
+    for limit in limits:
+        value = await redis.hget(limit.key(now), limit.metric)
+        spent.append(float(value or 0))
+        _report(limit, spent[-1])
+    return spent
+
+
+async def _add(keys, values: dict[str, float]) -> None:
+    redis = get_redis()
+    if redis is None or not keys:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                for metric, value in values.items():
+                    pipe.hincrbyfloat(key, metric, value)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not update budgets: %s", e)
+
+
+def _report(limit: Limit, spent: float) -> None:
+    BUDGET_REMAINING.labels(scope=limit.scope, limit=limit.name).set(max(0.0, limit.value - spent))
@@ -0,0 +1,174 @@
+"""Redis-backed cache of actor results.
+
+Results are keyed on the canonical run key (actor ID + normalized input), so
+any request or job that would start the same run is answered from the cache
+until the entry expires. TTLs are set per operation, e.g. profiles live much
+longer than searches.
+
+Entries are kept for a grace window after they expire. Within that window a
+stale entry can still be served while a single background refresh runs
+(stale-while-revalidate); callers tune this with ``max_age``/``max_stale``.
+"""
+
+import json
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "cache:run:"
+REFRESH_PREFIX = "cache:refreshing:"
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+# Default TTLs (seconds) by operation. Override per operation or per
+# "platform.operation" with the CACHE_TTL_OVERRIDES setting.
+DEFAULT_CACHE_TTLS: dict[str, int] = {
+    "profile": 6 * 3600,
+    "pin": 6 * 3600,
+    "company": 3600,
+    "posts": 3600,
+    "reels": 3600,
+    "post_details": 3600,
+    "video": 3600,
+    "channel": 3600,
+    "playlist": 3600,
+    "board": 3600,
+    "page_ads": 3600,
+    "political": 3600,
+    "hashtag": 1800,
+    "comments": 1800,
+    "thread": 1800,
+    "search": 300,
+}
+
+
+def ttl_for(operation: Optional[str]) -> int:
+    """
+    Get the cache TTL for an operation such as ``"instagram.profile"``.
+
+    Lookup order: ``platform.operation`` override, ``operation`` override,
+    built-in default for the operation, ``CACHE_DEFAULT_TTL_SECS``.
+    """
+    settings = get_settings()
+    if not operation:
+        return settings.cache_default_ttl_secs
+
+    name = operation.rsplit(".", 1)[-1]
+    overrides = settings.cache_ttl_overrides
+    for candidate in (operation, name):
+        if candidate in overrides:
+            return overrides[candidate]
+
+    return DEFAULT_CACHE_TTLS.get(name, settings.cache_default_ttl_secs)
+
+
+async def get_cached(key: str) -> Optional[dict]:
+    """Get a cached result, or ``None`` on a miss or when Redis is unavailable."""
+    redis = get_redis()
+    if redis is None or not get_settings().cache_enabled:
+        return None
+
+    try:
+        payload = await redis.get(CACHE_PREFIX + key)
+    except RedisError as e:
+        logger.warning("Redis unavailable for result cache: %s", e)
+        return None
+
+    if payload is None:
+        return None
+    return json.loads(payload)
+
+
+async def set_cached(key: str, entry: dict, ttl: int) -> None:
+    """
+    Store a result that is fresh for ``ttl`` seconds.
+
+    The Redis key outlives the TTL by the stale grace window so the entry can
+    still be served stale while it is refreshed.
+    """
+    settings = get_settings()
+    redis = get_redis()
+    if redis is None or ttl <= 0 or not settings.cache_enabled:
+        return
+
+    payload = json.dumps({**entry, "ttl": ttl, "cached_at": time.time()}, default=str)
+    try:
+        await redis.set(CACHE_PREFIX + key, payload, ex=ttl + settings.cache_stale_grace_secs)
+    except RedisError as e:
+        logger.warning("Could not store cached result: %s", e)
+
+
+def cache_age(entry: dict) -> int:
+    """Age in seconds of a cached entry."""
+    return max(0, int(time.time() - entry["cached_at"]))
+
+
+def freshness(
+    entry: dict,
+    max_age: Optional[int] = None,
+    max_stale: Optional[int] = None,
+) -> str:
+    """
+    Classify a cached entry as fresh, stale (servable) or expired.
+
+    ``max_age`` lowers the entry's TTL for this caller; ``max_stale`` caps how
+    long past expiry the caller accepts data. It defaults to the grace window,
+    or to 0 when only ``max_age`` is given.
+    """
+    settings = get_settings()
+    age = cache_age(entry)
+    fresh_for = entry.get("ttl", settings.cache_default_ttl_secs)
+    if max_age is not None:
+        fresh_for = min(fresh_for, max_age)
+
+    if age <= fresh_for:
+        return FRESH
+
+    if not settings.cache_stale_while_revalidate:
+        return EXPIRED
+
+    if max_stale is None and max_age is not None:
+        max_stale = 0
+
+    stale_for = settings.cache_stale_grace_secs
+    if max_stale is not None:
+        stale_for = min(stale_for, max_stale)
+
+    return STALE if age <= fresh_for + stale_for else EXPIRED
+
+
+async def claim_refresh(key: str) -> bool:
+    """Claim the single background refresh of an entry across all processes."""
+    redis = get_redis()
+    if redis is None:
+        return False
+    try:
+        return bool(await redis.set(
+            REFRESH_PREFIX + key,
+            "1",
+            nx=True,
+            ex=get_settings().cache_refresh_lock_ttl_secs,
+        ))
+    except RedisError as e:
+        logger.warning("Could not claim cache refresh: %s", e)
+        return False
+
+
+async def release_refresh(key: str) -> None:
+    """Release a refresh claimed with ``claim_refresh``."""
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.delete(REFRESH_PREFIX + key)
+    except RedisError:
+        pass
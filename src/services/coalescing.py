@@ -0,0 +1,295 @@
+"""Single-flight coalescing of identical actor runs.
+
+Requests that resolve to the same run key share one actor run:
+
+- Within a process, concurrent callers await the same in-flight task.
+- Across API replicas and Celery workers, the first process to take a Redis
+  lock starts the run; the others subscribe to a pub/sub channel and receive
+  the finished run (its id and dataset id) when the leader publishes it.
+
+If Redis is unavailable, coalescing falls back to in-process only.
+
+Tailed reads (jobs and ``?stream=`` requests) only wait for the start of a
+run, so the run itself is shared while it is going: ``share_running`` maps
+the run key to the started run, in this process and in Redis, until it is
+reported finished (``forget_running``), and identical calls tail that run.
+
+Once every caller of a shared run was cancelled (their clients disconnected,
+see ``src.services.disconnects``) the run is cancelled too; a leader that
+gives up its run tells the other processes to start over.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from redis.exceptions import LockError, RedisError
+
+from src.config import get_settings
+from src.services.metrics import ACTOR_RUNS_COALESCED
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LOCK_PREFIX = "coalesce:lock:"
+CHANNEL_PREFIX = "coalesce:done:"
+RUNNING_PREFIX = "coalesce:running:"
+RUNNING_KEY_PREFIX = "coalesce:running-key:"
+
+# A shared run that never reports back is forgotten after this long
+RUNNING_TTL_SECS = 24 * 3600
+
+_inflight: dict[str, asyncio.Future] = {}
+_callers: dict[asyncio.Future, int] = {}
+_running: dict[str, dict] = {}
+_running_keys: dict[str, str] = {}
+
+
+class CoalescedRunError(RuntimeError):
+    """The shared run failed in the process that owned it."""
+
+
+async def coalesce_local(
+    key: str,
+    actor_id: str,
+    factory: Callable[[], Awaitable[T]],
+) -> T:
+    """
+    Share one in-flight ``factory()`` call between concurrent callers in this process.
+
+    The shared call runs as its own task, so a caller that goes away does not
+    cancel the work the other callers are waiting on. It is cancelled when the
+    last caller is (with ``ABORT_ON_DISCONNECT``).
+    """
+    task = _inflight.get(key)
+    if task is not None:
+        ACTOR_RUNS_COALESCED.labels(actor_id=actor_id, scope="local").inc()
+    else:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _forget(key, done))
+
+    _callers[task] = _callers.get(task, 0) + 1
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if _callers[task] == 1 and get_settings().abort_on_disconnect:
+            task.cancel()
+        raise
+    finally:
+        _callers[task] -= 1
+        if not _callers[task]:
+            del _callers[task]
+
+
+def _forget(key: str, task: asyncio.Future) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        # Retrieve the exception so it is not logged when every caller left
+        task.exception()
+
+
+async def coalesce_remote(
+    key: str,
+    actor_id: str,
+    start_run: Callable[[], Awaitable[dict]],
+) -> dict:
+    """
+    Share one actor run between processes through a Redis lock and pub/sub.
+
+    ``start_run`` must return the finished run dict. Followers only receive the
+    fields needed to read the run's dataset.
+    """
+    settings = get_settings()
+    redis = get_redis()
+    if redis is None or not settings.coalescing_enabled:
+        return await start_run()
+
+    channel = CHANNEL_PREFIX + key
+
+    try:
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(channel)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run coalescing: %s", e)
+        return await start_run()
+
+    try:
+        while True:
+            lock = redis.lock(
+                LOCK_PREFIX + key,
+                timeout=settings.coalesce_lock_ttl_secs,
+                blocking=False,
+            )
+            if await lock.acquire():
+                await pubsub.unsubscribe(channel)
+                return await _lead_run(key, lock, start_run)
+
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.coalesce_lock_ttl_secs,
+            )
+            if message is not None:
+                run = _decode_run(message["data"])
+                if run is None:
+                    # The leader gave up its run: try to lead a new one
+                    continue
+                ACTOR_RUNS_COALESCED.labels(actor_id=actor_id, scope="remote").inc()
+                return run
+            # No news within a lock TTL: the leader may have died, so loop and
+            # try to take over the lock.
+    except RedisError as e:
+        logger.warning("Redis error during run coalescing: %s", e)
+        return await start_run()
+    finally:
+        try:
+            await pubsub.aclose()
+        except RedisError:
+            pass
+
+
+async def _lead_run(key: str, lock, start_run: Callable[[], Awaitable[dict]]) -> dict:
+    """Run the actor while holding the lock and publish the outcome."""
+    settings = get_settings()
+    heartbeat = asyncio.create_task(_keep_lock_alive(lock, settings.coalesce_lock_ttl_secs))
+    try:
+        run = await start_run()
+    except Exception as e:
+        await _release(lock, heartbeat)
+        await _publish(key, {"error": str(e)})
+        raise
+    except BaseException:
+        await _release(lock, heartbeat)
+        await _publish(key, {"abandoned": True})
+        raise
+
+    # Release before publishing: a process that subscribes after the publish
+    # then finds the lock free and starts a fresh run instead of waiting.
+    await _release(lock, heartbeat)
+    await _publish(key, {
+        "run": {
+            "id": run.get("id"),
+            "status": run.get("status"),
+            "defaultDatasetId": run.get("defaultDatasetId"),
+            "finishedAt": run.get("finishedAt"),
+        }
+    })
+    return run
+
+
+async def _release(lock, heartbeat: asyncio.Task) -> None:
+    heartbeat.cancel()
+    try:
+        await lock.release()
+    except (LockError, RedisError):
+        pass
+
+
+async def _keep_lock_alive(lock, ttl_secs: int) -> None:
+    while True:
+        await asyncio.sleep(ttl_secs / 3)
+        try:
+            await lock.extend(ttl_secs, replace_ttl=True)
+        except (LockError, RedisError):
+            return
+
+
+async def _publish(key: str, message: dict) -> None:
+    try:
+        await get_redis().publish(CHANNEL_PREFIX + key, json.dumps(message, default=str))
+    except RedisError as e:
+        logger.warning("Could not publish coalesced run: %s", e)
+
+
+async def has_followers(key: str) -> bool:
+    """Whether processes other than the leader wait on the shared run of ``key``."""
+    redis = get_redis()
+    if redis is None or not get_settings().coalescing_enabled:
+        return False
+    try:
+        [(_, count)] = await redis.pubsub_numsub(CHANNEL_PREFIX + key)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run coalescing: %s", e)
+        # Err on the side of keeping the run
+        return True
+    return count > 0
+
+
+def _decode_run(payload) -> Optional[dict]:
+    message = json.loads(payload)
+    if "error" in message:
+        raise CoalescedRunError(message["error"])
+    return message.get("run")
+
+
+
+# =============================================================================
+# RUNNING RUNS
+# =============================================================================
+
+async def running_run(key: str) -> Optional[dict]:
+    """The shared run started for ``key``, if it was not reported finished yet."""
+    run = _running.get(key)
+    if run is not None:
+        return run
+
+    redis = get_redis()
+    if redis is None or not get_settings().coalescing_enabled:
+        return None
+    try:
+        payload = await redis.get(RUNNING_PREFIX + key)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run coalescing: %s", e)
+        return None
+    return json.loads(payload) if payload else None
+
+
+async def share_running(key: str, run: dict) -> None:
+    """Let identical calls join a started run until it is reported finished."""
+    run = {
+        "id": run["id"],
+        "status": run.get("status"),
+        "defaultDatasetId": run.get("defaultDatasetId"),
+    }
+    _running[key] = run
+    _running_keys[run["id"]] = key
+
+    redis = get_redis()
+    if redis is None or not get_settings().coalescing_enabled:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(RUNNING_PREFIX + key, json.dumps(run), ex=RUNNING_TTL_SECS)
+            pipe.set(RUNNING_KEY_PREFIX + run["id"], key, ex=RUNNING_TTL_SECS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not share running run %s: %s", run["id"], e)
+
+
+async def forget_running(run: Optional[dict]) -> None:
+    """Stop handing out a finished run to new calls; a no-op for runs that were not shared."""
+    if not run or not run.get("id"):
+        return
+    run_id = run["id"]
+    key = _running_keys.pop(run_id, None)
+    if key is not None and _running.get(key, {}).get("id") == run_id:
+        del _running[key]
+
+    redis = get_redis()
+    if redis is None or not get_settings().coalescing_enabled:
+        return
+    try:
+        key = await redis.getdel(RUNNING_KEY_PREFIX + run_id)
+        if key is None:
+            return
+        key = key.decode()
+        shared = await redis.get(RUNNING_PREFIX + key)
+        # A newer run may have been shared under the key meanwhile
+        if shared is not None and json.loads(shared)["id"] == run_id:
+            await redis.delete(RUNNING_PREFIX + key)
+    except RedisError as e:
+        logger.warning("Could not forget running run %s: %s", run_id, e)
@@ -0,0 +1,194 @@
+"""Aborting actor runs nobody waits for anymore.
+
+A client that gives up on a request used to leave its actor run going to the
+end, billed and counting against the account's concurrent run limit. With
+``ABORT_ON_DISCONNECT``:
+
+- ``CancelOnDisconnectMiddleware`` cancels the handler of a request whose
+  client disconnected before the response was sent.
+- ``coalesce_local`` cancels a shared run once every caller waiting on it was
+  cancelled, and the runner then aborts the Apify run, unless callers in
+  other processes still wait on it (``has_followers``).
+- Runs read while running (``tail``) count their readers across processes;
+  the last reader to leave early aborts the run. Parked jobs count as readers.
+
+Each abort records the compute units it saved, by reason (``disconnect`` or
+``deadline``), estimated from the stats of earlier runs of the same operation
+(``src.services.run_sizing``), except for hedge losers, which ran on top of
+the run that won. The aborted
+run then reports back like any finished run (``run_finished``), freeing its
+slots and settling its cost and budget.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from apify_client import ApifyClientAsync
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.apify_client import TERMINAL_STATUSES
+from src.services.metrics import ACTOR_RUNS_ABORTED, COMPUTE_UNITS_SAVED
+from src.services.redis_client import get_redis
+from src.services.run_sizing import abort_savings
+
+logger = logging.getLogger(__name__)
+
+READERS_PREFIX = "runs:readers:"
+
+# Reader counts outlive any run they may be about
+READERS_TTL_SECS = 24 * 3600
+
+# How long an abort waits for the run to stop, for its final usage
+ABORT_WAIT_SECS = 30
+
+_readers: dict[str, int] = {}
+
+# Strong references to aborts started from cancelled code
+_abort_tasks: set[asyncio.Task] = set()
+
+
+class CancelOnDisconnectMiddleware:
+    """ASGI middleware that cancels a request's handler when its client disconnects."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_settings().abort_on_disconnect:
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        responded = False
+        disconnected = False
+
+        async def send_response(message):
+            nonlocal responded
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                responded = True
+            await send(message)
+
+        handler = asyncio.create_task(self.app(scope, messages.get, send_response))
+
+        async def watch():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not responded and not handler.done():
+                        disconnected = True
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            # Nobody is left to send a response to
+            if not disconnected:
+                raise
+        finally:
+            watcher.cancel()
+
+
+async def add_reader(run_id: str) -> None:
+    """Count a reader of a run that may still be running."""
+    redis = get_redis()
+    if redis is None:
+        _readers[run_id] = _readers.get(run_id, 0) + 1
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(READERS_PREFIX + run_id)
+            pipe.expire(READERS_PREFIX + run_id, READERS_TTL_SECS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Redis unavailable for run readers: %s", e)
+
+
+def release_reader(
+    client: ApifyClientAsync, run_id: str, finished: bool, reason: str = "disconnect"
+) -> None:
+    """
+    Uncount a reader; the last one to leave a run before it finished aborts it.
+
+    ``reason`` is why the reader left early, for the abort metrics. Safe to
+    call from a ``finally`` of cancelled code: the work runs in its own task.
+    """
+    _spawn(_release_reader(client, run_id, finished, reason))
+
+
+def abandon_run(client: ApifyClientAsync, run_id: str) -> None:
+    """Abort a run no caller waits for anymore, in its own task."""
+    if get_settings().abort_on_disconnect:
+        abort_later(client, run_id)
+
+
+def abort_later(client: ApifyClientAsync, run_id: str, reason: str = "disconnect") -> None:
+    """Abort a run in its own task."""
+    _spawn(abort_run(client, run_id, reason))
+
+
+async def abort_run(client: ApifyClientAsync, run_id: str, reason: str = "disconnect") -> None:
+    """Abort a run, record the compute units saved and report the stopped run finished."""
+    # Imported here: the runner imports this module
+    from src.services.actor_runner import run_finished
+
+    try:
+        run = await client.run(run_id).abort()
+    except Exception as e:
+        logger.warning("Could not abort run %s: %s", run_id, e)
+        return
+
+    operation, saved = await abort_savings(run or {"id": run_id})
+    label = operation or "unknown"
+    ACTOR_RUNS_ABORTED.labels(operation=label, reason=reason).inc()
+    # A hedge loser ran on top of the winner: nothing was saved
+    if reason != "hedge":
+        COMPUTE_UNITS_SAVED.labels(operation=label, reason=reason).inc(saved)
+    logger.info("Aborted run %s (%s), ~%.3f compute units saved", run_id, label, saved)
+
+    await run_finished(await _stopped_run(client, run or {"id": run_id}))
+
+
+async def _stopped_run(client: ApifyClientAsync, run: dict) -> dict:
+    """The aborted run once it stopped, with its final usage if Apify has it."""
+    if run.get("status") in TERMINAL_STATUSES:
+        return run
+    try:
+        stopped = await client.run(run["id"]).wait_for_finish(wait_secs=ABORT_WAIT_SECS)
+    except Exception as e:
+        logger.warning("Could not fetch aborted run %s: %s", run["id"], e)
+        stopped = None
+    return stopped or {**run, "status": "ABORTED"}
+
+
+async def _release_reader(client: ApifyClientAsync, run_id: str, finished: bool, reason: str) -> None:
+    remaining = await _decrement(run_id)
+    if not finished and remaining == 0 and get_settings().abort_on_disconnect:
+        await abort_run(client, run_id, reason)
+
+
+async def _decrement(run_id: str) -> Optional[int]:
+    redis = get_redis()
+    if redis is None:
+        remaining = _readers.get(run_id, 1) - 1
+        if remaining > 0:
+            _readers[run_id] = remaining
+        else:
+            _readers.pop(run_id, None)
+        return remaining
+    try:
+        return await redis.decr(READERS_PREFIX + run_id)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run readers: %s", e)
+        return None
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _abort_tasks.add(task)
+    task.add_done_callback(_abort_tasks.discard)
@@ -0,0 +1,321 @@
+"""Entity-level caching for multi-entity actor inputs.
+
+Requests such as "these 50 usernames" are cached per entity instead of per
+request. Each entity is stored under the run key of the equivalent
+single-entity input, so a single lookup and a batch that contains the same
+entity share one cache entry. On a request only the entities missing from the
+cache are sent to the actor, and the results are merged back in request order.
+Entities are keyed and de-duplicated by their normalized form, so "NatGeo",
+"natgeo" and a profile URL of the same account are one entity.
+
+With micro-batching enabled (``src.services.batching``), the misses of
+concurrent requests for the same actor and input shape share one run. Long
+lists of misses are split into concurrent runs (``src.services.sharding``).
+
+Entities are always fetched and cached in full, since items are matched to
+entities by their fields; a requested projection is applied locally.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from apify_client import ApifyClientAsync
+
+from src.config import get_settings
+from src.services.actor_runner import ActorRunResult, execute_actor
+from src.services.batching import batch_call
+from src.services.cache import (
+    FRESH,
+    STALE,
+    cache_age,
+    claim_refresh,
+    freshness,
+    get_cached,
+    release_refresh,
+    set_cached,
+    ttl_for,
+)
+from src.services.metrics import ENTITY_CACHE_LOOKUPS
+from src.services.projection import Projection
+from src.services.run_keys import run_key
+from src.services.run_options import background_options, get_run_options, use_run_options
+from src.services.sharding import dedupe_items, merge_results, run_shards, split_entities
+
+logger = logging.getLogger(__name__)
+
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """How the entities of an actor input map to the items of its dataset."""
+
+    input_key: str
+    """Input field holding the entity list, e.g. ``usernames`` or ``startUrls``."""
+
+    entity_of: Optional[Callable[[dict], Optional[str]]] = None
+    """Normalized entity a dataset item belongs to, or ``None`` if unknown.
+    Specs without it only describe the input list, for sharding."""
+
+    normalize: Callable[[str], str] = str.lower
+    """Normalize a requested entity so it compares equal to ``entity_of``."""
+
+    wrapped: bool = False
+    """Entities are ``{"url": ...}`` objects (Apify ``startUrls``)."""
+
+    per_entity_limits: tuple[str, ...] = ()
+    """Input fields capping the total item count (e.g. ``maxItems``). They are
+    given per entity and multiplied by the number of entities of the run."""
+
+    def entities(self, actor_input: dict) -> list[str]:
+        values = actor_input.get(self.input_key) or []
+        return [value["url"] if self.wrapped else value for value in values]
+
+    def with_entities(self, actor_input: dict, entities: list[str]) -> dict:
+        values = [{"url": e} for e in entities] if self.wrapped else list(entities)
+        limits = {
+            name: actor_input[name] * len(entities)
+            for name in self.per_entity_limits
+            if name in actor_input
+        }
+        return {**actor_input, self.input_key: values, **limits}
+
+
+async def execute_actor_by_entity(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    spec: EntitySpec,
+) -> ActorRunResult:
+    """Execute an actor for the entities of ``actor_input`` that are not cached."""
+    options = get_run_options()
+    label = operation or actor_id
+    # Normalized entity -> first requested form of it, which is what the actor is sent
+    requested = _unique(spec, spec.entities(actor_input))
+
+    hits: dict[str, dict] = {}
+    stale: list[str] = []
+    if not options.cache_bypass:
+        entries = await _lookup(actor_id, actor_input, spec, list(requested.values()))
+        for entity, entry in zip(requested, entries):
+            state = freshness(entry, options.max_age, options.max_stale) if entry else None
+            if state in (FRESH, STALE):
+                hits[entity] = entry
+                if state == STALE:
+                    stale.append(requested[entity])
+
+    misses = [raw for entity, raw in requested.items() if entity not in hits]
+    ENTITY_CACHE_LOOKUPS.labels(operation=label, result="hit").inc(len(hits))
+    ENTITY_CACHE_LOOKUPS.labels(operation=label, result="miss").inc(len(misses))
+
+    fetched = ActorRunResult(run_id=None, dataset_id=None, cached=True)
+    grouped: dict[str, list[dict]] = {}
+    unmatched: list[dict] = []
+    if misses:
+        fetched, grouped, unmatched = await _fetch_misses(
+            client, actor_id, actor_input, operation, spec, misses
+        )
+
+    if stale:
+        await _schedule_refresh(client, actor_id, actor_input, operation, spec, stale)
+
+    items: list[dict] = []
+    for entity in requested:
+        if entity in hits:
+            items.extend(hits[entity]["items"])
+        else:
+            items.extend(grouped.get(entity, []))
+    items.extend(unmatched)
+    items = options.projection.apply(items)
+
+    hit_entries = list(hits.values())
+    return ActorRunResult(
+        run_id=fetched.run_id or (hit_entries[0].get("run_id") if hit_entries else None),
+        dataset_id=fetched.dataset_id,
+        items=items,
+        cached=not misses,
+        cache_age_seconds=max((cache_age(e) for e in hit_entries), default=None),
+        stale=bool(stale),
+        partial=fetched.partial,
+    )
+
+
+def entity_key(actor_id: str, actor_input: dict, spec: EntitySpec, entity: str) -> str:
+    """Cache key of one entity: the run key of the normalized single-entity input."""
+    return run_key(actor_id, spec.with_entities(actor_input, [spec.normalize(entity)]))
+
+
+def _unique(spec: EntitySpec, entities: list[str]) -> dict[str, str]:
+    """Map each normalized entity to the first of ``entities`` it was given as."""
+    unique: dict[str, str] = {}
+    for entity in entities:
+        unique.setdefault(spec.normalize(entity), entity)
+    return unique
+
+
+async def _lookup(
+    actor_id: str,
+    actor_input: dict,
+    spec: EntitySpec,
+    entities: list[str],
+) -> list[Optional[dict]]:
+    return await asyncio.gather(*[
+        get_cached(entity_key(actor_id, actor_input, spec, e)) for e in entities
+    ])
+
+
+async def _fetch_misses(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    spec: EntitySpec,
+    entities: list[str],
+) -> tuple[ActorRunResult, dict[str, list[dict]], list[dict]]:
+    """Fetch missing entities, batched with concurrent lookups when enabled."""
+    if not get_settings().batching_enabled:
+        return await _fetch(client, actor_id, actor_input, operation, spec, entities)
+
+    # Lookups batch together when everything but the entity list is the same;
+    # per-entity limits are keyed as given, before they are scaled to the run
+    key = run_key(actor_id, {**actor_input, spec.input_key: []})
+    (result, grouped, unmatched), shared = await batch_call(
+        key,
+        entities,
+        lambda batch: _fetch(client, actor_id, actor_input, operation, spec, batch),
+        operation or actor_id,
+    )
+    # Items that can't be told apart by entity only go to a request of its own
+    return result, grouped, [] if shared else unmatched
+
+
+async def _fetch(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    spec: EntitySpec,
+    entities: list[str],
+) -> tuple[ActorRunResult, dict[str, list[dict]], list[dict]]:
+    """
+    Run the actor for ``entities`` and cache the items of each entity.
+
+    Many entities are fetched in shards; the entities of failed shards (or of
+    shards cut short by the deadline) are left out of the cache and the result
+    is marked partial.
+    """
+    # Requests batched together may name one entity in different forms
+    entities = list(_unique(spec, entities).values())
+    shards = split_entities(entities, operation)
+    inputs = [spec.with_entities(actor_input, shard) for shard in shards]
+    if len(inputs) == 1:
+        results = [await execute_actor(
+            client, actor_id, inputs[0], operation, use_cache=False, projection=Projection()
+        )]
+    else:
+        results = await run_shards(
+            client, actor_id, inputs, operation, use_cache=False, projection=Projection()
+        )
+    result = merge_results(results)
+
+    grouped: dict[str, list[dict]] = {}
+    unmatched: list[dict] = []
+    ttl = ttl_for(operation)
+    for shard, shard_result in zip(shards, results):
+        if isinstance(shard_result, Exception):
+            continue
+
+        shard_grouped, shard_unmatched = _group(shard_result.items, spec)
+        for entity, items in shard_grouped.items():
+            grouped.setdefault(entity, []).extend(items)
+        unmatched.extend(shard_unmatched)
+
+        if shard_result.partial:
+            # Cut short by the request deadline, so entities may miss items
+            continue
+        await asyncio.gather(*[
+            set_cached(entity_key(actor_id, actor_input, spec, e), {
+                "run_id": shard_result.run_id,
+                "dataset_id": shard_result.dataset_id,
+                "items": shard_grouped.get(spec.normalize(e), []),
+            }, ttl)
+            for e in shard
+        ])
+    return result, grouped, dedupe_items(unmatched)
+
+
+def _group(items: list[dict], spec: EntitySpec) -> tuple[dict[str, list[dict]], list[dict]]:
+    """Split dataset items by entity; items without a known entity are returned apart."""
+    grouped: dict[str, list[dict]] = {}
+    unmatched: list[dict] = []
+    for item in items:
+        entity = spec.entity_of(item)
+        if entity is None:
+            unmatched.append(item)
+        else:
+            grouped.setdefault(entity, []).append(item)
+    return grouped, unmatched
+
+
+async def _schedule_refresh(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    spec: EntitySpec,
+    entities: list[str],
+) -> None:
+    """Refresh stale entities in one background run, skipping ones already refreshing."""
+    keys = {e: entity_key(actor_id, actor_input, spec, e) for e in entities}
+    claimed = [e for e in entities if await claim_refresh(keys[e])]
+    if not claimed:
+        return
+
+    async def refresh():
+        try:
+            with use_run_options(background_options(cache_bypass=True)):
+                await _fetch(client, actor_id, actor_input, operation, spec, claimed)
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", actor_id, e)
+        finally:
+            for entity in claimed:
+                await release_refresh(keys[entity])
+
+    task = asyncio.create_task(refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+# =============================================================================
+# ENTITY MATCHERS
+# =============================================================================
+
+def url_id(pattern: str) -> Callable[[str], str]:
+    """
+    Normalizer that extracts an ID from a URL with the first group of
+    ``pattern``. Values that don't match (e.g. a bare ID) are kept as they are.
+    """
+    regex = re.compile(pattern)
+
+    def normalize(value: str) -> str:
+        match = regex.search(value)
+        return match.group(1) if match else value.strip()
+
+    return normalize
+
+
+def first_field(*fields: str, normalize: Callable[[str], str] = str.lower) -> Callable[[dict], Optional[str]]:
+    """Entity of an item taken from the first of ``fields`` that is set."""
+
+    def entity_of(item: dict) -> Optional[str]:
+        for name in fields:
+            value = item.get(name)
+            if value:
+                return normalize(str(value))
+        return None
+
+    return entity_of
@@ -0,0 +1,58 @@
+"""HTTP errors for failures of actor runs.
+
+Routes turn unexpected exceptions into HTTP errors with ``http_error`` so
+that Apify account limits reach callers as what they are instead of a
+generic 500:
+
+- no run slot freed up in time (``AdmissionTimeout``) and Apify's rate or
+  concurrent memory limits: 429 with ``Retry-After``;
+- runs refused by a used-up budget (``BudgetExceeded``): 429 with
+  ``Retry-After`` until the budget's hour or day is over;
+- other Apify 402s (usage or credit exhausted): 402;
+- runs shed by an open circuit breaker (``CircuitOpen``): 503 with
+  ``Retry-After``.
+"""
+
+from apify_client.errors import ApifyApiError
+from fastapi import HTTPException
+
+from src.services.admission import AdmissionTimeout
+from src.services.budget import BudgetExceeded
+from src.services.run_policy import CircuitOpen
+
+# Suggested wait before retrying a request rejected for capacity
+RETRY_AFTER_SECS = 30
+
+# Apify 402 errors that go away once running actors finish
+TRANSIENT_402_TYPES = {"actor-memory-limit-exceeded"}
+
+
+def http_error(e: Exception) -> HTTPException:
+    """The HTTP error a route raises for an exception of the run layer."""
+    if isinstance(e, AdmissionTimeout) or _is_capacity_error(e):
+        return HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(RETRY_AFTER_SECS)},
+        )
+    if isinstance(e, BudgetExceeded):
+        return HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, CircuitOpen):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, ApifyApiError) and e.status_code == 402:
+        return HTTPException(status_code=402, detail=str(e))
+    return HTTPException(status_code=500, detail=str(e))
+
+
+def _is_capacity_error(e: Exception) -> bool:
+    if not isinstance(e, ApifyApiError):
+        return False
+    return e.status_code == 429 or (e.status_code == 402 and e.type in TRANSIENT_402_TYPES)
@@ -0,0 +1,264 @@
+"""One executor for every actor call, shared by the API routes and the Celery jobs.
+
+An ``ActorExecutor`` per platform runs an actor for a request through an
+ordered chain of middleware. Each middleware gets the ``ActorCall`` and the
+rest of the chain (``call_next``), and returns the ``ActorRunStream`` of the
+call, so a feature added as middleware applies to routes and jobs alike.
+
+The default chain, outermost first:
+
+1. ``instrument``: counts calls and items and times them, per operation and
+   caller (``api`` or ``job``).
+2. ``govern``: answers calls refused by a used-up budget from stored data
+   (``src.services.budget``).
+3. ``fan_out``: calls with ``entities`` are served per entity from the entity
+   cache (``src.services.entity_cache``); calls with a long ``shards`` list
+   are split into concurrent runs (``src.services.sharding``).
+4. ``lookup_cache``: serves fresh (or stale, refreshing them) cached results
+   (``src.services.cache``).
+5. ``run``: the shared runner (``src.services.actor_runner.stream_actor``)
+   with the cache lookup left out. Coalescing, admission, execution, dataset
+   read and projection stay stages of the runner: coalescing shares the
+   admitted, started and awaited run as one unit, so they cannot be
+   reordered apart.
+
+Platform services return the ``stream`` of a call, which routes send with
+``src.services.streaming.stream_response`` (as ``ScrapeResponse`` JSON, or
+NDJSON/SSE); jobs read it with ``collect``.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional, Sequence
+
+from apify_client import ApifyClientAsync
+
+from src.config import get_settings
+from src.services.actor_runner import (
+    ActorRunResult,
+    ActorRunStream,
+    as_stream,
+    cached_result,
+    collect_run,
+    stream_actor,
+)
+from src.services.budget import BudgetExceeded, fallback_options
+from src.services.entity_cache import EntitySpec, execute_actor_by_entity
+from src.services.metrics import BUDGET_DECISIONS, EXECUTOR_CALLS, EXECUTOR_ITEMS, EXECUTOR_SECONDS
+from src.services.run_costs import platform_of
+from src.services.run_index import find_recent_run
+from src.services.run_options import get_run_options, use_run_options
+from src.services.sharding import execute_sharded, is_sharded
+
+
+@dataclass
+class ActorCall:
+    """An actor run requested by a route or a job."""
+
+    client: ApifyClientAsync
+    actor_id: str
+    actor_input: dict
+    operation: str
+    """Full operation name, e.g. ``"instagram.profile"``."""
+    entities: Optional[EntitySpec] = None
+    shards: Optional[EntitySpec] = None
+    caller: str = "api"
+    """``api`` for requests to the API, ``job`` for Celery jobs."""
+
+
+CallNext = Callable[[ActorCall], Awaitable[ActorRunStream]]
+Middleware = Callable[[ActorCall, CallNext], Awaitable[ActorRunStream]]
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+async def instrument(call: ActorCall, call_next: CallNext) -> ActorRunStream:
+    """Count and time calls, until their last item is read."""
+    started = time.monotonic()
+    try:
+        stream = await call_next(call)
+    except Exception:
+        _observe(call, started, "error")
+        raise
+    stream.items = _instrumented(call, stream, stream.items, started)
+    return stream
+
+
+async def govern(call: ActorCall, call_next: CallNext) -> ActorRunStream:
+    """
+    Answer calls refused by a used-up budget from stored data.
+
+    Item limits are cut by the runner, when it starts a run under a tight
+    budget (``src.services.budget.plan_input``).
+    """
+    try:
+        return await call_next(call)
+    except BudgetExceeded:
+        stored = await _stored_result(call)
+        if stored is None:
+            raise
+        BUDGET_DECISIONS.labels(platform=platform_of(call.operation), decision="stored").inc()
+        return as_stream(stored)
+
+
+async def fan_out(call: ActorCall, call_next: CallNext) -> ActorRunStream:
+    """Serve per entity or split into shards when the call asks for it."""
+    if call.entities:
+        return as_stream(await execute_actor_by_entity(
+            call.client, call.actor_id, call.actor_input, call.operation, call.entities
+        ))
+    if call.shards and is_sharded(call.actor_input, call.shards, call.operation):
+        return as_stream(await execute_sharded(
+            call.client, call.actor_id, call.actor_input, call.operation, call.shards
+        ))
+    return await call_next(call)
+
+
+async def lookup_cache(call: ActorCall, call_next: CallNext) -> ActorRunStream:
+    """Serve the call from the result cache under the current run options, if possible."""
+    cached = await cached_result(call.client, call.actor_id, call.actor_input, call.operation)
+    if cached is not None:
+        return as_stream(cached)
+    return await call_next(call)
+
+
+async def run(call: ActorCall) -> ActorRunStream:
+    """End of the chain: the shared runner, past the cache."""
+    return await stream_actor(
+        call.client, call.actor_id, call.actor_input, call.operation, use_cache=False
+    )
+
+
+DEFAULT_MIDDLEWARE: tuple[Middleware, ...] = (instrument, govern, fan_out, lookup_cache)
+
+
+# =============================================================================
+# EXECUTOR
+# =============================================================================
+
+class ActorExecutor:
+    """Runs actors of a platform through the middleware chain."""
+
+    def __init__(
+        self,
+        platform: Optional[str],
+        middleware: Sequence[Middleware] = DEFAULT_MIDDLEWARE,
+    ):
+        """
+        ``platform`` prefixes the operation names of calls (``None`` for
+        callers that pass full names).
+        """
+        self.platform = platform
+        self.middleware = list(middleware)
+
+    async def stream(
+        self,
+        client: ApifyClientAsync,
+        actor_id: str,
+        actor_input: dict,
+        operation: str,
+        entities: Optional[EntitySpec] = None,
+        shards: Optional[EntitySpec] = None,
+    ) -> ActorRunStream:
+        """Run the call through the chain; items are read as they are consumed."""
+        if self.platform:
+            operation = f"{self.platform}.{operation}"
+        caller = "api" if get_run_options().interactive else "job"
+        call = ActorCall(client, actor_id, actor_input, operation, entities, shards, caller)
+        return await self._chain(0)(call)
+
+    async def collect(
+        self,
+        client: ApifyClientAsync,
+        actor_id: str,
+        actor_input: dict,
+        operation: str,
+        entities: Optional[EntitySpec] = None,
+        shards: Optional[EntitySpec] = None,
+        on_progress: Optional[Callable[[ActorRunStream, list[dict]], None]] = None,
+    ) -> ActorRunResult:
+        """
+        Read all items of a call into a list.
+
+        ``on_progress`` gets the items read so far every
+        ``JOB_PROGRESS_INTERVAL_SECS``. When a tailed run fails and is started
+        again, the items of the failed run are dropped.
+        """
+        stream = await self.stream(client, actor_id, actor_input, operation, entities, shards)
+        interval = get_settings().job_progress_interval_secs
+        reported_at = time.monotonic()
+        run_id = stream.run_id
+        items = []
+
+        async for item in stream.items:
+            if stream.run_id != run_id:
+                run_id = stream.run_id
+                items.clear()
+            items.append(item)
+            if on_progress is not None and time.monotonic() - reported_at >= interval:
+                on_progress(stream, items)
+                reported_at = time.monotonic()
+
+        return ActorRunResult(
+            run_id=stream.run_id,
+            dataset_id=stream.dataset_id,
+            items=items,
+            cached=stream.cached,
+            cache_age_seconds=stream.cache_age_seconds,
+            stale=stream.stale,
+            partial=stream.partial,
+        )
+
+    def _chain(self, index: int) -> CallNext:
+        if index == len(self.middleware):
+            return run
+        middleware, call_next = self.middleware[index], self._chain(index + 1)
+        return lambda call: middleware(call, call_next)
+
+
+async def _stored_result(call: ActorCall) -> Optional[ActorRunResult]:
+    """Any cached result of the call, even stale, or else a recent run with the same input."""
+    with use_run_options(fallback_options()):
+        cached = await cached_result(call.client, call.actor_id, call.actor_input, call.operation)
+    if cached is not None:
+        return cached
+
+    settings = get_settings()
+    if not settings.run_reuse_enabled:
+        return None
+    run = await find_recent_run(
+        call.client, call.actor_id, call.actor_input, settings.run_reuse_max_age_secs
+    )
+    if run is None:
+        return None
+    return await collect_run(
+        call.client, run, call.actor_id, call.actor_input, call.operation,
+        get_run_options().projection,
+    )
+
+
+def _observe(call: ActorCall, started: float, outcome: str, items: int = 0) -> None:
+    EXECUTOR_CALLS.labels(operation=call.operation, caller=call.caller, outcome=outcome).inc()
+    EXECUTOR_SECONDS.labels(operation=call.operation, caller=call.caller).observe(
+        time.monotonic() - started
+    )
+    EXECUTOR_ITEMS.labels(operation=call.operation, caller=call.caller).inc(items)
+
+
+async def _instrumented(
+    call: ActorCall,
+    stream: ActorRunStream,
+    items: AsyncIterator[dict],
+    started: float,
+) -> AsyncIterator[dict]:
+    count = 0
+    outcome = "error"
+    try:
+        async for item in items:
+            count += 1
+            yield item
+        outcome = "cached" if stream.cached else "partial" if stream.partial else "ok"
+    finally:
+        _observe(call, started, outcome, count)
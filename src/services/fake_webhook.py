@@ -0,0 +1,69 @@
+"""Replay the webhook of a finished Apify run to a local API, for testing webhook mode.
+
+    python -m src.services.fake_webhook RUN_ID [--url http://localhost:8000]
+
+The API only takes the run id from a webhook and fetches the run from Apify
+itself, so only real runs can be replayed, once they finished: webhooks of
+runs that are still going (or unknown to Apify) are ignored. The run is
+fetched here too, so the payload is the one Apify would send.
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from src.config import get_settings
+from src.services.webhooks import CALLBACK_PATH
+
+
+def build_payload(run: dict) -> dict:
+    """A webhook payload in Apify's default template for a finished ``run``."""
+    status = run.get("status", "SUCCEEDED")
+    return {
+        "userId": run.get("userId"),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "eventType": f"ACTOR.RUN.{status.replace('-', '_')}",
+        "eventData": {"actorId": run.get("actId"), "actorRunId": run["id"]},
+        "resource": run,
+    }
+
+
+async def send_fake_webhook(
+    run: dict,
+    base_url: str = "http://localhost:8000",
+    token: Optional[str] = None,
+) -> int:
+    """Post the webhook of ``run`` to the API at ``base_url``; returns the status code."""
+    params = {"token": token} if token else None
+    async with httpx.AsyncClient() as http:
+        response = await http.post(
+            base_url.rstrip("/") + CALLBACK_PATH,
+            params=params,
+            content=json.dumps(build_payload(run), default=str),
+            headers={"Content-Type": "application/json"},
+        )
+    return response.status_code
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from src.services.apify_client import TERMINAL_STATUSES, get_apify_client
+
+    run = await get_apify_client().run(args.run_id).get()
+    if run is None:
+        raise SystemExit(f"Run {args.run_id} not found")
+    if run.get("status") not in TERMINAL_STATUSES:
+        raise SystemExit(f"Run {args.run_id} is still {run.get('status')}; the API would ignore it")
+
+    status_code = await send_fake_webhook(run, args.url, get_settings().webhook_secret)
+    print(f"Webhook for run {args.run_id} ({run.get('status')}): HTTP {status_code}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("run_id")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""Hedged actor runs for interactive requests.
+
+Some runs hit a slow proxy and take several times the median. For the
+operations in ``HEDGING_OPERATIONS`` (e.g. ``["instagram.profile", "tiktok"]``;
+a platform name covers all its operations), a run of an API request that is
+still going after the p90 duration of earlier runs like it (same actor,
+operation and input size, see ``src.services.run_sizing``) gets a second,
+identical run. The first of the two to succeed is used and the other one is
+aborted.
+
+Hedges are capped at ``HEDGING_BUDGET_PERCENT`` of the runs started in the
+current hour, counted in Redis across processes. Without Redis (and so
+without run history) nothing is hedged.
+"""
+
+import logging
+import math
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import HEDGES_SKIPPED
+from src.services.redis_client import get_redis
+from src.services.run_options import get_run_options
+from src.services.run_sizing import run_durations
+
+logger = logging.getLogger(__name__)
+
+RUNS_PREFIX = "hedge:runs:"
+HEDGES_PREFIX = "hedge:hedges:"
+
+# Quantile of earlier run durations after which a run is hedged
+HEDGE_QUANTILE = 0.9
+
+BUDGET_WINDOW_SECS = 3600
+
+
+def hedged(operation: Optional[str]) -> bool:
+    """Whether runs of ``operation`` in the current request may be hedged."""
+    operations = get_settings().hedging_operations
+    if not operations or not operation or not get_run_options().interactive:
+        return False
+    return operation in operations or operation.split(".", 1)[0] in operations
+
+
+async def hedge_delay(actor_id: str, operation: Optional[str], actor_input: dict) -> Optional[float]:
+    """Seconds after which a run is hedged; ``None`` if it is not hedged."""
+    if not hedged(operation):
+        return None
+    durations = sorted(await run_durations(actor_id, operation, actor_input))
+    if len(durations) < get_settings().run_sizing_min_samples:
+        return None
+    return durations[min(len(durations) - 1, math.ceil(HEDGE_QUANTILE * len(durations)) - 1)]
+
+
+async def count_run() -> None:
+    """Count a started run towards the hedge budget."""
+    redis = get_redis()
+    if redis is None or not get_settings().hedging_operations:
+        return
+    key = RUNS_PREFIX + _window()
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, BUDGET_WINDOW_SECS * 2)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Redis unavailable for hedging: %s", e)
+
+
+async def take_hedge(operation: Optional[str]) -> bool:
+    """Claim a hedge from the budget of the current hour."""
+    redis = get_redis()
+    if redis is None:
+        return False
+    window = _window()
+    try:
+        runs = int(await redis.get(RUNS_PREFIX + window) or 0)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(HEDGES_PREFIX + window)
+            pipe.expire(HEDGES_PREFIX + window, BUDGET_WINDOW_SECS * 2)
+            hedges, _ = await pipe.execute()
+        if hedges <= runs * get_settings().hedging_budget_percent / 100:
+            return True
+        await redis.decr(HEDGES_PREFIX + window)
+    except RedisError as e:
+        logger.warning("Redis unavailable for hedging: %s", e)
+        return False
+    HEDGES_SKIPPED.labels(operation=operation or "unknown").inc()
+    return False
+
+
+def _window() -> str:
+    return str(int(time.time() // BUDGET_WINDOW_SECS))
@@ -0,0 +1,365 @@
+"""Prometheus metrics shared by the API and the Celery workers."""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# =============================================================================
+# APIFY CLIENT POOL
+# =============================================================================
+
+APIFY_CLIENTS_CREATED = Counter(
+    "apify_clients_created_total",
+    "Apify clients created by this process (stays at 1 when the pool is reused)",
+)
+
+APIFY_POOL_SIZE = Gauge(
+    "apify_pool_max_connections",
+    "Maximum concurrent Apify API requests allowed by an account's pool",
+    ["account", "kind"],
+)
+
+APIFY_POOL_IN_USE = Gauge(
+    "apify_pool_connections_in_use",
+    "Apify API requests currently holding a pool slot",
+    ["account", "kind"],
+)
+
+APIFY_POOL_WAITS = Counter(
+    "apify_pool_waits_total",
+    "Apify API requests that had to wait for a free pool slot",
+    ["account", "kind"],
+)
+
+APIFY_POOL_WAIT_SECONDS = Histogram(
+    "apify_pool_wait_seconds",
+    "Time spent waiting for a free pool slot",
+    ["account", "kind"],
+)
+
+APIFY_API_REQUESTS = Counter(
+    "apify_api_requests_total",
+    "Apify API requests sent through the shared pool",
+    ["account", "method"],
+)
+
+# =============================================================================
+# ACTOR RUNS
+# =============================================================================
+
+ACTOR_RUNS_STARTED = Counter(
+    "actor_runs_started_total",
+    "Actor runs started by this process",
+    ["actor_id"],
+)
+
+ACTOR_RUNS_COALESCED = Counter(
+    "actor_runs_coalesced_total",
+    "Requests served by an identical run that was already in flight",
+    ["actor_id", "scope"],
+)
+
+ACTOR_RUNS_REUSED = Counter(
+    "actor_runs_reused_total",
+    "Runs not started because a recent identical run succeeded, by how it was found",
+    ["actor_id", "source"],
+)
+
+ACTOR_RUNS_ABORTED = Counter(
+    "actor_runs_aborted_total",
+    "Runs aborted, by reason (disconnect: every waiting client left, hedge: lost to a hedged run)",
+    ["operation", "reason"],
+)
+
+COMPUTE_UNITS_SAVED = Counter(
+    "actor_run_compute_units_saved_total",
+    "Estimated compute units not spent thanks to aborted runs",
+    ["operation", "reason"],
+)
+
+ACTOR_RUN_MEMORY = Histogram(
+    "actor_run_memory_mbytes",
+    "Memory chosen for new runs from the stats of earlier runs",
+    ["operation"],
+    buckets=[128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768],
+)
+
+# =============================================================================
+# RUN COSTS
+# =============================================================================
+
+ACTOR_RUNS_FINISHED = Counter(
+    "actor_runs_finished_total",
+    "Finished runs started by this API, by status",
+    ["platform", "operation", "caller", "status"],
+)
+
+ACTOR_RUN_COST_USD = Counter(
+    "actor_run_cost_usd_total",
+    "Apify usage (USD) of finished runs",
+    ["platform", "operation", "caller"],
+)
+
+ACTOR_RUN_COMPUTE_UNITS = Counter(
+    "actor_run_compute_units_total",
+    "Compute units of finished runs",
+    ["platform", "operation", "caller"],
+)
+
+ACTOR_RUN_SECONDS = Histogram(
+    "actor_run_seconds",
+    "Run time of finished runs",
+    ["platform", "operation", "caller"],
+    buckets=[1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600],
+)
+
+ACTOR_RUN_PEAK_MEMORY = Histogram(
+    "actor_run_peak_memory_mbytes",
+    "Peak memory used by finished runs",
+    ["platform", "operation"],
+    buckets=[64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384],
+)
+
+ACTOR_RUN_INPUT_SIZE = Histogram(
+    "actor_run_input_size",
+    "Work asked of finished runs: entities times the per-entity item limit",
+    ["platform", "operation"],
+    buckets=[1, 10, 50, 100, 500, 1000, 5000, 10000, 50000],
+)
+
+ACTOR_RUN_ITEMS = Counter(
+    "actor_run_items_total",
+    "Dataset items of runs, counted once when a run's dataset is first read to the end",
+    ["platform", "operation", "caller"],
+)
+
+# =============================================================================
+# BUDGETS
+# =============================================================================
+
+BUDGET_REMAINING = Gauge(
+    "budget_remaining",
+    "USD or compute units left in the current hour or day of a budget",
+    ["scope", "limit"],
+)
+
+BUDGET_DECISIONS = Counter(
+    "budget_decisions_total",
+    "Budget decisions (run, downgraded, throttled, stored: answered from stored data)",
+    ["platform", "decision"],
+)
+
+# =============================================================================
+# ACTOR EXECUTOR
+# =============================================================================
+
+EXECUTOR_CALLS = Counter(
+    "actor_executor_calls_total",
+    "Actor calls of routes (api) and jobs (job), by outcome (ok, cached, partial, error)",
+    ["operation", "caller", "outcome"],
+)
+
+EXECUTOR_SECONDS = Histogram(
+    "actor_executor_seconds",
+    "Time from an actor call until its last item was read",
+    ["operation", "caller"],
+    buckets=[0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600],
+)
+
+EXECUTOR_ITEMS = Counter(
+    "actor_executor_items_total",
+    "Items returned by actor calls",
+    ["operation", "caller"],
+)
+
+# =============================================================================
+# ACCOUNT POOL
+# =============================================================================
+
+ACCOUNT_RUNS_STARTED = Counter(
+    "apify_account_runs_started_total",
+    "Actor runs started, per Apify account",
+    ["account"],
+)
+
+ACCOUNT_IN_FLIGHT = Gauge(
+    "apify_account_runs_in_flight",
+    "Runs going on an Apify account of the pool, as last seen when routing",
+    ["account"],
+)
+
+ACCOUNT_FAILURES = Counter(
+    "apify_account_start_failures_total",
+    "Run starts that failed, per Apify account",
+    ["account"],
+)
+
+# =============================================================================
+# PROXY POLICY
+# =============================================================================
+
+PROXY_RUNS = Counter(
+    "actor_proxy_runs_total",
+    "Finished runs per Apify Proxy group, by outcome (ok, failed)",
+    ["operation", "group", "outcome"],
+)
+
+PROXY_RUN_SECONDS = Histogram(
+    "actor_proxy_run_seconds",
+    "Duration of runs per Apify Proxy group",
+    ["operation", "group"],
+    buckets=[1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600],
+)
+
+PROXY_RUN_COST_USD = Counter(
+    "actor_proxy_run_cost_usd_total",
+    "Cost of runs (usageTotalUsd) per Apify Proxy group",
+    ["operation", "group"],
+)
+
+PROXY_GROUP_LEVEL = Gauge(
+    "actor_proxy_group_level",
+    "Current position on the proxy group ladder (0 = cheapest group)",
+    ["operation"],
+)
+
+PROXY_GROUP_CHANGES = Counter(
+    "actor_proxy_group_changes_total",
+    "Moves up (escalate) or down (demote) the proxy group ladder",
+    ["operation", "change"],
+)
+
+# =============================================================================
+# RUN ADMISSION
+# =============================================================================
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "actor_admission_queue_depth",
+    "Starts waiting for a run slot, per actor id or account",
+    ["scope"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "actor_admission_in_flight",
+    "Run slots taken, per actor id or account",
+    ["scope"],
+)
+
+ADMISSION_WAIT_SECONDS = Histogram(
+    "actor_admission_wait_seconds",
+    "Time a start waited for a run slot",
+    ["actor_id"],
+    buckets=[0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300],
+)
+
+ADMISSION_REJECTED = Counter(
+    "actor_admission_rejected_total",
+    "Starts that gave up waiting for a run slot",
+    ["actor_id"],
+)
+
+# =============================================================================
+# RETRIES AND CIRCUIT BREAKING
+# =============================================================================
+
+RUN_RETRIES = Counter(
+    "actor_run_retries_total",
+    "Actor runs started again after a transient failure, by failure",
+    ["operation", "reason"],
+)
+
+BREAKER_OPENED = Counter(
+    "actor_circuit_opened_total",
+    "Times an actor's circuit breaker opened",
+    ["actor_id"],
+)
+
+BREAKER_REJECTED = Counter(
+    "actor_circuit_rejected_total",
+    "Runs shed because the actor's circuit breaker was open",
+    ["actor_id"],
+)
+
+# =============================================================================
+# HEDGING
+# =============================================================================
+
+HEDGES_STARTED = Counter(
+    "actor_run_hedges_total",
+    "Second runs started for runs slower than the p90 of earlier runs",
+    ["operation"],
+)
+
+HEDGES_WON = Counter(
+    "actor_run_hedges_won_total",
+    "Hedged runs that succeeded before the run they hedged",
+    ["operation"],
+)
+
+HEDGES_SKIPPED = Counter(
+    "actor_run_hedges_skipped_total",
+    "Slow runs not hedged because the hedge budget was used up",
+    ["operation"],
+)
+
+# =============================================================================
+# RESULT CACHE
+# =============================================================================
+
+CACHE_REQUESTS = Counter(
+    "actor_cache_requests_total",
+    "Result cache lookups by outcome (hit, miss, bypass)",
+    ["operation", "result"],
+)
+
+ENTITY_CACHE_LOOKUPS = Counter(
+    "actor_entity_cache_lookups_total",
+    "Per-entity cache lookups of multi-entity requests by outcome (hit, miss)",
+    ["operation", "result"],
+)
+
+# =============================================================================
+# MICRO-BATCHING
+# =============================================================================
+
+BATCH_SIZE = Histogram(
+    "actor_batch_entities",
+    "Entities per batched actor run",
+    ["operation"],
+    buckets=(1, 2, 5, 10, 25, 50, 100),
+)
+
+BATCH_REQUESTS = Histogram(
+    "actor_batch_requests",
+    "Requests served by one batched actor run",
+    ["operation"],
+    buckets=(1, 2, 5, 10, 25, 50, 100),
+)
+
+# =============================================================================
+# SHARDING
+# =============================================================================
+
+SHARD_RUNS = Counter(
+    "actor_shard_runs_total",
+    "Runs of sharded requests by outcome (ok, failed)",
+    ["operation", "result"],
+)
+
+# =============================================================================
+# RUN WEBHOOKS
+# =============================================================================
+
+RUN_COMPLETIONS = Counter(
+    "actor_run_completions_total",
+    "Finished runs picked up in webhook mode, by source (webhook, poller)",
+    ["source"],
+)
+
+PARKED_REQUESTS = Gauge(
+    "actor_parked_requests",
+    "Requests in this process waiting for a run webhook",
+)
+
+PARKED_RUNS = Gauge(
+    "actor_parked_job_runs",
+    "Runs with background jobs parked on them, as last seen by the poller",
+)
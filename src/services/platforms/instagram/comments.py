@@ -1,10 +1,11 @@
 """Instagram comments scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import INSTAGRAM_ACTOR_ID
-from .schemas import InstagramResponse
 from .utils import run_actor, get_default_proxy
 
 
@@ -39,24 +40,24 @@ def build_comments_input(request: InstagramCommentsRequest) -> dict:
     }
 
 
-def scrape_comments(
-    client: ApifyClient,
+async def scrape_comments(
+    client: ApifyClientAsync,
     request: InstagramCommentsRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Scrape comments from Instagram posts.
 
     Returns: comment text, author, likes, timestamp, etc.
     """
     actor_input = build_comments_input(request)
-    return run_actor(client, INSTAGRAM_ACTOR_ID, actor_input)
+    return await run_actor(client, INSTAGRAM_ACTOR_ID, actor_input, "comments")
 
 
-def get_post_comments(
-    client: ApifyClient,
+async def get_post_comments(
+    client: ApifyClientAsync,
     post_url: str,
     limit: int = 100,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Get comments from a single post."""
     request = InstagramCommentsRequest(post_urls=[post_url], results_limit=limit)
-    return scrape_comments(client, request)
+    return await scrape_comments(client, request)
@@ -1,12 +1,16 @@
 """Instagram hashtag scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import INSTAGRAM_HASHTAG_ACTOR_ID, INSTAGRAM_DEFAULT_RESULTS, INSTAGRAM_MAX_RESULTS
-from .schemas import InstagramResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
 from .utils import run_actor, get_default_proxy
 
+HASHTAG_SHARDS = EntitySpec(input_key="hashtags")
+
 
 class InstagramHashtagRequest(BaseModel):
     """Request to scrape posts from hashtags."""
@@ -37,24 +41,26 @@ def build_hashtag_input(request: InstagramHashtagRequest) -> dict:
     }
 
 
-def scrape_hashtag(
-    client: ApifyClient,
+async def scrape_hashtag(
+    client: ApifyClientAsync,
     request: InstagramHashtagRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Scrape posts from hashtags.
 
     Returns: posts containing the specified hashtags.
     """
     actor_input = build_hashtag_input(request)
-    return run_actor(client, INSTAGRAM_HASHTAG_ACTOR_ID, actor_input)
+    return await run_actor(
+        client, INSTAGRAM_HASHTAG_ACTOR_ID, actor_input, "hashtag", shards=HASHTAG_SHARDS
+    )
 
 
-def get_hashtag_posts(
-    client: ApifyClient,
+async def get_hashtag_posts(
+    client: ApifyClientAsync,
     hashtag: str,
     limit: int = INSTAGRAM_DEFAULT_RESULTS,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Get posts from a single hashtag."""
     request = InstagramHashtagRequest(hashtags=[hashtag], results_limit=limit)
-    return scrape_hashtag(client, request)
+    return await scrape_hashtag(client, request)
@@ -1,11 +1,19 @@
 """Instagram post details scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import INSTAGRAM_POST_ACTOR_ID
-from .schemas import InstagramResponse
-from .utils import run_actor, get_default_proxy
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec, first_field
+
+from .utils import run_actor, get_default_proxy, post_shortcode
+
+POST_DETAILS_ENTITIES = EntitySpec(
+    input_key="directUrls",
+    entity_of=first_field("shortCode", "inputUrl", "url", normalize=post_shortcode),
+    normalize=post_shortcode,
+)
 
 
 class InstagramPostDetailRequest(BaseModel):
@@ -31,23 +39,25 @@ def build_post_details_input(request: InstagramPostDetailRequest) -> dict:
     }
 
 
-def scrape_post_details(
-    client: ApifyClient,
+async def scrape_post_details(
+    client: ApifyClientAsync,
     request: InstagramPostDetailRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Get detailed information about specific posts.
 
     Returns: full post metadata without comments.
     """
     actor_input = build_post_details_input(request)
-    return run_actor(client, INSTAGRAM_POST_ACTOR_ID, actor_input)
+    return await run_actor(
+        client, INSTAGRAM_POST_ACTOR_ID, actor_input, "post_details", POST_DETAILS_ENTITIES
+    )
 
 
-def get_post_details(
-    client: ApifyClient,
+async def get_post_details(
+    client: ApifyClientAsync,
     post_url: str,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Get details of a single post."""
     request = InstagramPostDetailRequest(post_urls=[post_url])
-    return scrape_post_details(client, request)
+    return await scrape_post_details(client, request)
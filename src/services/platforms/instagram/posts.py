@@ -2,11 +2,19 @@
 
 from typing import Optional
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import INSTAGRAM_ACTOR_ID, INSTAGRAM_DEFAULT_RESULTS, INSTAGRAM_MAX_RESULTS
-from .schemas import InstagramResponse
-from .utils import run_actor, get_default_proxy
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec, first_field
+
+from .utils import run_actor, get_default_proxy, profile_handle
+
+POSTS_ENTITIES = EntitySpec(
+    input_key="directUrls",
+    entity_of=first_field("ownerUsername", "inputUrl", normalize=profile_handle),
+    normalize=profile_handle,
+)
 
 
 class InstagramPostsRequest(BaseModel):
@@ -55,24 +63,24 @@ def build_posts_input(request: InstagramPostsRequest) -> dict:
     }
 
 
-def scrape_posts(
-    client: ApifyClient,
+async def scrape_posts(
+    client: ApifyClientAsync,
     request: InstagramPostsRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Scrape posts from Instagram profiles.
 
     Returns: post images, captions, likes, comments count, etc.
     """
     actor_input = build_posts_input(request)
-    return run_actor(client, INSTAGRAM_ACTOR_ID, actor_input)
+    return await run_actor(client, INSTAGRAM_ACTOR_ID, actor_input, "posts", POSTS_ENTITIES)
 
 
-def get_user_posts(
-    client: ApifyClient,
+async def get_user_posts(
+    client: ApifyClientAsync,
     username: str,
     limit: int = INSTAGRAM_DEFAULT_RESULTS,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Get posts from a single user."""
     request = InstagramPostsRequest(usernames=[username], results_limit=limit)
-    return scrape_posts(client, request)
+    return await scrape_posts(client, request)
@@ -1,11 +1,19 @@
 """Instagram profile scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import INSTAGRAM_PROFILE_ACTOR_ID
-from .schemas import InstagramResponse
-from .utils import run_actor, get_default_proxy
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec, first_field
+
+from .utils import run_actor, get_default_proxy, profile_handle
+
+PROFILE_ENTITIES = EntitySpec(
+    input_key="usernames",
+    entity_of=first_field("username", normalize=profile_handle),
+    normalize=profile_handle,
+)
 
 
 class InstagramProfileRequest(BaseModel):
@@ -29,23 +37,25 @@ def build_profile_input(request: InstagramProfileRequest) -> dict:
     }
 
 
-def scrape_profiles(
-    client: ApifyClient,
+async def scrape_profiles(
+    client: ApifyClientAsync,
     request: InstagramProfileRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Scrape Instagram profile metadata.
 
     Returns: bio, followers, following, posts count, etc.
     """
     actor_input = build_profile_input(request)
-    return run_actor(client, INSTAGRAM_PROFILE_ACTOR_ID, actor_input)
+    return await run_actor(
+        client, INSTAGRAM_PROFILE_ACTOR_ID, actor_input, "profile", PROFILE_ENTITIES
+    )
 
 
-def get_profile(
-    client: ApifyClient,
+async def get_profile(
+    client: ApifyClientAsync,
     username: str,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Get a single profile's metadata."""
     request = InstagramProfileRequest(usernames=[username])
-    return scrape_profiles(client, request)
+    return await scrape_profiles(client, request)
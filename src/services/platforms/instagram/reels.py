@@ -2,12 +2,16 @@
 
 from typing import Optional
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import INSTAGRAM_ACTOR_ID, INSTAGRAM_DEFAULT_RESULTS, INSTAGRAM_MAX_RESULTS
-from .schemas import InstagramResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
 from .utils import run_actor, get_default_proxy
 
+REELS_SHARDS = EntitySpec(input_key="directUrls")
+
 
 class InstagramReelsRequest(BaseModel):
     """Request to scrape reels from profiles."""
@@ -57,24 +61,24 @@ def build_reels_input(request: InstagramReelsRequest) -> dict:
     }
 
 
-def scrape_reels(
-    client: ApifyClient,
+async def scrape_reels(
+    client: ApifyClientAsync,
     request: InstagramReelsRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Scrape reels from Instagram profiles.
 
     Returns: reel videos, views, likes, etc.
     """
     actor_input = build_reels_input(request)
-    return run_actor(client, INSTAGRAM_ACTOR_ID, actor_input)
+    return await run_actor(client, INSTAGRAM_ACTOR_ID, actor_input, "reels", shards=REELS_SHARDS)
 
 
-def get_user_reels(
-    client: ApifyClient,
+async def get_user_reels(
+    client: ApifyClientAsync,
     username: str,
     limit: int = INSTAGRAM_DEFAULT_RESULTS,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Get reels from a single user."""
     request = InstagramReelsRequest(usernames=[username], results_limit=limit)
-    return scrape_reels(client, request)
+    return await scrape_reels(client, request)
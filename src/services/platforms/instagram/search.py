@@ -1,11 +1,12 @@
 """Instagram search service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import INSTAGRAM_ACTOR_ID
 from .types import InstagramSearchType
-from .schemas import InstagramResponse
 from .utils import run_actor, get_default_proxy
 
 
@@ -44,56 +45,56 @@ def build_search_input(request: InstagramSearchRequest) -> dict:
     }
 
 
-def search(
-    client: ApifyClient,
+async def search(
+    client: ApifyClientAsync,
     request: InstagramSearchRequest,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """
     Search Instagram for users, hashtags, or places.
 
     Returns: search results based on type.
     """
     actor_input = build_search_input(request)
-    return run_actor(client, INSTAGRAM_ACTOR_ID, actor_input)
+    return await run_actor(client, INSTAGRAM_ACTOR_ID, actor_input, "search")
 
 
-def search_users(
-    client: ApifyClient,
+async def search_users(
+    client: ApifyClientAsync,
     query: str,
     limit: int = 10,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Search for Instagram users."""
     request = InstagramSearchRequest(
         query=query,
         search_type=InstagramSearchType.USER,
         results_limit=limit,
     )
-    return search(client, request)
+    return await search(client, request)
 
 
-def search_hashtags(
-    client: ApifyClient,
+async def search_hashtags(
+    client: ApifyClientAsync,
     query: str,
     limit: int = 10,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Search for Instagram hashtags."""
     request = InstagramSearchRequest(
         query=query,
         search_type=InstagramSearchType.HASHTAG,
         results_limit=limit,
     )
-    return search(client, request)
+    return await search(client, request)
 
 
-def search_places(
-    client: ApifyClient,
+async def search_places(
+    client: ApifyClientAsync,
     query: str,
     limit: int = 10,
-) -> InstagramResponse:
+) -> ActorRunStream:
     """Search for Instagram places/locations."""
     request = InstagramSearchRequest(
         query=query,
         search_type=InstagramSearchType.PLACE,
         results_limit=limit,
     )
-    return search(client, request)
+    return await search(client, request)
@@ -1,31 +1,29 @@
 """Instagram utility functions."""
 
-from apify_client import ApifyClient
+from src.services.entity_cache import url_id
+from src.services.executor import ActorExecutor
 
-from .schemas import InstagramResponse
+executor = ActorExecutor("instagram")
 
+run_actor = executor.stream
 
-def run_actor(client: ApifyClient, actor_id: str, actor_input: dict) -> InstagramResponse:
-    """Execute an Apify actor and return results."""
-    run = client.actor(actor_id).call(run_input=actor_input)
+_profile_url = url_id(r"instagram\.com/([^/?#]+)")
 
-    dataset_id = run.get("defaultDatasetId")
-    items = []
+post_shortcode = url_id(r"instagram\.com/(?:p|reels?|tv)/([^/?#]+)")
 
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
 
-    return InstagramResponse(
-        success=True,
-        data=items,
-        total_results=len(items),
-        run_id=run.get("id"),
-    )
+def profile_handle(value: str) -> str:
+    """Lowercased username of a profile URL, ``@handle`` or username."""
+    return _profile_url(value).lstrip("@").lower()
 
 
 def get_default_proxy() -> dict:
-    """Get default proxy configuration."""
+    """
+    Get default proxy configuration.
+
+    The proxy group is chosen per run by ``src.services.proxy_policy``; the
+    one here is only used with ``PROXY_POLICY_ENABLED=false``.
+    """
     return {
         "useApifyProxy": True,
         "apifyProxyGroups": ["RESIDENTIAL"],
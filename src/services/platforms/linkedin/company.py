@@ -1,12 +1,16 @@
 """LinkedIn company posts scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import LINKEDIN_ACTOR_ID, LINKEDIN_DEFAULT_RESULTS, LINKEDIN_MAX_RESULTS
-from .schemas import LinkedInResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
 from .utils import run_actor
 
+COMPANY_SHARDS = EntitySpec(input_key="profileUrls")
+
 
 class LinkedInCompanyRequest(BaseModel):
     """Request to scrape LinkedIn company posts."""
@@ -50,12 +54,12 @@ def build_company_input(request: LinkedInCompanyRequest) -> dict:
 
 
 async def scrape_company_posts(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     company_url: str,
     limit: int = LINKEDIN_DEFAULT_RESULTS,
     include_comments: bool = False,
     include_reactions: bool = True,
-) -> LinkedInResponse:
+) -> ActorRunStream:
     """
     Scrape posts from a LinkedIn company page.
 
@@ -67,7 +71,7 @@ async def scrape_company_posts(
         include_reactions: Include reactions
 
     Returns:
-        LinkedInResponse with company posts
+        Stream of company posts
     """
     request = LinkedInCompanyRequest(
         company_url=company_url,
@@ -76,4 +80,4 @@ async def scrape_company_posts(
         include_reactions=include_reactions,
     )
     actor_input = build_company_input(request)
-    return run_actor(client, LINKEDIN_ACTOR_ID, actor_input)
+    return await run_actor(client, LINKEDIN_ACTOR_ID, actor_input, "company", shards=COMPANY_SHARDS)
@@ -1,12 +1,16 @@
 """LinkedIn profile posts scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import LINKEDIN_ACTOR_ID, LINKEDIN_DEFAULT_RESULTS, LINKEDIN_MAX_RESULTS
-from .schemas import LinkedInResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
 from .utils import run_actor
 
+PROFILE_SHARDS = EntitySpec(input_key="profileUrls")
+
 
 class LinkedInProfileRequest(BaseModel):
     """Request to scrape LinkedIn profile posts."""
@@ -50,12 +54,12 @@ def build_profile_input(request: LinkedInProfileRequest) -> dict:
 
 
 async def scrape_profile_posts(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     profile_url: str,
     limit: int = LINKEDIN_DEFAULT_RESULTS,
     include_comments: bool = False,
     include_reactions: bool = True,
-) -> LinkedInResponse:
+) -> ActorRunStream:
     """
     Scrape posts from a LinkedIn profile.
 
@@ -67,7 +71,7 @@ async def scrape_profile_posts(
         include_reactions: Include reactions
 
     Returns:
-        LinkedInResponse with profile posts
+        Stream of profile posts
     """
     request = LinkedInProfileRequest(
         profile_url=profile_url,
@@ -76,4 +80,4 @@ async def scrape_profile_posts(
         include_reactions=include_reactions,
     )
     actor_input = build_profile_input(request)
-    return run_actor(client, LINKEDIN_ACTOR_ID, actor_input)
+    return await run_actor(client, LINKEDIN_ACTOR_ID, actor_input, "profile", shards=PROFILE_SHARDS)
@@ -1,16 +1,7 @@
 """LinkedIn request/response schemas."""
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from src.schemas.responses import ScrapeResponse
 
 
-class LinkedInResponse(BaseModel):
+class LinkedInResponse(ScrapeResponse):
     """Response schema for LinkedIn scraping results."""
-
-    success: bool
-    data: list[dict]
-    total_results: int = Field(alias="totalResults")
-    run_id: Optional[str] = Field(default=None, alias="runId")
-
-    class Config:
-        populate_by_name = True
@@ -1,10 +1,11 @@
 """LinkedIn search service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import LINKEDIN_ACTOR_ID, LINKEDIN_DEFAULT_RESULTS, LINKEDIN_MAX_RESULTS
-from .schemas import LinkedInResponse
 from .utils import run_actor
 
 
@@ -31,10 +32,10 @@ def build_search_input(request: LinkedInSearchRequest) -> dict:
 
 
 async def search_posts(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     query: str,
     limit: int = LINKEDIN_DEFAULT_RESULTS,
-) -> LinkedInResponse:
+) -> ActorRunStream:
     """
     Search LinkedIn posts.
 
@@ -44,8 +45,8 @@ async def search_posts(
         limit: Maximum number of results
 
     Returns:
-        LinkedInResponse with search results
+        Stream of search results
     """
     request = LinkedInSearchRequest(query=query, limit=limit)
     actor_input = build_search_input(request)
-    return run_actor(client, LINKEDIN_ACTOR_ID, actor_input)
+    return await run_actor(client, LINKEDIN_ACTOR_ID, actor_input, "search")
@@ -1,10 +1,11 @@
 """Meta Ads page ads scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import META_ADS_ACTOR_ID, META_ADS_DEFAULT_RESULTS, META_ADS_MAX_RESULTS
-from .schemas import MetaAdsResponse
 from .utils import run_actor
 
 
@@ -44,12 +45,12 @@ def build_page_ads_input(request: MetaAdsPageRequest) -> dict:
 
 
 async def scrape_page_ads(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     page_url: str,
     limit: int = META_ADS_DEFAULT_RESULTS,
     country: str = "ALL",
     ad_type: str = "all",
-) -> MetaAdsResponse:
+) -> ActorRunStream:
     """
     Scrape ads from a Facebook Page.
 
@@ -61,7 +62,7 @@ async def scrape_page_ads(
         ad_type: Type of ads
 
     Returns:
-        MetaAdsResponse with page ads
+        Stream of page ads
     """
     request = MetaAdsPageRequest(
         page_url=page_url,
@@ -70,4 +71,4 @@ async def scrape_page_ads(
         ad_type=ad_type,
     )
     actor_input = build_page_ads_input(request)
-    return run_actor(client, META_ADS_ACTOR_ID, actor_input)
+    return await run_actor(client, META_ADS_ACTOR_ID, actor_input, "page_ads")
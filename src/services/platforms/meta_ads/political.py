@@ -1,10 +1,11 @@
 """Meta Ads political ads scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import META_ADS_ACTOR_ID, META_ADS_DEFAULT_RESULTS, META_ADS_MAX_RESULTS
-from .schemas import MetaAdsResponse
 from .utils import run_actor
 
 
@@ -36,10 +37,10 @@ def build_political_input(request: MetaAdsPoliticalRequest) -> dict:
 
 
 async def scrape_political_ads(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     country: str = "US",
     limit: int = META_ADS_DEFAULT_RESULTS,
-) -> MetaAdsResponse:
+) -> ActorRunStream:
     """
     Scrape political and issue ads.
 
@@ -49,11 +50,11 @@ async def scrape_political_ads(
         limit: Maximum number of ads
 
     Returns:
-        MetaAdsResponse with political ads
+        Stream of political ads
     """
     request = MetaAdsPoliticalRequest(
         country=country,
         limit=limit,
     )
     actor_input = build_political_input(request)
-    return run_actor(client, META_ADS_ACTOR_ID, actor_input)
+    return await run_actor(client, META_ADS_ACTOR_ID, actor_input, "political")
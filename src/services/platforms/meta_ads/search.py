@@ -3,10 +3,11 @@
 from typing import Optional
 from datetime import date
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import META_ADS_ACTOR_ID, META_ADS_DEFAULT_RESULTS, META_ADS_MAX_RESULTS
-from .schemas import MetaAdsResponse
 from .utils import run_actor
 
 
@@ -59,14 +60,14 @@ def build_search_input(request: MetaAdsSearchRequest) -> dict:
 
 
 async def search_ads(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     query: str,
     limit: int = META_ADS_DEFAULT_RESULTS,
     country: str = "ALL",
     ad_type: str = "all",
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-) -> MetaAdsResponse:
+) -> ActorRunStream:
     """
     Search ads in the Ad Library.
 
@@ -80,7 +81,7 @@ async def search_ads(
         end_date: Filter ads until this date
 
     Returns:
-        MetaAdsResponse with search results
+        Stream of search results
     """
     request = MetaAdsSearchRequest(
         query=query,
@@ -91,4 +92,4 @@ async def search_ads(
         end_date=end_date,
     )
     actor_input = build_search_input(request)
-    return run_actor(client, META_ADS_ACTOR_ID, actor_input)
+    return await run_actor(client, META_ADS_ACTOR_ID, actor_input, "search")
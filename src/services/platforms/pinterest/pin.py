@@ -1,12 +1,24 @@
 """Pinterest pin details service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import PINTEREST_ACTOR_ID
-from .schemas import PinterestResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec, first_field, url_id
+
 from .utils import run_actor, get_default_proxy
 
+pin_id = url_id(r"/pin/(\d+)")
+
+PIN_ENTITIES = EntitySpec(
+    input_key="startUrls",
+    entity_of=first_field("id", "url", "link", normalize=pin_id),
+    normalize=pin_id,
+    wrapped=True,
+    per_entity_limits=("maxItems",),
+)
+
 
 class PinterestPinRequest(BaseModel):
     """Request to get Pinterest pin details."""
@@ -30,9 +42,9 @@ def build_pin_input(request: PinterestPinRequest) -> dict:
 
 
 async def get_pin(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     pin_url: str,
-) -> PinterestResponse:
+) -> ActorRunStream:
     """
     Get Pinterest pin details.
 
@@ -41,8 +53,8 @@ async def get_pin(
         pin_url: Pinterest pin URL
 
     Returns:
-        PinterestResponse with pin details
+        Stream of pin details
     """
     request = PinterestPinRequest(pin_url=pin_url)
     actor_input = build_pin_input(request)
-    return run_actor(client, PINTEREST_ACTOR_ID, actor_input)
+    return await run_actor(client, PINTEREST_ACTOR_ID, actor_input, "pin", PIN_ENTITIES)
@@ -1,10 +1,11 @@
 """Pinterest profile scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import PINTEREST_ACTOR_ID, PINTEREST_DEFAULT_RESULTS, PINTEREST_MAX_RESULTS
-from .schemas import PinterestResponse
 from .utils import run_actor, get_default_proxy
 
 
@@ -35,10 +36,10 @@ def build_profile_input(request: PinterestProfileRequest) -> dict:
 
 
 async def scrape_profile(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     profile_url: str,
     limit: int = PINTEREST_DEFAULT_RESULTS,
-) -> PinterestResponse:
+) -> ActorRunStream:
     """
     Scrape pins from a Pinterest profile.
 
@@ -48,8 +49,8 @@ async def scrape_profile(
         limit: Maximum number of pins
 
     Returns:
-        PinterestResponse with profile pins
+        Stream of profile pins
     """
     request = PinterestProfileRequest(profile_url=profile_url, limit=limit)
     actor_input = build_profile_input(request)
-    return run_actor(client, PINTEREST_ACTOR_ID, actor_input)
+    return await run_actor(client, PINTEREST_ACTOR_ID, actor_input, "profile")
@@ -1,16 +1,7 @@
 """Pinterest request/response schemas."""
 
-from pydantic import BaseModel, Field
-from typing import Optional
+from src.schemas.responses import ScrapeResponse
 
 
-class PinterestResponse(BaseModel):
+class PinterestResponse(ScrapeResponse):
     """Response schema for Pinterest scraping results."""
-
-    success: bool
-    data: list[dict]
-    total_results: int = Field(alias="totalResults")
-    run_id: Optional[str] = Field(default=None, alias="runId")
-
-    class Config:
-        populate_by_name = True
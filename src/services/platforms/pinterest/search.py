@@ -1,10 +1,11 @@
 """Pinterest search service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import PINTEREST_ACTOR_ID, PINTEREST_DEFAULT_RESULTS, PINTEREST_MAX_RESULTS
-from .schemas import PinterestResponse
 from .utils import run_actor, get_default_proxy
 
 
@@ -33,10 +34,10 @@ def build_search_input(request: PinterestSearchRequest) -> dict:
 
 
 async def search(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     query: str,
     limit: int = PINTEREST_DEFAULT_RESULTS,
-) -> PinterestResponse:
+) -> ActorRunStream:
     """
     Search Pinterest pins.
 
@@ -46,8 +47,8 @@ async def search(
         limit: Maximum number of results
 
     Returns:
-        PinterestResponse with search results
+        Stream of search results
     """
     request = PinterestSearchRequest(query=query, limit=limit)
     actor_input = build_search_input(request)
-    return run_actor(client, PINTEREST_ACTOR_ID, actor_input)
+    return await run_actor(client, PINTEREST_ACTOR_ID, actor_input, "search")
@@ -1,31 +1,19 @@
 """Pinterest utility functions."""
 
-from apify_client import ApifyClient
+from src.services.executor import ActorExecutor
 
-from .schemas import PinterestResponse
+executor = ActorExecutor("pinterest")
 
-
-def run_actor(client: ApifyClient, actor_id: str, actor_input: dict) -> PinterestResponse:
-    """Execute an Apify actor and return results."""
-    run = client.actor(actor_id).call(run_input=actor_input)
-
-    dataset_id = run.get("defaultDatasetId")
-    items = []
-
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
-
-    return PinterestResponse(
-        success=True,
-        data=items,
-        total_results=len(items),
-        run_id=run.get("id"),
-    )
+run_actor = executor.stream
 
 
 def get_default_proxy() -> dict:
-    """Get default proxy configuration."""
+    """
+    Get default proxy configuration.
+
+    The proxy group is chosen per run by ``src.services.proxy_policy``; the
+    one here is only used with ``PROXY_POLICY_ENABLED=false``.
+    """
     return {
         "useApifyProxy": True,
     }
@@ -1,10 +1,11 @@
 """Threads hashtag scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import THREADS_ACTOR_ID, THREADS_DEFAULT_RESULTS, THREADS_MAX_RESULTS
-from .schemas import ThreadsResponse
 from .utils import run_actor
 
 
@@ -31,10 +32,10 @@ def build_hashtag_input(request: ThreadsHashtagRequest) -> dict:
 
 
 async def scrape_hashtag(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     hashtag: str,
     limit: int = THREADS_DEFAULT_RESULTS,
-) -> ThreadsResponse:
+) -> ActorRunStream:
     """
     Scrape threads by hashtag.
 
@@ -44,8 +45,8 @@ async def scrape_hashtag(
         limit: Maximum number of threads
 
     Returns:
-        ThreadsResponse with hashtag threads
+        Stream of hashtag threads
     """
     request = ThreadsHashtagRequest(hashtag=hashtag, limit=limit)
     actor_input = build_hashtag_input(request)
-    return run_actor(client, THREADS_ACTOR_ID, actor_input)
+    return await run_actor(client, THREADS_ACTOR_ID, actor_input, "hashtag")
@@ -1,10 +1,11 @@
 """Threads profile scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import THREADS_ACTOR_ID, THREADS_DEFAULT_RESULTS, THREADS_MAX_RESULTS
-from .schemas import ThreadsResponse
 from .utils import run_actor
 
 
@@ -31,10 +32,10 @@ def build_profile_input(request: ThreadsProfileRequest) -> dict:
 
 
 async def scrape_profile(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     username: str,
     limit: int = THREADS_DEFAULT_RESULTS,
-) -> ThreadsResponse:
+) -> ActorRunStream:
     """
     Scrape threads from a user profile.
 
@@ -44,8 +45,8 @@ async def scrape_profile(
         limit: Maximum number of threads
 
     Returns:
-        ThreadsResponse with profile threads
+        Stream of profile threads
     """
     request = ThreadsProfileRequest(username=username, limit=limit)
     actor_input = build_profile_input(request)
-    return run_actor(client, THREADS_ACTOR_ID, actor_input)
+    return await run_actor(client, THREADS_ACTOR_ID, actor_input, "profile")
@@ -1,10 +1,11 @@
 """Threads search service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import THREADS_ACTOR_ID, THREADS_DEFAULT_RESULTS, THREADS_MAX_RESULTS
-from .schemas import ThreadsResponse
 from .utils import run_actor
 
 
@@ -31,10 +32,10 @@ def build_search_input(request: ThreadsSearchRequest) -> dict:
 
 
 async def search(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     query: str,
     limit: int = THREADS_DEFAULT_RESULTS,
-) -> ThreadsResponse:
+) -> ActorRunStream:
     """
     Search Threads.
 
@@ -44,8 +45,8 @@ async def search(
         limit: Maximum number of results
 
     Returns:
-        ThreadsResponse with search results
+        Stream of search results
     """
     request = ThreadsSearchRequest(query=query, limit=limit)
     actor_input = build_search_input(request)
-    return run_actor(client, THREADS_ACTOR_ID, actor_input)
+    return await run_actor(client, THREADS_ACTOR_ID, actor_input, "search")
@@ -1,10 +1,11 @@
 """Threads thread details service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import THREADS_ACTOR_ID
-from .schemas import ThreadsResponse
 from .utils import run_actor
 
 
@@ -38,10 +39,10 @@ def build_thread_input(request: ThreadsThreadRequest) -> dict:
 
 
 async def get_thread(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     thread_url: str,
     include_replies: bool = False,
-) -> ThreadsResponse:
+) -> ActorRunStream:
     """
     Get thread details.
 
@@ -51,11 +52,11 @@ async def get_thread(
         include_replies: Include replies
 
     Returns:
-        ThreadsResponse with thread details
+        Stream of thread details
     """
     request = ThreadsThreadRequest(
         thread_url=thread_url,
         include_replies=include_replies,
     )
     actor_input = build_thread_input(request)
-    return run_actor(client, THREADS_ACTOR_ID, actor_input)
+    return await run_actor(client, THREADS_ACTOR_ID, actor_input, "thread")
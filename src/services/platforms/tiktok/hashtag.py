@@ -1,9 +1,12 @@
 """TikTok hashtag scraping service."""
 
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import TIKTOK_ACTOR_ID, TIKTOK_DEFAULT_RESULTS
-from .schemas import TikTokHashtagRequest, TikTokResponse
+from .schemas import TikTokHashtagRequest
+from .utils import run_actor
 
 
 def build_hashtag_input(request: TikTokHashtagRequest) -> dict:
@@ -15,10 +18,10 @@ def build_hashtag_input(request: TikTokHashtagRequest) -> dict:
 
 
 async def scrape_hashtag(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     hashtag: str,
     limit: int = TIKTOK_DEFAULT_RESULTS,
-) -> TikTokResponse:
+) -> ActorRunStream:
     """
     Scrape TikTok videos by hashtag.
 
@@ -28,23 +31,8 @@ async def scrape_hashtag(
         limit: Maximum number of results
 
     Returns:
-        TikTokResponse with videos
+        Stream of videos
     """
     request = TikTokHashtagRequest(hashtag=hashtag, limit=limit)
     actor_input = build_hashtag_input(request)
-
-    run = client.actor(TIKTOK_ACTOR_ID).call(run_input=actor_input)
-
-    dataset_id = run.get("defaultDatasetId")
-    items = []
-
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
-
-    return TikTokResponse(
-        success=True,
-        data=items,
-        total_results=len(items),
-        run_id=run.get("id"),
-    )
+    return await run_actor(client, TIKTOK_ACTOR_ID, actor_input, "hashtag")
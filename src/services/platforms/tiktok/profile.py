@@ -1,9 +1,15 @@
 """TikTok profile scraping service."""
 
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import TIKTOK_ACTOR_ID, TIKTOK_DEFAULT_RESULTS
-from .schemas import TikTokProfileRequest, TikTokResponse
+from .schemas import TikTokProfileRequest
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
+from .utils import run_actor
+
+PROFILE_SHARDS = EntitySpec(input_key="profiles")
 
 
 def build_profile_input(request: TikTokProfileRequest) -> dict:
@@ -15,10 +21,10 @@ def build_profile_input(request: TikTokProfileRequest) -> dict:
 
 
 async def scrape_profile(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     username: str,
     limit: int = TIKTOK_DEFAULT_RESULTS,
-) -> TikTokResponse:
+) -> ActorRunStream:
     """
     Scrape TikTok profile and videos.
 
@@ -28,23 +34,8 @@ async def scrape_profile(
         limit: Maximum number of videos
 
     Returns:
-        TikTokResponse with profile and videos
+        Stream of profile and videos
     """
     request = TikTokProfileRequest(username=username, limit=limit)
     actor_input = build_profile_input(request)
-
-    run = client.actor(TIKTOK_ACTOR_ID).call(run_input=actor_input)
-
-    dataset_id = run.get("defaultDatasetId")
-    items = []
-
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
-
-    return TikTokResponse(
-        success=True,
-        data=items,
-        total_results=len(items),
-        run_id=run.get("id"),
-    )
+    return await run_actor(client, TIKTOK_ACTOR_ID, actor_input, "profile", shards=PROFILE_SHARDS)
@@ -1,7 +1,8 @@
 """TikTok request/response schemas."""
 
 from pydantic import BaseModel, Field
-from typing import Optional
+
+from src.schemas.responses import ScrapeResponse
 
 from .constants import TIKTOK_DEFAULT_RESULTS, TIKTOK_MAX_RESULTS_PER_PAGE
 from .types import TikTokSearchType, TikTokSortType
@@ -62,13 +63,5 @@ class TikTokVideoRequest(BaseModel):
         populate_by_name = True
 
 
-class TikTokResponse(BaseModel):
+class TikTokResponse(ScrapeResponse):
     """Response schema for TikTok scraping results."""
-
-    success: bool
-    data: list[dict]
-    total_results: int = Field(alias="totalResults")
-    run_id: Optional[str] = Field(default=None, alias="runId")
-
-    class Config:
-        populate_by_name = True
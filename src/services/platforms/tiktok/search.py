@@ -1,10 +1,13 @@
 """TikTok search service."""
 
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import TIKTOK_ACTOR_ID, TIKTOK_DEFAULT_RESULTS
 from .types import TikTokSearchType
-from .schemas import TikTokSearchRequest, TikTokResponse
+from .schemas import TikTokSearchRequest
+from .utils import run_actor
 
 
 def build_search_input(request: TikTokSearchRequest) -> dict:
@@ -17,11 +20,11 @@ def build_search_input(request: TikTokSearchRequest) -> dict:
 
 
 async def search(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     query: str,
     search_type: TikTokSearchType = TikTokSearchType.TOP,
     limit: int = TIKTOK_DEFAULT_RESULTS,
-) -> TikTokResponse:
+) -> ActorRunStream:
     """
     Search TikTok.
 
@@ -32,7 +35,7 @@ async def search(
         limit: Maximum number of results
 
     Returns:
-        TikTokResponse with search results
+        Stream of search results
     """
     request = TikTokSearchRequest(
         query=query,
@@ -40,19 +43,4 @@ async def search(
         limit=limit,
     )
     actor_input = build_search_input(request)
-
-    run = client.actor(TIKTOK_ACTOR_ID).call(run_input=actor_input)
-
-    dataset_id = run.get("defaultDatasetId")
-    items = []
-
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
-
-    return TikTokResponse(
-        success=True,
-        data=items,
-        total_results=len(items),
-        run_id=run.get("id"),
-    )
+    return await run_actor(client, TIKTOK_ACTOR_ID, actor_input, "search")
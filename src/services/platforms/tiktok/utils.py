@@ -0,0 +1,7 @@
+"""TikTok utility functions."""
+
+from src.services.executor import ActorExecutor
+
+executor = ActorExecutor("tiktok")
+
+run_actor = executor.stream
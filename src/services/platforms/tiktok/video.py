@@ -1,9 +1,21 @@
 """TikTok video details service."""
 
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import TIKTOK_ACTOR_ID
-from .schemas import TikTokVideoRequest, TikTokResponse
+from .schemas import TikTokVideoRequest
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec, first_field, url_id
+
+from .utils import run_actor
+
+video_id = url_id(r"/video/(\d+)")
+
+VIDEO_ENTITIES = EntitySpec(
+    input_key="postURLs",
+    entity_of=first_field("id", "webVideoUrl", "submittedVideoUrl", normalize=video_id),
+    normalize=video_id,
+)
 
 
 def build_video_input(request: TikTokVideoRequest) -> dict:
@@ -15,9 +27,9 @@ def build_video_input(request: TikTokVideoRequest) -> dict:
 
 
 async def get_video(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     url: str,
-) -> TikTokResponse:
+) -> ActorRunStream:
     """
     Get TikTok video details.
 
@@ -26,23 +38,8 @@ async def get_video(
         url: TikTok video URL
 
     Returns:
-        TikTokResponse with video details
+        Stream of video details
     """
     request = TikTokVideoRequest(url=url)
     actor_input = build_video_input(request)
-
-    run = client.actor(TIKTOK_ACTOR_ID).call(run_input=actor_input)
-
-    dataset_id = run.get("defaultDatasetId")
-    items = []
-
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
-
-    return TikTokResponse(
-        success=True,
-        data=items,
-        total_results=len(items),
-        run_id=run.get("id"),
-    )
+    return await run_actor(client, TIKTOK_ACTOR_ID, actor_input, "video", VIDEO_ENTITIES)
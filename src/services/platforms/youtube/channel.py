@@ -1,12 +1,16 @@
 """YouTube channel scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import YOUTUBE_ACTOR_ID, YOUTUBE_DEFAULT_RESULTS, YOUTUBE_MAX_RESULTS
-from .schemas import YouTubeResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
 from .utils import run_actor
 
+CHANNEL_SHARDS = EntitySpec(input_key="startUrls", wrapped=True)
+
 
 class YouTubeChannelRequest(BaseModel):
     """Request to scrape YouTube channel."""
@@ -48,12 +52,12 @@ def build_channel_input(request: YouTubeChannelRequest) -> dict:
 
 
 async def scrape_channel(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     channel_url: str,
     limit: int = YOUTUBE_DEFAULT_RESULTS,
     include_shorts: bool = True,
     include_streams: bool = True,
-) -> YouTubeResponse:
+) -> ActorRunStream:
     """
     Scrape videos from a YouTube channel.
 
@@ -65,7 +69,7 @@ async def scrape_channel(
         include_streams: Include live streams
 
     Returns:
-        YouTubeResponse with channel videos
+        Stream of channel videos
     """
     request = YouTubeChannelRequest(
         channel_url=channel_url,
@@ -74,4 +78,4 @@ async def scrape_channel(
         include_streams=include_streams,
     )
     actor_input = build_channel_input(request)
-    return run_actor(client, YOUTUBE_ACTOR_ID, actor_input)
+    return await run_actor(client, YOUTUBE_ACTOR_ID, actor_input, "channel", shards=CHANNEL_SHARDS)
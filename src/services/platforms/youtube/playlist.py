@@ -1,12 +1,16 @@
 """YouTube playlist scraping service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import YOUTUBE_ACTOR_ID, YOUTUBE_DEFAULT_RESULTS, YOUTUBE_MAX_RESULTS
-from .schemas import YouTubeResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec
+
 from .utils import run_actor
 
+PLAYLIST_SHARDS = EntitySpec(input_key="startUrls", wrapped=True)
+
 
 class YouTubePlaylistRequest(BaseModel):
     """Request to scrape YouTube playlist."""
@@ -34,10 +38,10 @@ def build_playlist_input(request: YouTubePlaylistRequest) -> dict:
 
 
 async def scrape_playlist(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     playlist_url: str,
     limit: int = YOUTUBE_DEFAULT_RESULTS,
-) -> YouTubeResponse:
+) -> ActorRunStream:
     """
     Scrape videos from a YouTube playlist.
 
@@ -47,11 +51,13 @@ async def scrape_playlist(
         limit: Maximum number of videos
 
     Returns:
-        YouTubeResponse with playlist videos
+        Stream of playlist videos
     """
     request = YouTubePlaylistRequest(
         playlist_url=playlist_url,
         limit=limit,
     )
     actor_input = build_playlist_input(request)
-    return run_actor(client, YOUTUBE_ACTOR_ID, actor_input)
+    return await run_actor(
+        client, YOUTUBE_ACTOR_ID, actor_input, "playlist", shards=PLAYLIST_SHARDS
+    )
@@ -1,10 +1,11 @@
 """YouTube search service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
+
+from src.services.actor_runner import ActorRunStream
 
 from .constants import YOUTUBE_ACTOR_ID, YOUTUBE_DEFAULT_RESULTS, YOUTUBE_MAX_RESULTS
-from .schemas import YouTubeResponse
 from .utils import run_actor
 
 
@@ -36,11 +37,11 @@ def build_search_input(request: YouTubeSearchRequest) -> dict:
 
 
 async def search(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     query: str,
     limit: int = YOUTUBE_DEFAULT_RESULTS,
     include_shorts: bool = True,
-) -> YouTubeResponse:
+) -> ActorRunStream:
     """
     Search YouTube videos.
 
@@ -51,7 +52,7 @@ async def search(
         include_shorts: Include YouTube Shorts
 
     Returns:
-        YouTubeResponse with search results
+        Stream of search results
     """
     request = YouTubeSearchRequest(
         query=query,
@@ -59,4 +60,4 @@ async def search(
         include_shorts=include_shorts,
     )
     actor_input = build_search_input(request)
-    return run_actor(client, YOUTUBE_ACTOR_ID, actor_input)
+    return await run_actor(client, YOUTUBE_ACTOR_ID, actor_input, "search")
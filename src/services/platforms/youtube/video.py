@@ -1,12 +1,23 @@
 """YouTube video details service."""
 
 from pydantic import BaseModel, Field
-from apify_client import ApifyClient
+from apify_client import ApifyClientAsync
 
 from .constants import YOUTUBE_ACTOR_ID
-from .schemas import YouTubeResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.entity_cache import EntitySpec, first_field, url_id
+
 from .utils import run_actor
 
+video_id = url_id(r"(?:v=|youtu\.be/|/shorts/|/embed/)([\w-]{11})")
+
+VIDEO_ENTITIES = EntitySpec(
+    input_key="startUrls",
+    entity_of=first_field("id", "url", normalize=video_id),
+    normalize=video_id,
+    wrapped=True,
+)
+
 
 class YouTubeVideoRequest(BaseModel):
     """Request to get YouTube video details."""
@@ -39,11 +50,11 @@ def build_video_input(request: YouTubeVideoRequest) -> dict:
 
 
 async def get_video(
-    client: ApifyClient,
+    client: ApifyClientAsync,
     video_url: str,
     include_comments: bool = False,
     max_comments: int = 100,
-) -> YouTubeResponse:
+) -> ActorRunStream:
     """
     Get YouTube video details.
 
@@ -54,7 +65,7 @@ async def get_video(
         max_comments: Maximum comments to fetch
 
     Returns:
-        YouTubeResponse with video details
+        Stream of video details
     """
     request = YouTubeVideoRequest(
         video_url=video_url,
@@ -62,4 +73,4 @@ async def get_video(
         max_comments=max_comments,
     )
     actor_input = build_video_input(request)
-    return run_actor(client, YOUTUBE_ACTOR_ID, actor_input)
+    return await run_actor(client, YOUTUBE_ACTOR_ID, actor_input, "video", VIDEO_ENTITIES)
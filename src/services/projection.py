@@ -0,0 +1,75 @@
+"""Field projection of dataset items.
+
+Callers that only need a few fields pass ``fields``/``omit``/``clean``; the
+projection is sent with the Apify dataset request so unwanted fields are never
+downloaded. Results that were already fetched in full (cache hits, entity
+lookups) are projected locally with the same rules.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Union
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Top-level fields to keep or drop from every dataset item."""
+
+    fields: tuple[str, ...] = ()
+    omit: tuple[str, ...] = ()
+    clean: bool = False
+    """Skip empty items and hidden fields (names starting with ``#``)."""
+
+    def __bool__(self) -> bool:
+        return bool(self.fields or self.omit or self.clean)
+
+    @classmethod
+    def parse(
+        cls,
+        fields: Optional[Union[list[str], str]] = None,
+        omit: Optional[Union[list[str], str]] = None,
+        clean: bool = False,
+    ) -> "Projection":
+        """Build a projection from lists or comma-separated strings."""
+        return cls(fields=_split(fields), omit=_split(omit), clean=clean)
+
+    def dataset_params(self) -> dict:
+        """Keyword arguments for ``DatasetClient.list_items``."""
+        return {
+            "fields": list(self.fields) or None,
+            "omit": list(self.omit) or None,
+            "clean": self.clean or None,
+        }
+
+    def cache_key(self, key: str) -> str:
+        """Cache key for results read with this projection."""
+        if not self:
+            return key
+        spec = f"{','.join(self.fields)}|{','.join(self.omit)}|{int(self.clean)}"
+        return f"{key}:p:{hashlib.sha256(spec.encode()).hexdigest()[:16]}"
+
+    def apply(self, items: list[dict]) -> list[dict]:
+        """Project items that were fetched in full."""
+        if not self:
+            return items
+
+        projected = []
+        for item in items:
+            if self.clean:
+                item = {k: v for k, v in item.items() if not k.startswith("#")}
+                if not item:
+                    continue
+            if self.fields:
+                item = {k: item[k] for k in self.fields if k in item}
+            if self.omit:
+                item = {k: v for k, v in item.items() if k not in self.omit}
+            projected.append(item)
+        return projected
+
+
+def _split(value: Optional[Union[list[str], str]]) -> tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(name.strip() for name in value if name.strip())
@@ -0,0 +1,229 @@
+"""Adaptive choice of the Apify Proxy group of actor runs.
+
+Residential proxies are slow and expensive, and many operations succeed on
+datacenter IPs just as well. Instead of a fixed group, every run whose input
+uses Apify Proxy gets a group from a ladder, cheapest first:
+``PROXY_GROUPS`` (``AUTO`` being Apify's datacenter pool, i.e. no group),
+overridden per operation or platform by ``PROXY_GROUP_OVERRIDES`` (e.g.
+``{"instagram.comments": ["RESIDENTIAL"]}``).
+
+The outcome, duration and cost of each run are recorded per actor,
+operation and group. Each actor and operation starts at the bottom of its
+ladder and:
+
+- escalates one group up when fewer than ``PROXY_MIN_SUCCESS_RATE`` of the
+  last ``PROXY_MIN_SAMPLES`` runs on its group succeeded (or, with
+  ``PROXY_MAX_P90_SECS``, when they got too slow);
+- sends ``PROXY_PROBE_RATIO`` of its runs to the group below, and demotes to
+  it once its last ``PROXY_MIN_SAMPLES`` runs there are good again.
+
+Aborted runs say nothing about the proxy (most are aborted by this API:
+disconnected clients, deadlines, hedge losers) and are not recorded.
+
+With ``PROXY_POLICY_ENABLED=false`` (or without Redis) inputs are sent as
+built, with the proxy of each platform's ``get_default_proxy``.
+"""
+
+import json
+import logging
+import math
+import random
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import (
+    PROXY_GROUP_CHANGES,
+    PROXY_GROUP_LEVEL,
+    PROXY_RUN_COST_USD,
+    PROXY_RUN_SECONDS,
+    PROXY_RUNS,
+)
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LEVEL_PREFIX = "proxy:level:"
+SAMPLES_PREFIX = "proxy:samples:"
+RUN_PREFIX = "proxy:run:"
+
+# Ladder entry for Apify's automatic datacenter proxies (no group)
+AUTO = "AUTO"
+
+# Recent runs kept per actor, operation and group
+MAX_SAMPLES = 50
+
+# A started run that never reports back is forgotten after this long
+RUN_TTL_SECS = 24 * 3600
+
+
+def groups_for(operation: Optional[str]) -> list[str]:
+    """
+    Proxy groups of an operation such as ``"instagram.profile"``, cheapest first.
+
+    Lookup order: ``platform.operation`` override, ``operation`` override,
+    ``platform`` override, ``PROXY_GROUPS``.
+    """
+    settings = get_settings()
+    if operation:
+        overrides = settings.proxy_group_overrides
+        for candidate in (operation, operation.rsplit(".", 1)[-1], operation.split(".", 1)[0]):
+            if candidate in overrides:
+                return overrides[candidate]
+    return settings.proxy_groups
+
+
+async def choose_proxy(
+    actor_id: str,
+    operation: Optional[str],
+    actor_input: dict,
+) -> tuple[dict, Optional[str]]:
+    """
+    The input to start a run with, and the proxy group chosen for it.
+
+    Inputs that don't use Apify Proxy are returned as they are, without a group.
+    """
+    proxy = actor_input.get("proxy")
+    groups = groups_for(operation)
+    # Without Redis there is no history to move the ladder with
+    if get_redis() is None or not get_settings().proxy_policy_enabled:
+        return actor_input, None
+    if not isinstance(proxy, dict) or not groups:
+        return actor_input, None
+    if not proxy.get("useApifyProxy"):
+        return actor_input, None
+
+    level = min(await _level(actor_id, operation), len(groups) - 1)
+    PROXY_GROUP_LEVEL.labels(operation=operation or actor_id).set(level)
+    if level > 0 and random.random() < get_settings().proxy_probe_ratio:
+        level -= 1
+    group = groups[level]
+
+    proxy = {k: v for k, v in proxy.items() if k != "apifyProxyGroups"}
+    if group != AUTO:
+        proxy["apifyProxyGroups"] = [group]
+    return {**actor_input, "proxy": proxy}, group
+
+
+async def remember_proxy(
+    run: dict,
+    actor_id: str,
+    operation: Optional[str],
+    group: Optional[str],
+) -> None:
+    """Note the group a started run uses, for recording its outcome."""
+    redis = get_redis()
+    if redis is None or group is None or not run.get("id"):
+        return
+    try:
+        await redis.set(
+            RUN_PREFIX + run["id"],
+            json.dumps({"actor_id": actor_id, "operation": operation, "group": group}),
+            ex=RUN_TTL_SECS,
+        )
+    except RedisError as e:
+        logger.warning("Redis unavailable for proxy policy: %s", e)
+
+
+async def record_proxy_outcome(run: Optional[dict]) -> None:
+    """Record how a finished run did on its group and move its ladder; later calls are no-ops."""
+    redis = get_redis()
+    if redis is None or not run or not run.get("id"):
+        return
+    try:
+        started = await redis.getdel(RUN_PREFIX + run["id"])
+    except RedisError as e:
+        logger.warning("Redis unavailable for proxy policy: %s", e)
+        return
+    if started is None or run.get("status") == "ABORTED":
+        return
+
+    started = json.loads(started)
+    actor_id, operation, group = started["actor_id"], started["operation"], started["group"]
+    label = operation or actor_id
+    stats = run.get("stats") or {}
+    sample = {
+        "ok": run.get("status") == "SUCCEEDED",
+        "duration": stats.get("runTimeSecs") or 0,
+        "cost": run.get("usageTotalUsd") or 0,
+    }
+    PROXY_RUNS.labels(operation=label, group=group, outcome="ok" if sample["ok"] else "failed").inc()
+    PROXY_RUN_SECONDS.labels(operation=label, group=group).observe(sample["duration"])
+    PROXY_RUN_COST_USD.labels(operation=label, group=group).inc(sample["cost"])
+
+    key = _samples_key(actor_id, operation, group)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(key, json.dumps(sample))
+            pipe.ltrim(key, 0, MAX_SAMPLES - 1)
+            await pipe.execute()
+        await _adjust(actor_id, operation, group)
+    except RedisError as e:
+        logger.warning("Could not record proxy outcome of run %s: %s", run["id"], e)
+
+
+async def _adjust(actor_id: str, operation: Optional[str], group: str) -> None:
+    """Escalate off a bad current group, or demote to a good group below it."""
+    groups = groups_for(operation)
+    if group not in groups:
+        return
+    level = min(await _level(actor_id, operation), len(groups) - 1)
+    at = groups.index(group)
+    verdict = await _verdict(actor_id, operation, group)
+
+    if at == level and verdict is False and level < len(groups) - 1:
+        await _set_level(actor_id, operation, level + 1, "escalate")
+    elif at == level - 1 and verdict is True:
+        await _set_level(actor_id, operation, level - 1, "demote")
+
+
+async def _verdict(actor_id: str, operation: Optional[str], group: str) -> Optional[bool]:
+    """Whether the recent runs on a group are good; ``None`` without enough of them."""
+    settings = get_settings()
+    samples = [
+        json.loads(s)
+        for s in await get_redis().lrange(
+            _samples_key(actor_id, operation, group), 0, settings.proxy_min_samples - 1
+        )
+    ]
+    if len(samples) < settings.proxy_min_samples:
+        return None
+
+    success_rate = sum(s["ok"] for s in samples) / len(samples)
+    if success_rate < settings.proxy_min_success_rate:
+        return False
+    if settings.proxy_max_p90_secs:
+        durations = sorted(s["duration"] for s in samples if s["ok"])
+        p90 = durations[min(len(durations) - 1, math.ceil(0.9 * len(durations)) - 1)] if durations else 0
+        if p90 > settings.proxy_max_p90_secs:
+            return False
+    return True
+
+
+async def _level(actor_id: str, operation: Optional[str]) -> int:
+    redis = get_redis()
+    if redis is None:
+        return 0
+    try:
+        return int(await redis.get(_level_key(actor_id, operation)) or 0)
+    except RedisError as e:
+        logger.warning("Redis unavailable for proxy policy: %s", e)
+        return 0
+
+
+async def _set_level(actor_id: str, operation: Optional[str], level: int, change: str) -> None:
+    groups = groups_for(operation)
+    label = operation or actor_id
+    await get_redis().set(_level_key(actor_id, operation), level)
+    PROXY_GROUP_CHANGES.labels(operation=label, change=change).inc()
+    PROXY_GROUP_LEVEL.labels(operation=label).set(level)
+    logger.info("Proxy group of %s (%s): %s -> %s", label, actor_id, change, groups[level])
+
+
+def _level_key(actor_id: str, operation: Optional[str]) -> str:
+    return f"{LEVEL_PREFIX}{actor_id}:{operation or actor_id}"
+
+
+def _samples_key(actor_id: str, operation: Optional[str], group: str) -> str:
+    return f"{SAMPLES_PREFIX}{actor_id}:{operation or actor_id}:{group}"
@@ -0,0 +1,28 @@
+"""Process-wide async Redis connection shared by the run layer."""
+
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.config import get_settings
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Optional[Redis]:
+    """Get the shared Redis client, or ``None`` when Redis is not configured."""
+    global _redis
+    if _redis is None:
+        settings = get_settings()
+        if not settings.redis_url:
+            return None
+        _redis = Redis.from_url(settings.redis_url)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,267 @@
+"""Cost and resource stats of the actor runs this API starts.
+
+Every started run is tagged with its platform, operation, input size (see
+``src.services.run_sizing.input_size``), caller (``api`` for API
+requests, ``job`` for Celery jobs) and tenant (``X-Tenant-Id``, if any). Once it finishes, its Apify usage
+(``usageTotalUsd``), compute units, run time and peak memory are recorded;
+once its dataset is first read to the end, its item count is.
+
+Both are exported as Prometheus metrics (``actor_run_*``) and summed per
+UTC day, operation, caller and tenant in Redis for ``RUN_STATS_RETENTION_DAYS``,
+which ``run_stats`` aggregates for ``/api/v1/admin/runs/stats``: cost and
+run time per item and per run, to rank operations by what they burn.
+"""
+
+import json
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import (
+    ACTOR_RUN_COMPUTE_UNITS,
+    ACTOR_RUN_COST_USD,
+    ACTOR_RUN_INPUT_SIZE,
+    ACTOR_RUN_ITEMS,
+    ACTOR_RUN_PEAK_MEMORY,
+    ACTOR_RUN_SECONDS,
+    ACTOR_RUNS_FINISHED,
+)
+from src.services.redis_client import get_redis
+from src.services.run_options import get_run_options
+from src.services.run_sizing import input_size
+
+logger = logging.getLogger(__name__)
+
+RUN_PREFIX = "costs:run:"
+DAY_PREFIX = "costs:day:"
+INDEX_PREFIX = "costs:index:"
+
+# A started run that never reports back is forgotten after this long
+RUN_TTL_SECS = 24 * 3600
+
+# Unit costs are looked up again after this long
+UNIT_COSTS_TTL_SECS = 60
+
+# Summed per day, operation, caller and tenant
+TOTALS = ("runs", "succeeded", "usd", "compute_units", "run_secs", "peak_mbytes", "input_size", "items")
+
+
+def platform_of(operation: Optional[str]) -> str:
+    """Platform of an operation such as ``"instagram.profile"``."""
+    if not operation or "." not in operation:
+        return "unknown"
+    return operation.split(".", 1)[0]
+
+
+async def remember_cost(
+    run: dict,
+    actor_id: str,
+    operation: Optional[str],
+    actor_input: dict,
+) -> None:
+    """Tag a started run for recording its stats once it finishes."""
+    redis = get_redis()
+    if redis is None or not run.get("id"):
+        return
+    tags = {
+        "operation": operation or actor_id,
+        "platform": platform_of(operation),
+        "caller": "api" if get_run_options().interactive else "job",
+        "tenant": get_run_options().tenant,
+        "input_size": input_size(actor_input),
+    }
+    try:
+        await redis.hset(RUN_PREFIX + run["id"], "tags", json.dumps(tags))
+        await redis.expire(RUN_PREFIX + run["id"], RUN_TTL_SECS)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run costs: %s", e)
+
+
+async def record_run_cost(run: Optional[dict]) -> None:
+    """Record the usage and resource stats of a finished run; later calls are no-ops."""
+    tags = await _claim(run, "cost")
+    if tags is None:
+        return
+
+    stats = run.get("stats") or {}
+    labels = {k: tags[k] for k in ("platform", "operation", "caller")}
+    usd = run.get("usageTotalUsd") or 0
+    compute_units = stats.get("computeUnits") or 0
+    run_secs = stats.get("runTimeSecs") or 0
+    peak_mbytes = (stats.get("memMaxBytes") or 0) / 2**20
+
+    ACTOR_RUNS_FINISHED.labels(**labels, status=run.get("status") or "UNKNOWN").inc()
+    ACTOR_RUN_COST_USD.labels(**labels).inc(usd)
+    ACTOR_RUN_COMPUTE_UNITS.labels(**labels).inc(compute_units)
+    ACTOR_RUN_SECONDS.labels(**labels).observe(run_secs)
+    ACTOR_RUN_PEAK_MEMORY.labels(tags["platform"], tags["operation"]).observe(peak_mbytes)
+    ACTOR_RUN_INPUT_SIZE.labels(tags["platform"], tags["operation"]).observe(tags["input_size"])
+
+    await _add(tags, {
+        "runs": 1,
+        "succeeded": int(run.get("status") == "SUCCEEDED"),
+        "usd": usd,
+        "compute_units": compute_units,
+        "run_secs": run_secs,
+        "peak_mbytes": peak_mbytes,
+        "input_size": tags["input_size"],
+    })
+
+
+async def record_run_items(run: dict, count: int) -> None:
+    """Record the item count of a run whose dataset was read to the end; later calls are no-ops."""
+    tags = await _claim(run, "items")
+    if tags is None:
+        return
+    ACTOR_RUN_ITEMS.labels(tags["platform"], tags["operation"], tags["caller"]).inc(count)
+    await _add(tags, {"items": count})
+
+
+async def run_stats(
+    days: int = 1,
+    by_caller: bool = False,
+    by_tenant: bool = False,
+) -> Optional[list[dict]]:
+    """
+    Totals of the last ``days`` UTC days per operation (and caller, and
+    tenant), with per-item and per-run ratios; ``None`` without Redis.
+    """
+    redis = get_redis()
+    if redis is None:
+        return None
+    days = max(1, min(days, get_settings().run_stats_retention_days))
+    now = time.time()
+
+    try:
+        totals = await _totals(redis, [_day(now - i * 86400) for i in range(days)])
+    except RedisError as e:
+        logger.warning("Redis unavailable for run costs: %s", e)
+        return None
+
+    groups: dict[tuple, dict] = {}
+    for operation, caller, tenant, values in totals:
+        caller = caller if by_caller else None
+        tenant = tenant if by_tenant else None
+        group = groups.setdefault((operation, caller, tenant), {
+            "operation": operation,
+            "platform": platform_of(operation),
+            "caller": caller,
+            "tenant": tenant,
+            **{name: 0.0 for name in TOTALS},
+        })
+        for name, value in values.items():
+            if name in TOTALS:
+                group[name] += value
+
+    for group in groups.values():
+        runs, items = group["runs"], group["items"]
+        group["usd_per_run"] = group["usd"] / runs if runs else None
+        group["usd_per_item"] = group["usd"] / items if items else None
+        group["compute_units_per_item"] = group["compute_units"] / items if items else None
+        group["secs_per_item"] = group["run_secs"] / items if items else None
+        group["avg_run_secs"] = group["run_secs"] / runs if runs else None
+        group["avg_peak_mbytes"] = group["peak_mbytes"] / runs if runs else None
+        group["avg_input_size"] = group["input_size"] / runs if runs else None
+    return list(groups.values())
+
+
+async def unit_costs(operation: str) -> Optional[tuple[float, float]]:
+    """
+    USD and compute units per unit of input size of an operation's runs over
+    the last ``BUDGET_ESTIMATE_DAYS`` days; ``None`` until
+    ``RUN_SIZING_MIN_SAMPLES`` runs were recorded.
+    """
+    cached = _unit_costs.get(operation)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    redis = get_redis()
+    if redis is None:
+        return None
+
+    settings = get_settings()
+    now = time.time()
+    totals = dict.fromkeys(("runs", "usd", "compute_units", "input_size"), 0.0)
+    days = [_day(now - i * 86400) for i in range(settings.budget_estimate_days)]
+    try:
+        stored = await _totals(redis, days, operation)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run costs: %s", e)
+        return None
+    for _, _, _, values in stored:
+        for name in totals:
+            totals[name] += values.get(name, 0.0)
+
+    costs = None
+    if totals["runs"] >= settings.run_sizing_min_samples and totals["input_size"]:
+        costs = (totals["usd"] / totals["input_size"], totals["compute_units"] / totals["input_size"])
+    _unit_costs[operation] = (time.monotonic() + UNIT_COSTS_TTL_SECS, costs)
+    return costs
+
+
+_unit_costs: dict[str, tuple[float, Optional[tuple[float, float]]]] = {}
+
+
+async def _totals(
+    redis,
+    days: list[str],
+    operation: Optional[str] = None,
+) -> list[tuple[str, str, Optional[str], dict[str, float]]]:
+    """Stored totals of the given days (of one operation), as ``(operation, caller, tenant, totals)``."""
+    totals = []
+    for day in days:
+        for member in await redis.smembers(INDEX_PREFIX + day):
+            member = member.decode()
+            # Totals recorded before tenants were tagged have none
+            parts = member.split("|", 2)
+            stored_operation, caller = parts[0], parts[1]
+            tenant = parts[2] if len(parts) > 2 else ""
+            if operation is not None and stored_operation != operation:
+                continue
+            values = await redis.hgetall(f"{DAY_PREFIX}{day}:{member}")
+            totals.append((
+                stored_operation,
+                caller,
+                tenant or None,
+                {k.decode(): float(v) for k, v in values.items()},
+            ))
+    return totals
+
+
+async def _claim(run: Optional[dict], what: str) -> Optional[dict]:
+    """Tags of a run started by this API, the first time ``what`` is recorded for it."""
+    redis = get_redis()
+    if redis is None or not run or not run.get("id"):
+        return None
+    key = RUN_PREFIX + run["id"]
+    try:
+        tags = await redis.hget(key, "tags")
+        if tags is None or not await redis.hsetnx(key, what, 1):
+            return None
+    except RedisError as e:
+        logger.warning("Redis unavailable for run costs: %s", e)
+        return None
+    return json.loads(tags)
+
+
+async def _add(tags: dict, values: dict) -> None:
+    day = _day(time.time())
+    member = f"{tags['operation']}|{tags['caller']}|{tags.get('tenant') or ''}"
+    key = f"{DAY_PREFIX}{day}:{member}"
+    ttl = (get_settings().run_stats_retention_days + 1) * 86400
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            for name, value in values.items():
+                pipe.hincrbyfloat(key, name, value)
+            pipe.expire(key, ttl)
+            pipe.sadd(INDEX_PREFIX + day, member)
+            pipe.expire(INDEX_PREFIX + day, ttl)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not record run costs: %s", e)
+
+
+def _day(timestamp: float) -> str:
+    return time.strftime("%Y%m%d", time.gmtime(timestamp))
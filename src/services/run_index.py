@@ -0,0 +1,199 @@
+"""Index of recent successful actor runs, for reusing their datasets.
+
+Apify keeps the dataset of every run, so a run with the same actor and
+canonical input that succeeded recently can answer a request without starting
+a new one, even once its result left the cache (too large to cache, evicted,
+or read with another projection).
+
+Runs are indexed by run key when this API reads them to the end. With
+``RUN_REUSE_LIST_RECENT`` the index is also filled by listing the actor's
+recent runs (at most once per ``RUN_REUSE_SYNC_SECS``), so runs started by
+other tools on the same Apify account are reused too. The listing runs in the
+background, started by an index miss: the request that missed starts a new
+run, and later ones find the listed runs.
+
+A run is reused while it is younger than the operation's cache TTL (lowered
+by the ``max_age`` run option); ``cache_bypass`` always starts a new run.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+from apify_client import ApifyClientAsync
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import ACTOR_RUNS_REUSED
+from src.services.redis_client import get_redis
+from src.services.run_keys import run_key
+from src.services.run_options import get_run_options
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "runs:recent:"
+LISTED_PREFIX = "runs:listed:"
+SYNC_PREFIX = "runs:sync:"
+
+# Strong references to background listings so they are not garbage collected
+_sync_tasks: set[asyncio.Task] = set()
+
+
+def reuse_age(ttl: int) -> int:
+    """Maximum age of a reusable run for a result with cache TTL ``ttl``."""
+    options = get_run_options()
+    if options.cache_bypass or not get_settings().run_reuse_enabled:
+        return 0
+    if options.max_age is not None:
+        return min(ttl, options.max_age)
+    return ttl
+
+
+async def find_recent_run(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    max_age: int,
+) -> Optional[dict]:
+    """A succeeded run of the same actor and input that finished within ``max_age`` seconds."""
+    if max_age <= 0:
+        return None
+
+    run = await _lookup(run_key(actor_id, actor_input), max_age)
+    if run is None:
+        if get_settings().run_reuse_list_recent:
+            _sync_later(client, actor_id)
+        return None
+
+    source = "listed" if run.pop("listed", False) else "index"
+    ACTOR_RUNS_REUSED.labels(actor_id=actor_id, source=source).inc()
+    logger.debug("Reusing run %s of %s", run["id"], actor_id)
+    return run
+
+
+def _sync_later(client: ApifyClientAsync, actor_id: str) -> None:
+    """List the actor's recent runs in the background, off the request path."""
+    task = asyncio.create_task(index_recent_runs(client, actor_id))
+    _sync_tasks.add(task)
+    task.add_done_callback(_sync_tasks.discard)
+
+
+async def record_run(key: str, run: dict, listed: bool = False) -> None:
+    """
+    Index a succeeded run under its run key, unless a newer one is indexed.
+
+    ``listed`` marks runs found by listing the actor's runs, for the metrics.
+    """
+    redis = get_redis()
+    if redis is None or not get_settings().run_reuse_enabled or not run.get("defaultDatasetId"):
+        return
+
+    finished_at = _timestamp(run.get("finishedAt")) or time.time()
+    entry = {
+        "id": run["id"],
+        "status": "SUCCEEDED",
+        "defaultDatasetId": run["defaultDatasetId"],
+        "finishedAt": datetime.fromtimestamp(finished_at, timezone.utc).isoformat(),
+    }
+    if listed:
+        entry["listed"] = True
+    try:
+        current = await redis.get(INDEX_PREFIX + key)
+        if current is not None and _timestamp(json.loads(current)["finishedAt"]) >= finished_at:
+            return
+        await redis.set(
+            INDEX_PREFIX + key,
+            json.dumps(entry),
+            ex=get_settings().run_reuse_max_age_secs,
+        )
+    except RedisError as e:
+        logger.warning("Could not index run %s: %s", run["id"], e)
+
+
+async def index_recent_runs(client: ApifyClientAsync, actor_id: str) -> None:
+    """
+    Index the actor's recent succeeded runs, whoever started them.
+
+    Only one process lists an actor per ``RUN_REUSE_SYNC_SECS``; the input of
+    each run (its ``INPUT`` record) is fetched once.
+    """
+    settings = get_settings()
+    redis = get_redis()
+    if redis is None:
+        return
+
+    try:
+        claimed = await redis.set(
+            SYNC_PREFIX + actor_id, "1", nx=True, ex=settings.run_reuse_sync_secs
+        )
+    except RedisError as e:
+        logger.warning("Redis unavailable for run index: %s", e)
+        return
+    if not claimed:
+        return
+
+    since = datetime.fromtimestamp(time.time() - settings.run_reuse_max_age_secs, timezone.utc)
+    try:
+        page = await client.actor(actor_id).runs().list(
+            status="SUCCEEDED",
+            desc=True,
+            limit=settings.run_reuse_list_limit,
+            started_after=since,
+        )
+    except Exception as e:
+        logger.warning("Could not list recent runs of %s: %s", actor_id, e)
+        return
+
+    try:
+        listed = LISTED_PREFIX + actor_id
+        runs = [
+            run for run in page.items
+            if run.get("defaultKeyValueStoreId") and not await redis.sismember(listed, run["id"])
+        ]
+        if runs:
+            await redis.sadd(listed, *[run["id"] for run in runs])
+            await redis.expire(listed, settings.run_reuse_max_age_secs)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run index: %s", e)
+        return
+
+    await asyncio.gather(*(_index_listed_run(client, actor_id, run) for run in runs))
+
+
+async def _index_listed_run(client: ApifyClientAsync, actor_id: str, run: dict) -> None:
+    try:
+        record = await client.key_value_store(run["defaultKeyValueStoreId"]).get_record("INPUT")
+    except Exception as e:
+        logger.warning("Could not read the input of run %s: %s", run["id"], e)
+        return
+
+    actor_input = (record or {}).get("value")
+    if isinstance(actor_input, dict):
+        await record_run(run_key(actor_id, actor_input), run, listed=True)
+
+
+async def _lookup(key: str, max_age: int) -> Optional[dict]:
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        payload = await redis.get(INDEX_PREFIX + key)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run index: %s", e)
+        return None
+
+    if payload is None:
+        return None
+    entry = json.loads(payload)
+    if time.time() - _timestamp(entry["finishedAt"]) > max_age:
+        return None
+    return entry
+
+
+def _timestamp(value: Optional[Union[datetime, str]]) -> Optional[float]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.timestamp() if value else None
@@ -0,0 +1,33 @@
+"""Canonical keys for actor runs.
+
+Two runs of the same actor with the same input (regardless of dict key order
+or unset optional fields) map to the same key, so they can share work.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+
+def normalize_input(value: Any) -> Any:
+    """Recursively sort dict keys and drop ``None`` values."""
+    if isinstance(value, dict):
+        return {
+            key: normalize_input(item)
+            for key, item in sorted(value.items())
+            if item is not None
+        }
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(item) for item in value]
+    return value
+
+
+def run_key(actor_id: str, actor_input: dict) -> str:
+    """Stable hash of (actor_id, normalized input)."""
+    payload = json.dumps(
+        {"actor": actor_id, "input": normalize_input(actor_input)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,192 @@
+"""Per-request options for actor runs.
+
+Platform routers resolve the options from query parameters and headers with
+the ``run_options`` dependency, and the shared runner reads them back with
+``get_run_options()``, so service functions don't have to pass them along.
+Celery tasks set them explicitly with ``use_run_options``.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Literal, Optional
+
+from fastapi import Header, HTTPException, Query
+
+from src.services.projection import Projection
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Caller preferences that apply to every actor run of a request."""
+
+    cache_bypass: bool = False
+    max_age: Optional[int] = None
+    max_stale: Optional[int] = None
+    stream: Optional[str] = None
+    tail: bool = False
+    projection: Projection = field(default_factory=Projection)
+    deadline: Optional[float] = None
+    """Unix time by which the caller wants an answer."""
+    on_deadline: Literal["partial", "job"] = "partial"
+    """What a caller whose deadline passed gets besides the items read so far."""
+    interactive: bool = False
+    """Set for API requests (not jobs); only their runs are hedged."""
+    tenant: Optional[str] = None
+    """
+    Tenant whose budget the runs count against (``X-Tenant-Id``). The header is
+    trusted as sent, so a gateway in front of the API must set it.
+    """
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the deadline (negative once it passed), if there is one."""
+        return None if self.deadline is None else self.deadline - time.time()
+
+
+_run_options: ContextVar[RunOptions] = ContextVar("run_options", default=RunOptions())
+
+
+def get_run_options() -> RunOptions:
+    """Get the options of the current request or task."""
+    return _run_options.get()
+
+
+def background_options(**changes) -> RunOptions:
+    """
+    Options for work a request starts on behalf of others (refreshes, batches).
+
+    The request's deadline, hedging and projection are left out, so they do
+    not cut the shared run short; its tenant is kept for cost attribution.
+    """
+    return RunOptions(tenant=get_run_options().tenant, **changes)
+
+
+@contextmanager
+def use_run_options(options: RunOptions):
+    """Apply ``options`` to actor runs started inside the block."""
+    token = _run_options.set(options)
+    try:
+        yield options
+    finally:
+        _run_options.reset(token)
+
+
+async def run_options(
+    x_cache_bypass: bool = Header(
+        default=False,
+        alias="X-Cache-Bypass",
+        description="Skip the result cache and run the actor again",
+    ),
+    cache_control: Optional[str] = Header(default=None, alias="Cache-Control"),
+    max_age: Optional[int] = Query(
+        default=None,
+        alias="maxAge",
+        ge=0,
+        description="Only accept cached data up to this many seconds old",
+    ),
+    max_stale: Optional[int] = Query(
+        default=None,
+        alias="maxStale",
+        ge=0,
+        description="Accept data up to this many seconds past expiry while it is refreshed (0 disables stale data)",
+    ),
+    stream: Optional[Literal["ndjson", "sse"]] = Query(
+        default=None,
+        description="Stream items one per line (ndjson) or as Server-Sent Events (sse), ending with a trailer",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated item fields to return, e.g. id,caption,likesCount",
+    ),
+    omit: Optional[str] = Query(
+        default=None,
+        description="Comma-separated item fields to leave out",
+    ),
+    clean: bool = Query(
+        default=False,
+        description="Skip empty items and hidden fields",
+    ),
+    x_request_deadline: Optional[str] = Header(
+        default=None,
+        alias="X-Request-Deadline",
+        description="Time by which to answer, as Unix seconds, ISO 8601 or an HTTP date",
+    ),
+    timeout: Optional[float] = Query(
+        default=None,
+        gt=0,
+        description="Seconds to wait for the run before answering with the items read so far",
+    ),
+    on_deadline: Literal["partial", "job"] = Query(
+        default="partial",
+        alias="onDeadline",
+        description=(
+            "When the deadline passes: stop the run (partial) or hand it to a job (job, HTTP 202 with jobId). "
+            "Requests split into several runs (long entity lists) always answer partial"
+        ),
+    ),
+    x_tenant_id: Optional[str] = Header(
+        default=None,
+        alias="X-Tenant-Id",
+        description="Tenant whose Apify budget the request counts against",
+    ),
+) -> RunOptions:
+    """Router dependency that sets the run options for the current request."""
+    directives = _parse_cache_control(cache_control)
+    options = RunOptions(
+        cache_bypass=x_cache_bypass or "no-cache" in directives or "no-store" in directives,
+        max_age=max_age if max_age is not None else directives.get("max-age"),
+        max_stale=max_stale if max_stale is not None else directives.get("max-stale"),
+        stream=stream,
+        # Streaming clients handle in-band errors, so they get items while the run is going
+        tail=stream is not None,
+        projection=Projection.parse(fields, omit, clean),
+        deadline=_deadline(x_request_deadline, timeout),
+        on_deadline=on_deadline,
+        interactive=True,
+        tenant=x_tenant_id,
+    )
+    # Async dependencies run in the endpoint's context, so the value set here
+    # is visible to the services called by the route.
+    _run_options.set(options)
+    return options
+
+
+def _deadline(header: Optional[str], timeout: Optional[float]) -> Optional[float]:
+    """The earlier of the ``X-Request-Deadline`` header and ``now + timeout``."""
+    deadlines = []
+    if timeout is not None:
+        deadlines.append(time.time() + timeout)
+    if header:
+        deadlines.append(_parse_deadline(header.strip()))
+    return min(deadlines, default=None)
+
+
+def _parse_deadline(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid X-Request-Deadline: {value}")
+
+
+def _parse_cache_control(value: Optional[str]) -> dict[str, Optional[int]]:
+    """Parse request Cache-Control directives, e.g. ``max-age=60, max-stale``."""
+    directives: dict[str, Optional[int]] = {}
+    if not value:
+        return directives
+
+    for part in value.split(","):
+        name, _, arg = part.strip().lower().partition("=")
+        directives[name] = int(arg) if arg.strip().isdigit() else None
+
+    return directives
@@ -0,0 +1,237 @@
+"""Retries with backoff and per-actor circuit breaking for actor runs.
+
+A run that fails for a transient reason (network error, Apify 5xx, run
+``FAILED``/``TIMED-OUT``) is started again by the runner, after a jittered
+exponential backoff, instead of the caller's retry paying for a whole new
+request. Retries are governed by a ``RunPolicy`` per operation:
+``RUN_RETRY_*`` settings, overridden per operation by ``RUN_POLICY_OVERRIDES``
+(e.g. ``{"youtube.channel": {"max_attempts": 1}}``).
+
+Failures are also counted per actor in Redis. ``BREAKER_FAILURE_THRESHOLD``
+failures within ``BREAKER_WINDOW_SECS`` open the actor's circuit: new runs
+fail fast with ``CircuitOpen`` for ``BREAKER_COOLDOWN_SECS``. Then a single
+probe run is let through; its success closes the circuit, its failure opens
+it again.
+
+Every run started by this API reports how it ended (``record_outcome``, from
+``run_finished``), whether it was awaited, tailed or parked for a job.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass, fields, replace
+from typing import Optional
+
+from apify_client.errors import ApifyApiError
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import BREAKER_OPENED, BREAKER_REJECTED, RUN_RETRIES
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+FAILURES_PREFIX = "breaker:failures:"
+OPEN_PREFIX = "breaker:open:"
+TRIAL_PREFIX = "breaker:trial:"
+PROBE_PREFIX = "breaker:probe:"
+RUN_PREFIX = "breaker:run:"
+
+# A started run that never reports back is forgotten after this long
+RUN_TTL_SECS = 24 * 3600
+
+# Transport errors of the HTTP libraries used by apify-client versions
+TRANSPORT_MODULES = ("httpx", "impit")
+
+
+class CircuitOpen(Exception):
+    """The actor failed too often lately; new runs are shed until it recovers."""
+
+    def __init__(self, actor_id: str, retry_after: int):
+        super().__init__(f"Circuit open for {actor_id}, retry in {retry_after}s")
+        self.actor_id = actor_id
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class RunPolicy:
+    """How runs of an operation are retried."""
+
+    max_attempts: int = 3
+    base_delay_secs: float = 1.0
+    max_delay_secs: float = 30.0
+    retry_statuses: tuple[str, ...] = ("FAILED", "TIMED-OUT")
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (full jitter)."""
+        return random.uniform(0, min(self.max_delay_secs, self.base_delay_secs * 2 ** (attempt - 1)))
+
+
+def policy_for(operation: Optional[str]) -> RunPolicy:
+    """
+    The retry policy of an operation such as ``"instagram.profile"``.
+
+    Lookup order: ``platform.operation`` override, ``operation`` override,
+    ``RUN_RETRY_*`` settings.
+    """
+    settings = get_settings()
+    policy = RunPolicy(
+        max_attempts=settings.run_retry_max_attempts,
+        base_delay_secs=settings.run_retry_base_delay_secs,
+        max_delay_secs=settings.run_retry_max_delay_secs,
+        retry_statuses=tuple(settings.run_retry_statuses),
+    )
+    if operation:
+        overrides = settings.run_policy_overrides
+        for candidate in (operation, operation.rsplit(".", 1)[-1]):
+            if candidate in overrides:
+                known = {f.name for f in fields(RunPolicy)}
+                values = {k: v for k, v in overrides[candidate].items() if k in known}
+                if "retry_statuses" in values:
+                    values["retry_statuses"] = tuple(values["retry_statuses"])
+                return replace(policy, **values)
+    return policy
+
+
+def is_transient(e: BaseException) -> bool:
+    """Whether an error starting or awaiting a run may go away on its own."""
+    if isinstance(e, ApifyApiError):
+        return e.status_code >= 500
+    if isinstance(e, (OSError, asyncio.TimeoutError)):
+        return True
+    return type(e).__module__.split(".")[0] in TRANSPORT_MODULES
+
+
+async def retry_delay(policy: RunPolicy, attempt: int, operation: Optional[str], reason: str) -> None:
+    """Wait before the next attempt and count the retry."""
+    RUN_RETRIES.labels(operation=operation or "unknown", reason=reason).inc()
+    await asyncio.sleep(policy.backoff(attempt))
+
+
+# =============================================================================
+# CIRCUIT BREAKER
+# =============================================================================
+
+async def check_circuit(actor_id: str) -> bool:
+    """
+    Raise ``CircuitOpen`` if runs of ``actor_id`` are being shed; returns
+    whether the run about to start is the probe of a half-open circuit.
+    """
+    settings = get_settings()
+    redis = get_redis()
+    if redis is None or not settings.breaker_enabled:
+        return False
+
+    try:
+        open_ttl = await redis.ttl(OPEN_PREFIX + actor_id)
+        if open_ttl > 0:
+            BREAKER_REJECTED.labels(actor_id=actor_id).inc()
+            raise CircuitOpen(actor_id, open_ttl)
+        # Half-open: one probe run at a time decides whether the actor recovered
+        if await redis.exists(TRIAL_PREFIX + actor_id):
+            probing = await redis.set(
+                PROBE_PREFIX + actor_id, "1", nx=True, ex=settings.breaker_cooldown_secs
+            )
+            if not probing:
+                BREAKER_REJECTED.labels(actor_id=actor_id).inc()
+                raise CircuitOpen(actor_id, settings.breaker_cooldown_secs)
+            return True
+    except RedisError as e:
+        logger.warning("Redis unavailable for circuit breaker: %s", e)
+    return False
+
+
+async def remember_run(run: dict, actor_id: str, operation: Optional[str], probe: bool) -> None:
+    """Note the actor of a started run, for reporting its outcome once it finishes."""
+    redis = get_redis()
+    if redis is None or not get_settings().breaker_enabled or not run.get("id"):
+        return
+    try:
+        await redis.set(
+            RUN_PREFIX + run["id"],
+            json.dumps({"actor_id": actor_id, "operation": operation, "probe": probe}),
+            ex=RUN_TTL_SECS,
+        )
+    except RedisError as e:
+        logger.warning("Redis unavailable for circuit breaker: %s", e)
+
+
+async def record_outcome(run: Optional[dict]) -> None:
+    """
+    Report how a finished run ended to its actor's circuit; later calls are no-ops.
+
+    Runs that succeeded close it, runs that ended in a retry status of their
+    operation count as failures. Other endings (an abort) count as neither,
+    but free the probe slot if the run was the probe.
+    """
+    redis = get_redis()
+    if redis is None or not run or not run.get("id"):
+        return
+    try:
+        started = await redis.getdel(RUN_PREFIX + run["id"])
+    except RedisError as e:
+        logger.warning("Redis unavailable for circuit breaker: %s", e)
+        return
+    if started is None:
+        return
+
+    started = json.loads(started)
+    actor_id, status = started["actor_id"], run.get("status")
+    if status == "SUCCEEDED":
+        await record_success(actor_id)
+    elif status in policy_for(started["operation"]).retry_statuses:
+        await record_failure(actor_id)
+    elif started["probe"]:
+        try:
+            await redis.delete(PROBE_PREFIX + actor_id)
+        except RedisError as e:
+            logger.warning("Redis unavailable for circuit breaker: %s", e)
+
+
+async def record_success(actor_id: str) -> None:
+    """Close the actor's circuit after a successful run."""
+    redis = get_redis()
+    if redis is None or not get_settings().breaker_enabled:
+        return
+    try:
+        await redis.delete(
+            FAILURES_PREFIX + actor_id, TRIAL_PREFIX + actor_id, PROBE_PREFIX + actor_id
+        )
+    except RedisError as e:
+        logger.warning("Redis unavailable for circuit breaker: %s", e)
+
+
+async def record_failure(actor_id: str) -> None:
+    """Count a failed run; opens the circuit past the threshold or on a failed probe."""
+    settings = get_settings()
+    redis = get_redis()
+    if redis is None or not settings.breaker_enabled:
+        return
+    try:
+        if await redis.exists(TRIAL_PREFIX + actor_id):
+            await _open(actor_id)
+            return
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(FAILURES_PREFIX + actor_id)
+            pipe.expire(FAILURES_PREFIX + actor_id, settings.breaker_window_secs, nx=True)
+            failures, _ = await pipe.execute()
+        if failures >= settings.breaker_failure_threshold:
+            await _open(actor_id)
+    except RedisError as e:
+        logger.warning("Redis unavailable for circuit breaker: %s", e)
+
+
+async def _open(actor_id: str) -> None:
+    settings = get_settings()
+    cooldown = settings.breaker_cooldown_secs
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.set(OPEN_PREFIX + actor_id, "1", ex=cooldown)
+        # Half-open once the cooldown is over, until a probe succeeds
+        pipe.set(TRIAL_PREFIX + actor_id, "1", ex=cooldown + settings.breaker_window_secs * 10)
+        pipe.delete(FAILURES_PREFIX + actor_id, PROBE_PREFIX + actor_id)
+        await pipe.execute()
+    BREAKER_OPENED.labels(actor_id=actor_id).inc()
+    logger.warning("Circuit opened for %s for %ss", actor_id, cooldown)
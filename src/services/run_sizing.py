@@ -0,0 +1,246 @@
+"""Memory and timeout sizing of actor runs from recorded run statistics.
+
+Without ``memory_mbytes``/``timeout_secs`` every run gets the actor default,
+so small lookups are over-provisioned and large scrapes run out of memory.
+The stats of every run this API starts (duration, compute units, peak memory)
+are recorded per actor, operation and input size bucket, and new runs are
+sized from them:
+
+- Memory: the level (a power of two, as Apify requires) with the lowest
+  ``median duration x median compute units`` among those that kept peak
+  memory under the level with ``RUN_MEMORY_HEADROOM``. A small share of runs
+  (``RUN_SIZING_EXPLORE_RATIO``) tries a neighbouring level so other
+  trade-offs get measured too.
+- Timeout: the p95 duration at that level times ``RUN_TIMEOUT_FACTOR``, and
+  at least twice as long as recent runs that timed out, so a retried
+  ``TIMED-OUT`` run gets more time.
+
+Both stay within the configured bounds. Until ``RUN_SIZING_MIN_SAMPLES``
+successful runs are recorded for a bucket, the actor defaults are used.
+"""
+
+import json
+import logging
+import math
+import random
+import statistics
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.metrics import ACTOR_RUN_MEMORY
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = "sizing:stats:"
+STARTED_PREFIX = "sizing:run:"
+
+# Recent runs kept per actor, operation and size bucket
+MAX_SAMPLES = 50
+# Started runs are forgotten if they never report back within this time
+STARTED_TTL_SECS = 24 * 3600
+
+# Input fields that cap how many items a run produces per entity
+LIMIT_FIELDS = (
+    "resultsLimit",
+    "resultsPerPage",
+    "maxItems",
+    "maxResults",
+    "maxPosts",
+    "maxComments",
+    "maxAds",
+)
+
+
+@dataclass
+class RunSizing:
+    """Run options for a new run; ``None`` keeps the actor default."""
+
+    memory_mbytes: Optional[int] = None
+    timeout_secs: Optional[int] = None
+
+
+def input_size(actor_input: dict) -> int:
+    """
+    Work an input asks for: the number of entities (items of list fields)
+    times the per-entity item limit.
+    """
+    entities = sum(len(value) for value in actor_input.values() if isinstance(value, list))
+    limits = [
+        value for name, value in actor_input.items()
+        if name in LIMIT_FIELDS and isinstance(value, int) and value > 0
+    ]
+    return max(entities, 1) * max(limits, default=1)
+
+
+def size_bucket(actor_input: dict) -> int:
+    """Order of magnitude (log2) of the work an input asks for."""
+    return int(math.log2(input_size(actor_input)))
+
+
+async def choose_sizing(actor_id: str, operation: Optional[str], actor_input: dict) -> RunSizing:
+    """Memory and timeout for a new run of ``actor_id`` with ``actor_input``."""
+    settings = get_settings()
+    if not settings.run_sizing_enabled:
+        return RunSizing()
+
+    samples = await _samples(_stats_key(actor_id, operation, size_bucket(actor_input)))
+    succeeded = [s for s in samples if s["status"] == "SUCCEEDED" and s.get("memory")]
+    if len(succeeded) < settings.run_sizing_min_samples:
+        return RunSizing()
+
+    memory = _choose_memory(samples, succeeded)
+    at_level = [s["duration"] for s in succeeded if s["memory"] == memory] or [
+        s["duration"] for s in succeeded
+    ]
+    timed_out = [s["duration"] for s in samples if s["status"] == "TIMED-OUT"]
+    timeout = _clamp(
+        math.ceil(max(_p95(at_level) * settings.run_timeout_factor, 2 * max(timed_out, default=0))),
+        settings.run_timeout_min_secs,
+        settings.run_timeout_max_secs,
+    )
+    ACTOR_RUN_MEMORY.labels(operation=operation or actor_id).observe(memory)
+    return RunSizing(memory_mbytes=memory, timeout_secs=timeout)
+
+
+async def remember_start(
+    run: dict,
+    actor_id: str,
+    operation: Optional[str],
+    actor_input: dict,
+) -> None:
+    """Note which stats bucket a started run reports to once it finishes."""
+    redis = get_redis()
+    if redis is None or not get_settings().run_sizing_enabled or not run.get("id"):
+        return
+    try:
+        await redis.set(
+            STARTED_PREFIX + run["id"],
+            json.dumps({
+                "stats": _stats_key(actor_id, operation, size_bucket(actor_input)),
+                "operation": operation or actor_id,
+            }),
+            ex=STARTED_TTL_SECS,
+        )
+    except RedisError as e:
+        logger.warning("Redis unavailable for run sizing: %s", e)
+
+
+async def record_run_stats(run: Optional[dict]) -> None:
+    """Record the stats of a finished run started by this API; later calls are no-ops."""
+    redis = get_redis()
+    if redis is None or not run or not run.get("id") or not run.get("stats"):
+        return
+
+    stats = run["stats"]
+    sample = {
+        "status": run.get("status"),
+        "memory": (run.get("options") or {}).get("memoryMbytes"),
+        "peak_mbytes": (stats.get("memMaxBytes") or 0) / 2**20,
+        "duration": stats.get("runTimeSecs") or 0,
+        "compute_units": stats.get("computeUnits") or 0,
+    }
+    try:
+        started = await redis.getdel(STARTED_PREFIX + run["id"])
+        if started is None:
+            return
+        key = json.loads(started)["stats"]
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(key, json.dumps(sample))
+            pipe.ltrim(key, 0, MAX_SAMPLES - 1)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not record stats of run %s: %s", run["id"], e)
+
+
+async def abort_savings(run: dict) -> tuple[Optional[str], float]:
+    """
+    Forget an aborted run and estimate the compute units its abort saved.
+
+    The estimate is the median compute units of the successful runs of its
+    bucket minus what the run used so far. Returns the run's operation (if it
+    was started by this API) and the estimate, 0 without history.
+    """
+    redis = get_redis()
+    if redis is None or not run.get("id"):
+        return None, 0.0
+    try:
+        started = await redis.getdel(STARTED_PREFIX + run["id"])
+    except RedisError as e:
+        logger.warning("Redis unavailable for run sizing: %s", e)
+        return None, 0.0
+    if started is None:
+        return None, 0.0
+
+    started = json.loads(started)
+    units = [s["compute_units"] for s in await _samples(started["stats"]) if s["status"] == "SUCCEEDED"]
+    if not units:
+        return started["operation"], 0.0
+    used = (run.get("stats") or {}).get("computeUnits") or 0
+    return started["operation"], max(0.0, statistics.median(units) - used)
+
+
+async def run_durations(actor_id: str, operation: Optional[str], actor_input: dict) -> list[float]:
+    """Durations of recent successful runs like this one (same actor, operation and size)."""
+    samples = await _samples(_stats_key(actor_id, operation, size_bucket(actor_input)))
+    return [s["duration"] for s in samples if s["status"] == "SUCCEEDED"]
+
+
+def _choose_memory(samples: list[dict], succeeded: list[dict]) -> int:
+    settings = get_settings()
+    headroom = settings.run_memory_headroom
+
+    # Smallest level that fits the observed peak, above any level that ran out of memory
+    floor = _level(_p95([s["peak_mbytes"] for s in succeeded]) * headroom)
+    for s in samples:
+        if s["status"] != "SUCCEEDED" and s.get("memory") and s["peak_mbytes"] * headroom >= s["memory"]:
+            floor = max(floor, _level(s["memory"] * 2))
+
+    by_level: dict[int, list[dict]] = {}
+    for s in succeeded:
+        if s["memory"] >= floor:
+            by_level.setdefault(s["memory"], []).append(s)
+
+    memory = floor
+    if by_level:
+        memory = min(by_level, key=lambda level: (
+            statistics.median(s["duration"] for s in by_level[level])
+            * statistics.median(s["compute_units"] for s in by_level[level])
+        ))
+
+    if random.random() < settings.run_sizing_explore_ratio:
+        memory = random.choice([m for m in (memory // 2, memory * 2) if m >= floor] or [memory])
+
+    return _clamp(memory, settings.run_memory_min_mbytes, settings.run_memory_max_mbytes)
+
+
+def _level(mbytes: float) -> int:
+    """Smallest power of two of at least ``mbytes`` (Apify memory levels)."""
+    return 2 ** max(7, math.ceil(math.log2(max(mbytes, 1))))
+
+
+def _p95(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
+
+
+def _stats_key(actor_id: str, operation: Optional[str], bucket: int) -> str:
+    return f"{STATS_PREFIX}{actor_id}:{operation or actor_id}:{bucket}"
+
+
+async def _samples(key: str) -> list[dict]:
+    redis = get_redis()
+    if redis is None:
+        return []
+    try:
+        return [json.loads(sample) for sample in await redis.lrange(key, 0, -1)]
+    except RedisError as e:
+        logger.warning("Redis unavailable for run sizing: %s", e)
+        return []
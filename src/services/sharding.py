@@ -0,0 +1,146 @@
+"""Sharded fan-out of large input lists into concurrent actor runs.
+
+One run over hundreds of usernames or URLs works through them serially, and a
+single bad entity can time out the whole run. Inputs whose entity list (as
+described by an ``EntitySpec``) is longer than the shard size are split into
+shards of at most ``SHARD_SIZE`` entities, run concurrently (up to
+``SHARD_MAX_CONCURRENCY`` at a time per request), and merged in input order
+with duplicate items removed.
+
+When some shards fail, the items of the others are returned with
+``partial=True``; only a request whose shards all fail raises.
+
+A job can only finish one run, so ``onDeadline=job`` does not apply to
+sharded (or per-entity) requests: at the deadline they answer with the
+items read so far and ``partial=True``, without a ``jobId``, and shard runs
+still going are aborted once nobody reads them.
+"""
+
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, Optional, Union
+
+from apify_client import ApifyClientAsync
+
+from src.config import get_settings
+from src.services.actor_runner import ActorRunResult, execute_actor
+from src.services.metrics import SHARD_RUNS
+from src.services.projection import Projection
+
+if TYPE_CHECKING:
+    from src.services.entity_cache import EntitySpec
+
+logger = logging.getLogger(__name__)
+
+
+def shard_size(operation: Optional[str]) -> int:
+    """
+    Maximum entities per run for an operation such as ``"instagram.profile"``.
+
+    Lookup order: ``platform.operation`` override, ``operation`` override,
+    ``SHARD_SIZE``.
+    """
+    settings = get_settings()
+    if operation:
+        overrides = settings.shard_size_overrides
+        for candidate in (operation, operation.rsplit(".", 1)[-1]):
+            if candidate in overrides:
+                return overrides[candidate]
+    return settings.shard_size
+
+
+def split_entities(entities: list[str], operation: Optional[str]) -> list[list[str]]:
+    """Split an entity list into shards; a single shard when sharding is off."""
+    size = shard_size(operation)
+    if not get_settings().sharding_enabled or size <= 0 or len(entities) <= size:
+        return [entities]
+    return [entities[i:i + size] for i in range(0, len(entities), size)]
+
+
+def is_sharded(actor_input: dict, spec: "EntitySpec", operation: Optional[str]) -> bool:
+    """Whether ``actor_input`` has enough entities to be split."""
+    return len(split_entities(spec.entities(actor_input), operation)) > 1
+
+
+async def run_shards(
+    client: ApifyClientAsync,
+    actor_id: str,
+    inputs: list[dict],
+    operation: Optional[str] = None,
+    use_cache: bool = True,
+    projection: Optional[Projection] = None,
+) -> list[Union[ActorRunResult, Exception]]:
+    """Execute the shard inputs concurrently; failed shards yield their exception."""
+    semaphore = asyncio.Semaphore(get_settings().shard_max_concurrency)
+    label = operation or actor_id
+
+    async def run(shard_input: dict) -> ActorRunResult:
+        async with semaphore:
+            return await execute_actor(
+                client, actor_id, shard_input, operation, use_cache, projection
+            )
+
+    results = await asyncio.gather(*(run(i) for i in inputs), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Shard of %s failed: %s", label, result)
+            SHARD_RUNS.labels(operation=label, result="failed").inc()
+        else:
+            SHARD_RUNS.labels(operation=label, result="ok").inc()
+    return results
+
+
+async def execute_sharded(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    spec: "EntitySpec",
+) -> ActorRunResult:
+    """Execute an actor over the entities of ``actor_input`` in concurrent shards."""
+    entities = list(dict.fromkeys(spec.entities(actor_input)))
+    inputs = [
+        spec.with_entities(actor_input, shard)
+        for shard in split_entities(entities, operation)
+    ]
+    if len(inputs) == 1:
+        return await execute_actor(client, actor_id, actor_input, operation)
+
+    results = await run_shards(client, actor_id, inputs, operation)
+    return merge_results(results)
+
+
+def merge_results(results: list[Union[ActorRunResult, Exception]]) -> ActorRunResult:
+    """
+    Merge shard results in order, dropping duplicate items.
+
+    Raises the first error when every shard failed.
+    """
+    done = [r for r in results if isinstance(r, ActorRunResult)]
+    if not done:
+        raise results[0]
+
+    ages = [r.cache_age_seconds for r in done if r.cache_age_seconds is not None]
+    return ActorRunResult(
+        run_id=done[0].run_id,
+        dataset_id=done[0].dataset_id,
+        items=dedupe_items([item for r in done for item in r.items]),
+        cached=all(r.cached for r in done),
+        cache_age_seconds=max(ages, default=None),
+        stale=any(r.stale for r in done),
+        partial=len(done) < len(results) or any(r.partial for r in done),
+    )
+
+
+def dedupe_items(items: list[dict]) -> list[dict]:
+    """Drop items seen before, by ``id`` or ``url`` or else by content."""
+    seen: set[str] = set()
+    unique = []
+    for item in items:
+        key = item.get("id") or item.get("url") or json.dumps(item, sort_keys=True, default=str)
+        key = str(key)
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
@@ -0,0 +1,136 @@
+"""Serialize actor results while their dataset is being read.
+
+Endpoints return a ``StreamingResponse`` built from an ``ActorRunStream``
+instead of a fully built response model, so the API holds about one dataset
+page per request instead of the whole result three times over (list, pydantic
+model, JSON body).
+
+The body format follows the ``stream`` run option (``?stream=``):
+
+- default: the same JSON object as ``ScrapeResponse``, ``data`` first.
+- ``ndjson``: one item per line, then a ``{"_trailer": {...}}`` line with the
+  other response fields (``totalResults``, ``runId``, ...).
+- ``sse``: one ``data:`` event per item, then an ``end`` event with the same
+  fields as the NDJSON trailer.
+
+A failure while reading the dataset comes after the response status was
+sent, so it is reported in-band: the JSON object or NDJSON trailer (``error``
+event for SSE) then has ``success: false`` and an ``error`` message, after the
+items read so far.
+
+A result handed to a job at the request deadline is sent with HTTP 202 and
+the job id in ``jobId``.
+"""
+
+import json
+import logging
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from src.schemas.responses import ScrapeResponse
+from src.services.actor_runner import ActorRunStream
+from src.services.run_options import get_run_options
+
+logger = logging.getLogger(__name__)
+
+# Flush serialized items to the client in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+NDJSON = "ndjson"
+SSE = "sse"
+
+
+def stream_response(stream: ActorRunStream) -> StreamingResponse:
+    """Stream a result in the format requested for the current request."""
+    mode = get_run_options().stream
+    status_code = 202 if stream.job_id else 200
+
+    if mode == NDJSON:
+        return StreamingResponse(
+            _ndjson_body(stream), status_code=status_code, media_type="application/x-ndjson"
+        )
+
+    if mode == SSE:
+        return StreamingResponse(
+            _sse_body(stream),
+            status_code=status_code,
+            media_type="text/event-stream",
+            # Keep proxies (nginx) from buffering the events
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return StreamingResponse(
+        _json_body(stream), status_code=status_code, media_type="application/json"
+    )
+
+
+async def _json_body(stream: ActorRunStream) -> AsyncIterator[str]:
+    total = 0
+    # ``success`` goes after the items, so a failure can still be reported
+    chunk = ['{"data":[']
+    size = 0
+
+    try:
+        async for item in stream.items:
+            part = ("," if total else "") + json.dumps(item, default=str)
+            chunk.append(part)
+            size += len(part)
+            total += 1
+            if size >= CHUNK_SIZE:
+                yield "".join(chunk)
+                chunk, size = [], 0
+    except Exception as e:
+        # Headers are already sent, so the failure goes in the body
+        logger.exception("Dataset %s failed while streaming", stream.dataset_id)
+        summary = {**_summary(stream, total), "success": False, "error": str(e)}
+    else:
+        summary = _summary(stream, total)
+
+    chunk.append("]," + json.dumps(summary)[1:])
+    yield "".join(chunk)
+
+
+async def _ndjson_body(stream: ActorRunStream) -> AsyncIterator[str]:
+    total = 0
+    try:
+        async for item in stream.items:
+            total += 1
+            yield json.dumps(item, default=str) + "\n"
+    except Exception as e:
+        logger.exception("Dataset %s failed while streaming", stream.dataset_id)
+        summary = {**_summary(stream, total), "success": False, "error": str(e)}
+        yield json.dumps({"_trailer": summary}) + "\n"
+        return
+
+    yield json.dumps({"_trailer": _summary(stream, total)}) + "\n"
+
+
+async def _sse_body(stream: ActorRunStream) -> AsyncIterator[str]:
+    total = 0
+    try:
+        async for item in stream.items:
+            total += 1
+            yield f"data: {json.dumps(item, default=str)}\n\n"
+    except Exception as e:
+        logger.exception("Dataset %s failed while streaming", stream.dataset_id)
+        summary = {**_summary(stream, total), "success": False, "error": str(e)}
+        yield f"event: error\ndata: {json.dumps(summary)}\n\n"
+        return
+
+    yield f"event: end\ndata: {json.dumps(_summary(stream, total))}\n\n"
+
+
+def _summary(stream: ActorRunStream, total: int) -> dict:
+    """Response fields other than ``data``, keyed like ``ScrapeResponse``."""
+    return ScrapeResponse(
+        success=True,
+        data=[],
+        total_results=total,
+        run_id=stream.run_id,
+        cached=stream.cached,
+        cache_age_seconds=stream.cache_age_seconds,
+        stale=stream.stale,
+        partial=stream.partial,
+        job_id=stream.job_id,
+    ).model_dump(by_alias=True, exclude={"data"})
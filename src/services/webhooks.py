@@ -0,0 +1,336 @@
+"""Webhook-driven completion of actor runs.
+
+With ``WEBHOOK_COMPLETION_ENABLED`` (and ``WEBHOOK_BASE_URL``) runs are started
+with an ad-hoc Apify webhook pointing back at
+``POST /api/v1/internal/apify/webhook`` instead of being long-polled until
+they finish, so nothing holds an Apify connection while a run is going:
+
+- Requests park a future on the run (``wait_for_run``). The webhook resolves
+  it in the process that received it and, through Redis pub/sub, in every
+  other API replica or worker.
+- Jobs park a continuation in Redis (``park_job``) and free their worker. The
+  webhook enqueues ``jobs.resume_parked``, which reads the dataset and stores
+  the job result.
+
+Webhooks can be lost, so parked requests also poll their run every
+``WEBHOOK_FALLBACK_POLL_SECS``, and the API runs ``poll_parked_runs`` to pick
+up jobs whose webhook never arrived. ``src.services.fake_webhook`` replays
+the webhook of a finished run to a local API for testing.
+
+The callback is reachable by anyone who can reach the API, so webhook mode
+requires ``WEBHOOK_SECRET`` (``check_webhook_settings`` refuses to start
+without it), and only the run id of a payload is used: the run itself is
+always fetched from Apify.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+from apify_client import ApifyClientAsync
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.services.apify_client import TERMINAL_STATUSES
+from src.services.metrics import PARKED_REQUESTS, PARKED_RUNS, RUN_COMPLETIONS
+from src.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_PATH = "/api/v1/internal/apify/webhook"
+
+EVENT_TYPES = [
+    "ACTOR.RUN.SUCCEEDED",
+    "ACTOR.RUN.FAILED",
+    "ACTOR.RUN.ABORTED",
+    "ACTOR.RUN.TIMED_OUT",
+]
+
+CHANNEL_PREFIX = "webhook:run:"
+DONE_PREFIX = "webhook:done:"
+JOBS_PREFIX = "webhook:jobs:"
+PARKED_KEY = "webhook:parked"
+
+# Finished runs are remembered this long for waiters that register late
+DONE_TTL_SECS = 3600
+# Parked jobs are dropped if their run is not picked up within this time
+PARKED_TTL_SECS = 24 * 3600
+
+_waiters: dict[str, asyncio.Future] = {}
+_listener: Optional[asyncio.Task] = None
+
+
+def webhooks_enabled() -> bool:
+    """Whether runs are started with a completion webhook."""
+    settings = get_settings()
+    return settings.webhook_completion_enabled and bool(settings.webhook_base_url)
+
+
+def check_webhook_settings() -> None:
+    """Refuse to start in webhook mode without ``WEBHOOK_SECRET``."""
+    settings = get_settings()
+    if settings.webhook_completion_enabled and not settings.webhook_secret:
+        raise RuntimeError("WEBHOOK_COMPLETION_ENABLED requires WEBHOOK_SECRET to be set")
+
+
+def run_webhooks() -> list[dict]:
+    """Ad-hoc webhooks for ``ActorClientAsync.start`` that report the finished run."""
+    settings = get_settings()
+    url = settings.webhook_base_url.rstrip("/") + CALLBACK_PATH
+    if settings.webhook_secret:
+        url += "?" + urlencode({"token": settings.webhook_secret})
+    return [{"event_types": EVENT_TYPES, "request_url": url}]
+
+
+def verify_token(token: Optional[str]) -> bool:
+    """Check the token of an incoming webhook against ``WEBHOOK_SECRET``; without one, none is valid."""
+    secret = get_settings().webhook_secret
+    if not secret:
+        return False
+    return token is not None and hmac.compare_digest(token, secret)
+
+
+# =============================================================================
+# CALLBACKS
+# =============================================================================
+
+async def handle_webhook(client: ApifyClientAsync, payload: dict) -> bool:
+    """
+    Resume everything parked on the run of a webhook payload.
+
+    Only the run id is taken from the payload; the run is fetched from Apify,
+    so a forged payload cannot hand out made-up datasets or usage. Returns
+    whether the payload was about a finished run.
+    """
+    resource = payload.get("resource") or {}
+    run_id = resource.get("id") or (payload.get("eventData") or {}).get("actorRunId")
+    if not run_id or not isinstance(run_id, str):
+        raise ValueError("Webhook payload has no run id")
+
+    run = await client.run(run_id).get()
+    if run is None or run.get("status") not in TERMINAL_STATUSES:
+        logger.info("Ignoring webhook for unfinished run %s", run_id)
+        return False
+
+    RUN_COMPLETIONS.labels(source="webhook").inc()
+    await notify_run_finished(run)
+    return True
+
+
+async def notify_run_finished(run: dict) -> None:
+    """Hand a finished run to its waiters in every process and resume its parked jobs."""
+    run_id = run["id"]
+    _resolve(run)
+
+    redis = get_redis()
+    if redis is None:
+        return
+
+    message = json.dumps(run, default=str)
+    try:
+        await redis.set(DONE_PREFIX + run_id, message, ex=DONE_TTL_SECS)
+        await redis.publish(CHANNEL_PREFIX + run_id, message)
+        # Only the process that removes the run from the parked set resumes its jobs
+        claimed = await redis.zrem(PARKED_KEY, run_id)
+    except RedisError as e:
+        logger.warning("Could not publish finished run %s: %s", run_id, e)
+        return
+
+    if claimed:
+        _enqueue_resume(json.loads(message))
+
+
+def _resolve(run: dict) -> None:
+    future = _waiters.pop(run["id"], None)
+    if future is not None and not future.done():
+        future.set_result(run)
+
+
+def _enqueue_resume(run: dict) -> None:
+    from src.worker.celery_app import celery_app
+
+    celery_app.send_task("jobs.resume_parked", args=[run])
+
+
+async def _finished_run(run_id: str) -> Optional[dict]:
+    """A run whose webhook already arrived, if any."""
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        message = await redis.get(DONE_PREFIX + run_id)
+    except RedisError as e:
+        logger.warning("Redis unavailable for run webhooks: %s", e)
+        return None
+    return json.loads(message) if message else None
+
+
+# =============================================================================
+# PARKED REQUESTS
+# =============================================================================
+
+async def wait_for_run(client: ApifyClientAsync, run: dict) -> dict:
+    """
+    Wait for a run started with ``run_webhooks()`` to finish.
+
+    The run is polled every ``WEBHOOK_FALLBACK_POLL_SECS`` in case its webhook
+    is lost.
+    """
+    run_id = run["id"]
+    if run.get("status") in TERMINAL_STATUSES:
+        return run
+
+    future = _waiters.get(run_id)
+    if future is None:
+        future = asyncio.get_running_loop().create_future()
+        _waiters[run_id] = future
+
+    PARKED_REQUESTS.inc()
+    try:
+        await _ensure_listener()
+        # Subscribed first, so a webhook is either already recorded or still to come
+        finished = await _finished_run(run_id)
+        if finished is not None:
+            return finished
+
+        poll_secs = get_settings().webhook_fallback_poll_secs
+        while True:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), poll_secs)
+            except asyncio.TimeoutError:
+                current = await client.run(run_id).get()
+                if current is None:
+                    raise RuntimeError(f"Actor run {run_id} could not be found")
+                if current.get("status") in TERMINAL_STATUSES:
+                    RUN_COMPLETIONS.labels(source="poller").inc()
+                    return current
+    finally:
+        PARKED_REQUESTS.dec()
+        if _waiters.get(run_id) is future:
+            del _waiters[run_id]
+
+
+async def _ensure_listener() -> None:
+    """Subscribe this process to runs finished through webhooks sent elsewhere."""
+    global _listener
+    if _listener is not None and not _listener.done():
+        return
+
+    redis = get_redis()
+    if redis is None:
+        return
+
+    try:
+        pubsub = redis.pubsub()
+        await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+    except RedisError as e:
+        logger.warning("Redis unavailable for run webhooks, polling instead: %s", e)
+        return
+    _listener = asyncio.create_task(_listen(pubsub))
+
+
+async def _listen(pubsub) -> None:
+    try:
+        async for message in pubsub.listen():
+            if message["type"] == "pmessage":
+                _resolve(json.loads(message["data"]))
+    except RedisError as e:
+        logger.warning("Lost run webhook subscription, polling instead: %s", e)
+    finally:
+        try:
+            await pubsub.aclose()
+        except RedisError:
+            pass
+
+
+# =============================================================================
+# PARKED JOBS
+# =============================================================================
+
+async def park_job(run: dict, job: dict) -> bool:
+    """
+    Park ``job`` until ``run`` finishes; ``jobs.resume_parked`` then completes it.
+
+    Returns ``False`` when Redis is unavailable and the caller has to wait
+    for the run itself.
+    """
+    redis = get_redis()
+    if redis is None:
+        return False
+
+    run_id = run["id"]
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(JOBS_PREFIX + run_id, json.dumps(job))
+            pipe.expire(JOBS_PREFIX + run_id, PARKED_TTL_SECS)
+            pipe.zadd(PARKED_KEY, {run_id: time.time()}, nx=True)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not park job on run %s: %s", run_id, e)
+        return False
+
+    # The run may have finished before the job was parked
+    finished = await _finished_run(run_id)
+    if finished is not None:
+        try:
+            if await redis.zrem(PARKED_KEY, run_id):
+                _enqueue_resume(finished)
+        except RedisError as e:
+            logger.warning("Could not resume jobs of run %s: %s", run_id, e)
+    return True
+
+
+async def pop_parked_jobs(run_id: str) -> list[dict]:
+    """Take the jobs parked on a run, so each is resumed once."""
+    redis = get_redis()
+    if redis is None:
+        return []
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.lrange(JOBS_PREFIX + run_id, 0, -1)
+        pipe.delete(JOBS_PREFIX + run_id)
+        jobs, _ = await pipe.execute()
+    return [json.loads(job) for job in jobs]
+
+
+async def poll_parked_runs(client: ApifyClientAsync) -> None:
+    """
+    Resume jobs whose run finished without its webhook arriving.
+
+    Runs for the lifetime of the API; runs parked for longer than
+    ``WEBHOOK_FALLBACK_POLL_SECS`` are checked once per interval.
+    """
+    poll_secs = get_settings().webhook_fallback_poll_secs
+    while True:
+        await asyncio.sleep(poll_secs)
+        redis = get_redis()
+        if redis is None:
+            continue
+
+        try:
+            PARKED_RUNS.set(await redis.zcard(PARKED_KEY))
+            run_ids = await redis.zrangebyscore(PARKED_KEY, 0, time.time() - poll_secs)
+        except RedisError as e:
+            logger.warning("Redis unavailable for parked runs: %s", e)
+            continue
+
+        for run_id in run_ids:
+            run_id = run_id.decode() if isinstance(run_id, bytes) else run_id
+            try:
+                run = await client.run(run_id).get()
+            except Exception as e:
+                logger.warning("Could not check parked run %s: %s", run_id, e)
+                continue
+
+            if run is None:
+                logger.warning("Parked run %s no longer exists", run_id)
+                run = {"id": run_id, "status": "FAILED"}
+            elif run.get("status") not in TERMINAL_STATUSES:
+                continue
+
+            RUN_COMPLETIONS.labels(source="poller").inc()
+            await notify_run_finished(run)
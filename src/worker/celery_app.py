@@ -1,7 +1,14 @@
 """Celery application configuration."""
 
+import asyncio
+from typing import Optional
+
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from src.config import get_settings
+from src.services.apify_client import init_apify_client, close_apify_client
+from src.services.redis_client import close_redis
+from src.services.webhooks import check_webhook_settings
 
 settings = get_settings()
 
@@ -23,3 +30,39 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,  # Process one task at a time
     result_expires=3600,  # Results expire after 1 hour
 )
+
+
+# =============================================================================
+# WORKER PROCESS LIFECYCLE
+# =============================================================================
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop that lives for the whole worker process."""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+def run_async(coro):
+    """Run a coroutine on the worker loop so pooled clients survive across tasks."""
+    return get_worker_loop().run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    check_webhook_settings()
+    get_worker_loop()
+    init_apify_client()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    if _worker_loop is not None and not _worker_loop.is_closed():
+        _worker_loop.run_until_complete(close_apify_client())
+        _worker_loop.run_until_complete(close_redis())
+        _worker_loop.close()
@@ -1,44 +1,294 @@
 """Celery tasks for background processing."""
 
-from apify_client import ApifyClient
-from src.worker.celery_app import celery_app
-from src.config import get_settings
-
-
-def get_client() -> ApifyClient:
-    """Get Apify client instance."""
-    settings = get_settings()
-    return ApifyClient(settings.apify_api_key)
-
-
-def run_apify_actor(actor_id: str, actor_input: dict) -> dict:
-    """Execute an Apify actor and return results."""
-    client = get_client()
-    run = client.actor(actor_id).call(run_input=actor_input)
-
-    dataset_id = run.get("defaultDatasetId")
-    items = []
-
-    if dataset_id:
-        dataset_items = client.dataset(dataset_id).list_items()
-        items = dataset_items.items
-
+from typing import Callable, Optional
+
+from apify_client import ApifyClientAsync
+from celery import Task
+from celery.exceptions import Ignore
+
+from src.worker.celery_app import celery_app, run_async
+from src.services.apify_client import get_apify_client
+from src.services.actor_runner import (
+    ActorRunResult,
+    ActorRunStream,
+    cached_result,
+    collect_run,
+    run_finished,
+    start_actor,
+)
+from src.services.disconnects import add_reader
+from src.services.entity_cache import EntitySpec
+from src.services.executor import ActorExecutor
+from src.services.cache import ttl_for
+from src.services.projection import Projection
+from src.services.run_index import reuse_age
+from src.services.run_options import RunOptions, use_run_options
+from src.services.run_policy import policy_for, retry_delay
+from src.services.sharding import is_sharded
+from src.services.webhooks import park_job, pop_parked_jobs, wait_for_run, webhooks_enabled
+
+# Jobs pass full operation names, e.g. "instagram.profile"
+JOB_EXECUTOR = ActorExecutor(None)
+
+
+def run_apify_actor(
+    actor_id: str,
+    actor_input: dict,
+    operation: str,
+    entities: Optional[EntitySpec] = None,
+    task: Optional[Task] = None,
+    shards: Optional[EntitySpec] = None,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+) -> dict:
+    """
+    Execute an Apify actor and return results.
+
+    The call goes through the same ``ActorExecutor`` chain as the API routes.
+    Without ``entities`` the dataset is read while the run is still going, and
+    the items read so far are published as the ``PROGRESS`` state of ``task``.
+    ``fields``/``omit`` are sent with the dataset reads. Inputs with a long
+    ``shards`` list are split into concurrent runs instead.
+
+    In webhook mode the job is parked on its run instead: the task ends with
+    state ``WAITING`` and ``jobs.resume_parked`` stores the result later.
+    """
+    client = get_apify_client()
+    # Jobs are not latency-sensitive, so they never take stale cached data
+    options = RunOptions(max_stale=0, tail=True, projection=Projection.parse(fields, omit))
+    fans_out = bool(entities) or bool(shards and is_sharded(actor_input, shards, operation))
+    with use_run_options(options):
+        if task is not None and webhooks_enabled() and not fans_out:
+            result = run_async(
+                _park(client, actor_id, actor_input, operation, task, fields, omit)
+            )
+            if result is None:
+                raise Ignore()
+        else:
+            result = run_async(JOB_EXECUTOR.collect(
+                client, actor_id, actor_input, operation, entities, shards,
+                on_progress=_progress_reporter(task),
+            ))
+
+    return _job_result(result)
+
+
+def _job_result(result: ActorRunResult) -> dict:
     return {
         "success": True,
-        "data": items,
-        "total_results": len(items),
-        "run_id": run.get("id"),
+        "data": result.items,
+        "total_results": len(result.items),
+        "run_id": result.run_id,
+        "cached": result.cached,
+        "cache_age_seconds": result.cache_age_seconds,
+        "partial": result.partial,
     }
 
 
+def _progress_reporter(task: Optional[Task]) -> Optional[Callable[[ActorRunStream, list[dict]], None]]:
+    """Publish the items read so far as the ``PROGRESS`` state of ``task``."""
+    if task is None:
+        return None
+
+    def report(stream: ActorRunStream, items: list[dict]) -> None:
+        task.update_state(state="PROGRESS", meta={
+            "success": True,
+            "partial": True,
+            "data": items,
+            "total_results": len(items),
+            "run_id": stream.run_id,
+        })
+
+    return report
+
+
+async def _park(
+    client: ApifyClientAsync,
+    actor_id: str,
+    actor_input: dict,
+    operation: str,
+    task: Task,
+    fields: Optional[list[str]],
+    omit: Optional[list[str]],
+) -> Optional[ActorRunResult]:
+    """Serve a job from the cache, or start its run and park the job on it."""
+    cached = await cached_result(client, actor_id, actor_input, operation)
+    if cached is not None:
+        return cached
+
+    run = await start_actor(
+        client, actor_id, actor_input, reuse_age(ttl_for(operation)), operation
+    )
+    if run.get("status") == "SUCCEEDED":
+        # A recent identical run was reused
+        return await collect_run(
+            client, run, actor_id, actor_input, operation, Projection.parse(fields, omit)
+        )
+
+    # The parked job keeps the run from being aborted by readers that leave
+    await add_reader(run["id"])
+    return await _park_on_run(client, run, actor_id, actor_input, operation, task, fields, omit)
+
+
+async def _park_on_run(
+    client: ApifyClientAsync,
+    run: dict,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    task: Task,
+    fields: Optional[list[str]],
+    omit: Optional[list[str]],
+    clean: bool = False,
+) -> Optional[ActorRunResult]:
+    """Park a job on a started run; ``None`` once parked."""
+    # Set before parking, so a fast resume is not overwritten with WAITING
+    task.update_state(state="WAITING", meta={"run_id": run.get("id")})
+
+    if await park_job(run, {
+        "job_id": task.request.id,
+        "actor_id": actor_id,
+        "actor_input": actor_input,
+        "operation": operation,
+        "fields": fields,
+        "omit": omit,
+        "clean": clean,
+    }):
+        return None
+
+    # Redis is unavailable, so the job cannot be resumed elsewhere
+    run = await wait_for_run(client, run)
+    await run_finished(run)
+    return await collect_run(
+        client, run, actor_id, actor_input, operation, Projection.parse(fields, omit, clean)
+    )
+
+
+@celery_app.task(bind=True, name="jobs.finish_run")
+def finish_run(
+    self,
+    run: dict,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+    clean: bool = False,
+):
+    """Finish a run whose caller's deadline passed (``onDeadline=job``) and store its result."""
+    client = get_apify_client()
+    if webhooks_enabled():
+        result = run_async(_park_on_run(
+            client, run, actor_id, actor_input, operation, self, fields, omit, clean
+        ))
+        if result is None:
+            raise Ignore()
+    else:
+        result = run_async(_finish(
+            client, run, actor_id, actor_input, operation, Projection.parse(fields, omit, clean)
+        ))
+    return _job_result(result)
+
+
+async def _finish(
+    client: ApifyClientAsync,
+    run: dict,
+    actor_id: str,
+    actor_input: dict,
+    operation: Optional[str],
+    projection: Projection,
+) -> ActorRunResult:
+    finished = await client.run(run["id"]).wait_for_finish()
+    if finished is None:
+        raise RuntimeError(f"Actor run {run['id']} could not be found")
+    await run_finished(finished)
+    if finished.get("status") != "SUCCEEDED":
+        raise RuntimeError(f"Actor run {run['id']} finished with status {finished.get('status')}")
+    return await collect_run(client, finished, actor_id, actor_input, operation, projection)
+
+
+@celery_app.task(name="jobs.resume_parked")
+def resume_parked_jobs(run: dict):
+    """
+    Complete the jobs parked on a run once its webhook (or the poller) fired.
+
+    Jobs of a run that ended in a retry status are parked on a new run.
+    """
+    client = get_apify_client()
+    results: dict[Projection, ActorRunResult] = {}
+    run_async(run_finished(run))
+    jobs = run_async(pop_parked_jobs(run["id"]))
+
+    if run.get("status") != "SUCCEEDED":
+        run_async(_retry_parked(client, run, jobs))
+        return
+
+    for job in jobs:
+        projection = Projection.parse(job.get("fields"), job.get("omit"), job.get("clean", False))
+        # Only identical jobs share a run; read its dataset once per projection
+        try:
+            if projection not in results:
+                results[projection] = run_async(collect_run(
+                    client, run, job["actor_id"], job["actor_input"], job["operation"], projection
+                ))
+        except Exception as e:
+            _fail_job(job, e)
+            continue
+
+        celery_app.backend.mark_as_done(job["job_id"], _job_result(results[projection]))
+
+
+async def _retry_parked(client: ApifyClientAsync, run: dict, jobs: list[dict]) -> None:
+    """
+    Park the jobs of a run that ended in a retry status on a new run, like
+    ``_call_actor`` retries; jobs out of attempts fail.
+    """
+    status = run.get("status")
+    retried = []
+    for job in jobs:
+        policy = policy_for(job["operation"])
+        if status in policy.retry_statuses and job.get("attempt", 1) < policy.max_attempts:
+            retried.append(job)
+        else:
+            _fail_job(job, RuntimeError(f"Actor run {run['id']} finished with status {status}"))
+    if not retried:
+        return
+
+    # Jobs parked on one run share its actor and input
+    first = retried[0]
+    policy = policy_for(first["operation"])
+    await retry_delay(policy, first.get("attempt", 1), first["operation"], status.lower())
+    try:
+        with use_run_options(RunOptions(max_stale=0)):
+            new_run = await start_actor(client, first["actor_id"], first["actor_input"], 0, first["operation"])
+        await add_reader(new_run["id"])
+        for job in retried:
+            if not await park_job(new_run, {**job, "attempt": job.get("attempt", 1) + 1}):
+                _fail_job(job, RuntimeError(f"Could not park job on run {new_run['id']}"))
+    except Exception as e:
+        for job in retried:
+            _fail_job(job, e)
+
+
+def _fail_job(job: dict, error: Exception) -> None:
+    celery_app.backend.mark_as_failure(job["job_id"], error)
+
+
 # =============================================================================
 # INSTAGRAM TASKS
 # =============================================================================
 
 @celery_app.task(bind=True, name="instagram.scrape_posts")
-def instagram_scrape_posts(self, usernames: list[str], limit: int = 20):
+def instagram_scrape_posts(
+    self,
+    usernames: list[str],
+    limit: int = 20,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape Instagram posts in background."""
     from src.services.platforms.instagram.constants import INSTAGRAM_ACTOR_ID
+    from src.services.platforms.instagram.posts import POSTS_ENTITIES
     from src.services.platforms.instagram.utils import get_default_proxy
 
     direct_urls = [f"https://www.instagram.com/{u}/" for u in usernames]
@@ -50,13 +300,22 @@ def instagram_scrape_posts(self, usernames: list[str], limit: int = 20):
         "proxy": get_default_proxy(),
     }
 
-    return run_apify_actor(INSTAGRAM_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        INSTAGRAM_ACTOR_ID, actor_input, "instagram.posts", POSTS_ENTITIES,
+        task=self, fields=fields, omit=omit,
+    )
 
 
 @celery_app.task(bind=True, name="instagram.scrape_profile")
-def instagram_scrape_profile(self, usernames: list[str]):
+def instagram_scrape_profile(
+    self,
+    usernames: list[str],
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape Instagram profiles in background."""
     from src.services.platforms.instagram.constants import INSTAGRAM_PROFILE_ACTOR_ID
+    from src.services.platforms.instagram.profile import PROFILE_ENTITIES
     from src.services.platforms.instagram.utils import get_default_proxy
 
     actor_input = {
@@ -64,13 +323,23 @@ def instagram_scrape_profile(self, usernames: list[str]):
         "proxy": get_default_proxy(),
     }
 
-    return run_apify_actor(INSTAGRAM_PROFILE_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        INSTAGRAM_PROFILE_ACTOR_ID, actor_input, "instagram.profile", PROFILE_ENTITIES,
+        task=self, fields=fields, omit=omit,
+    )
 
 
 @celery_app.task(bind=True, name="instagram.scrape_hashtag")
-def instagram_scrape_hashtag(self, hashtags: list[str], limit: int = 20):
+def instagram_scrape_hashtag(
+    self,
+    hashtags: list[str],
+    limit: int = 20,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape Instagram hashtags in background."""
     from src.services.platforms.instagram.constants import INSTAGRAM_HASHTAG_ACTOR_ID
+    from src.services.platforms.instagram.hashtag import HASHTAG_SHARDS
     from src.services.platforms.instagram.utils import get_default_proxy
 
     actor_input = {
@@ -79,11 +348,20 @@ def instagram_scrape_hashtag(self, hashtags: list[str], limit: int = 20):
         "proxy": get_default_proxy(),
     }
 
-    return run_apify_actor(INSTAGRAM_HASHTAG_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        INSTAGRAM_HASHTAG_ACTOR_ID, actor_input, "instagram.hashtag",
+        task=self, shards=HASHTAG_SHARDS, fields=fields, omit=omit,
+    )
 
 
 @celery_app.task(bind=True, name="instagram.scrape_comments")
-def instagram_scrape_comments(self, post_urls: list[str], limit: int = 100):
+def instagram_scrape_comments(
+    self,
+    post_urls: list[str],
+    limit: int = 100,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape Instagram comments in background."""
     from src.services.platforms.instagram.constants import INSTAGRAM_ACTOR_ID
     from src.services.platforms.instagram.utils import get_default_proxy
@@ -95,7 +373,10 @@ def instagram_scrape_comments(self, post_urls: list[str], limit: int = 100):
         "proxy": get_default_proxy(),
     }
 
-    return run_apify_actor(INSTAGRAM_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        INSTAGRAM_ACTOR_ID, actor_input, "instagram.comments",
+        task=self, fields=fields, omit=omit,
+    )
 
 
 # =============================================================================
@@ -103,7 +384,13 @@ def instagram_scrape_comments(self, post_urls: list[str], limit: int = 100):
 # =============================================================================
 
 @celery_app.task(bind=True, name="tiktok.scrape_hashtag")
-def tiktok_scrape_hashtag(self, hashtag: str, limit: int = 10):
+def tiktok_scrape_hashtag(
+    self,
+    hashtag: str,
+    limit: int = 10,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape TikTok hashtag in background."""
     from src.services.platforms.tiktok.constants import TIKTOK_ACTOR_ID
 
@@ -112,11 +399,20 @@ def tiktok_scrape_hashtag(self, hashtag: str, limit: int = 10):
         "resultsPerPage": limit,
     }
 
-    return run_apify_actor(TIKTOK_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        TIKTOK_ACTOR_ID, actor_input, "tiktok.hashtag",
+        task=self, fields=fields, omit=omit,
+    )
 
 
 @celery_app.task(bind=True, name="tiktok.scrape_profile")
-def tiktok_scrape_profile(self, username: str, limit: int = 10):
+def tiktok_scrape_profile(
+    self,
+    username: str,
+    limit: int = 10,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape TikTok profile in background."""
     from src.services.platforms.tiktok.constants import TIKTOK_ACTOR_ID
 
@@ -125,7 +421,10 @@ def tiktok_scrape_profile(self, username: str, limit: int = 10):
         "resultsPerPage": limit,
     }
 
-    return run_apify_actor(TIKTOK_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        TIKTOK_ACTOR_ID, actor_input, "tiktok.profile",
+        task=self, fields=fields, omit=omit,
+    )
 
 
 # =============================================================================
@@ -133,7 +432,13 @@ def tiktok_scrape_profile(self, username: str, limit: int = 10):
 # =============================================================================
 
 @celery_app.task(bind=True, name="youtube.search")
-def youtube_search(self, query: str, limit: int = 10):
+def youtube_search(
+    self,
+    query: str,
+    limit: int = 10,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Search YouTube in background."""
     from src.services.platforms.youtube.constants import YOUTUBE_ACTOR_ID
 
@@ -142,11 +447,20 @@ def youtube_search(self, query: str, limit: int = 10):
         "maxResults": limit,
     }
 
-    return run_apify_actor(YOUTUBE_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        YOUTUBE_ACTOR_ID, actor_input, "youtube.search",
+        task=self, fields=fields, omit=omit,
+    )
 
 
 @celery_app.task(bind=True, name="youtube.scrape_channel")
-def youtube_scrape_channel(self, channel_url: str, limit: int = 10):
+def youtube_scrape_channel(
+    self,
+    channel_url: str,
+    limit: int = 10,
+    fields: Optional[list[str]] = None,
+    omit: Optional[list[str]] = None,
+):
     """Scrape YouTube channel in background."""
     from src.services.platforms.youtube.constants import YOUTUBE_ACTOR_ID
 
@@ -155,4 +469,7 @@ def youtube_scrape_channel(self, channel_url: str, limit: int = 10):
         "maxResults": limit,
     }
 
-    return run_apify_actor(YOUTUBE_ACTOR_ID, actor_input)
+    return run_apify_actor(
+        YOUTUBE_ACTOR_ID, actor_input, "youtube.channel",
+        task=self, fields=fields, omit=omit,
+    )
@@ -0,0 +1,131 @@
+"""Shared fixtures: an in-memory Redis and a fake Apify client."""
+
+import asyncio
+import os
+
+os.environ.setdefault("APIFY_API_KEY", "test")
+
+import itertools
+from typing import Optional
+
+import fakeredis
+import pytest
+
+from src.config import get_settings
+from src.services import redis_client
+from src.services.apify_client import TERMINAL_STATUSES
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def redis():
+    """A fresh in-memory Redis as the shared client."""
+    redis_client._redis = fakeredis.FakeAsyncRedis()
+    yield redis_client._redis
+    redis_client._redis = None
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    """No Redis configured."""
+    monkeypatch.setattr(get_settings(), "redis_url", None)
+    redis_client._redis = None
+
+
+class FakeApify:
+    """
+    The parts of ``ApifyClientAsync`` the services use, over in-memory runs.
+
+    Started runs get the next of ``start_statuses``, then ``start_status``;
+    ``finish`` moves a run to a final status. ``wait_for_finish`` waits for
+    that without ``wait_secs``, and otherwise reports whatever the run is at.
+    """
+
+    def __init__(self, start_status: str = "SUCCEEDED", items: Optional[list] = None):
+        self.start_status = start_status
+        self.start_statuses: list[str] = []
+        self.items = items if items is not None else [{"n": n} for n in range(3)]
+        self.runs: dict[str, dict] = {}
+        self.started: list[dict] = []
+        self.aborted: list[str] = []
+        self._ids = itertools.count()
+
+    def finish(self, run_id: str, status: str = "SUCCEEDED", **fields) -> dict:
+        self.runs[run_id].update(status=status, **fields)
+        return dict(self.runs[run_id])
+
+    def actor(self, actor_id: str) -> "_Actor":
+        return _Actor(self, actor_id)
+
+    def run(self, run_id: str) -> "_Run":
+        return _Run(self, run_id)
+
+    def dataset(self, dataset_id: str) -> "_Dataset":
+        return _Dataset(self, dataset_id)
+
+
+class _Actor:
+    def __init__(self, apify: FakeApify, actor_id: str):
+        self.apify = apify
+        self.actor_id = actor_id
+
+    async def start(self, run_input: Optional[dict] = None, **options) -> dict:
+        run_id = f"run{next(self.apify._ids)}"
+        run = {
+            "id": run_id,
+            "actId": self.actor_id,
+            "status": self.apify.start_statuses.pop(0) if self.apify.start_statuses else self.apify.start_status,
+            "defaultDatasetId": f"ds-{run_id}",
+        }
+        self.apify.runs[run_id] = run
+        self.apify.started.append({"run_input": run_input, **options})
+        return dict(run)
+
+
+class _Run:
+    def __init__(self, apify: FakeApify, run_id: str):
+        self.apify = apify
+        self.run_id = run_id
+
+    async def get(self) -> Optional[dict]:
+        run = self.apify.runs.get(self.run_id)
+        return dict(run) if run else None
+
+    async def wait_for_finish(self, wait_secs: Optional[int] = None) -> Optional[dict]:
+        # Without ``wait_secs`` Apify waits for the run to finish
+        while wait_secs is None and self.run_id in self.apify.runs:
+            if self.apify.runs[self.run_id]["status"] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(0.01)
+        return await self.get()
+
+    async def abort(self) -> dict:
+        self.apify.aborted.append(self.run_id)
+        return self.apify.finish(self.run_id, "ABORTED")
+
+
+class _Dataset:
+    def __init__(self, apify: FakeApify, dataset_id: str):
+        self.apify = apify
+
+    async def list_items(self, offset: int = 0, limit: Optional[int] = None, **options):
+        items = self.apify.items[offset:offset + limit if limit else None]
+
+        class Page:
+            pass
+
+        page = Page()
+        page.items = items
+        page.count = len(items)
+        page.total = len(self.apify.items)
+        page.offset = offset
+        return page
+
+
+@pytest.fixture
+def apify():
+    return FakeApify()
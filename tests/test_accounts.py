@@ -0,0 +1,61 @@
+import pytest
+
+from src.config import get_settings
+from src.services import accounts
+from src.services.accounts import RUNS_PREFIX, Account, PooledApifyClient, account_finished, place_run
+from src.services.disconnects import abort_run
+from tests.conftest import FakeApify
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(get_settings(), "apify_accounts", "configured")
+    monkeypatch.setattr(accounts, "_local_owners", {})
+    monkeypatch.setattr(accounts, "_local_runs", {})
+    return PooledApifyClient([
+        Account(name="a", client=FakeApify(), weight=1, max_runs=2, max_memory_mbytes=8192, pooled=True),
+        Account(name="b", client=FakeApify(), weight=1, max_runs=2, max_memory_mbytes=8192, pooled=True),
+    ])
+
+
+async def _start(pool) -> tuple:
+    placement = await place_run(pool)
+    run = await placement.account.client.actor("actor").start({})
+    await placement.bind(run, 60)
+    return placement.account, run
+
+
+async def test_runs_go_to_the_least_loaded_account(pool, redis):
+    first, _ = await _start(pool)
+    second, _ = await _start(pool)
+
+    assert {first.name, second.name} == {"a", "b"}
+
+
+async def test_finished_run_frees_its_account(pool, redis):
+    account, run = await _start(pool)
+    assert await redis.zcard(RUNS_PREFIX + account.name) == 1
+
+    await account_finished(account.client.finish(run["id"]))
+
+    assert await redis.zcard(RUNS_PREFIX + account.name) == 0
+
+
+async def test_aborted_run_frees_its_account(pool, redis):
+    account, run = await _start(pool)
+
+    await abort_run(pool, run["id"])
+
+    assert account.client.aborted == [run["id"]]
+    assert await redis.zcard(RUNS_PREFIX + account.name) == 0
+
+
+async def test_aborted_run_frees_its_account_without_redis(pool, no_redis):
+    account, run = await _start(pool)
+    assert accounts._local_runs[account.name] == {run["id"]}
+
+    await abort_run(pool, run["id"])
+
+    assert not accounts._local_runs[account.name]
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.services import actor_runner
+from src.services.actor_runner import ActorRunResult, _cache_when_read, _iterate, _read_run, execute_actor
+from src.services.cache import CACHE_PREFIX, get_cached
+from src.services.projection import Projection
+from src.services.run_keys import run_key
+from src.services.run_options import RunOptions, get_run_options, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+KEY = "run:test"
+
+
+async def test_succeeded_run_is_cached(apify, redis):
+    run = await apify.actor("actor").start({})
+
+    result = await _read_run(apify, run, KEY, 60, Projection())
+
+    assert len(result.items) == 3
+    assert (await get_cached(Projection().cache_key(KEY)))["run_id"] == run["id"]
+
+
+@pytest.mark.parametrize("status", ["FAILED", "ABORTED", "TIMED-OUT"])
+async def test_unsuccessful_run_is_not_cached(apify, redis, status):
+    run = await apify.actor("actor").start({})
+    run = apify.finish(run["id"], status)
+
+    result = await _read_run(apify, run, KEY, 60, Projection())
+
+    assert len(result.items) == 3
+    assert await get_cached(Projection().cache_key(KEY)) is None
+
+
+async def test_streamed_failed_run_is_not_cached(apify, redis):
+    run = await apify.actor("actor").start({})
+    run = apify.finish(run["id"], "FAILED")
+
+    items = [item async for item in _cache_when_read(_iterate(apify.items), run, KEY, 60, Projection())]
+
+    assert len(items) == 3
+    assert await get_cached(Projection().cache_key(KEY)) is None
+
+
+async def test_tailed_run_read_to_the_end_is_cached(apify, redis):
+    apify.start_status = "RUNNING"
+    run = await apify.actor("actor").start({})
+
+    [item async for item in _cache_when_read(_iterate(apify.items), run, KEY, 60, Projection())]
+
+    assert await get_cached(Projection().cache_key(KEY)) is not None
+
+
+async def test_stale_entry_is_refreshed_under_neutral_options(apify, redis, monkeypatch):
+    # Fresh for 1s, cached 10s ago: stale within the grace window
+    entry = {"run_id": "old", "dataset_id": "ds", "items": [], "ttl": 1, "cached_at": time.time() - 10}
+    await redis.set(CACHE_PREFIX + Projection().cache_key(run_key("actor", {})), json.dumps(entry))
+    seen = []
+
+    async def run_and_read(*args, **kwargs):
+        seen.append(get_run_options())
+        return ActorRunResult(run_id="new", dataset_id="ds")
+
+    monkeypatch.setattr(actor_runner, "_run_and_read", run_and_read)
+    request = RunOptions(deadline=time.time() + 1, interactive=True, tenant="acme")
+    with use_run_options(request):
+        result = await execute_actor(apify, "actor", {}, "tiktok.hashtag")
+    await asyncio.gather(*actor_runner._refresh_tasks)
+
+    assert result.stale
+    [options] = seen
+    assert options.deadline is None and not options.interactive
+    assert options.tenant == "acme"
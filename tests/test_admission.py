@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config import get_settings
+from src.services.admission import QUEUE_PREFIX, AdmissionTimeout, admit, release_run
+from src.services.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT_SECONDS,
+)
+from src.services.run_options import RunOptions, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "apify_api_key", "token")
+    monkeypatch.setattr(settings, "apify_accounts", None)
+    monkeypatch.setattr(settings, "admission_actor_max_runs", 1)
+    monkeypatch.setattr(settings, "admission_queue_timeout_secs", 5.0)
+    monkeypatch.setattr(settings, "admission_poll_secs", 0.01)
+    return settings
+
+
+def _value(metric) -> float:
+    return metric._value.get()
+
+
+def _wait_count() -> float:
+    [sample] = [
+        s for s in ADMISSION_WAIT_SECONDS.labels(actor_id=ACTOR).collect()[0].samples
+        if s.name.endswith("_count")
+    ]
+    return sample.value
+
+
+async def test_start_gives_up_after_queue_timeout(settings, redis, monkeypatch):
+    monkeypatch.setattr(settings, "admission_queue_timeout_secs", 0.05)
+    rejected = _value(ADMISSION_REJECTED.labels(actor_id=ACTOR))
+    await admit(ACTOR, None)
+
+    with pytest.raises(AdmissionTimeout):
+        await admit(ACTOR, None)
+
+    assert _value(ADMISSION_REJECTED.labels(actor_id=ACTOR)) == rejected + 1
+    # The start that gave up left the queue
+    assert await redis.zcard(QUEUE_PREFIX + ACTOR) == 0
+
+
+async def test_request_deadline_caps_the_wait(redis):
+    await admit(ACTOR, None)
+
+    started = time.time()
+    with use_run_options(RunOptions(deadline=time.time() + 0.05)):
+        with pytest.raises(AdmissionTimeout):
+            await admit(ACTOR, None)
+
+    assert time.time() - started < 1
+
+
+async def test_queued_starts_are_admitted_in_order(redis):
+    holder = await admit(ACTOR, None)
+    admitted = []
+
+    async def start(name: str):
+        lease = await admit(ACTOR, None)
+        admitted.append(name)
+        return lease
+
+    first = asyncio.create_task(start("first"))
+    await asyncio.sleep(0.02)
+    second = asyncio.create_task(start("second"))
+    await asyncio.sleep(0.02)
+    assert admitted == []
+
+    await holder.release()
+    lease = await first
+    await asyncio.sleep(0.05)
+    assert admitted == ["first"]
+
+    await lease.release()
+    await (await second).release()
+    assert admitted == ["first", "second"]
+
+
+async def test_queue_depth_and_wait_are_reported(redis):
+    holder = await admit(ACTOR, None)
+    waits = _wait_count()
+
+    waiting = [asyncio.create_task(admit(ACTOR, None)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    assert _value(ADMISSION_QUEUE_DEPTH.labels(scope=ACTOR)) == 2
+    assert _value(ADMISSION_IN_FLIGHT.labels(scope=ACTOR)) == 1
+
+    await holder.release()
+    lease = await waiting[0]
+    await lease.release()
+    await (await waiting[1]).release()
+
+    # The first start did not wait; the other two did
+    assert _wait_count() == waits + 2
+
+
+async def test_finished_run_frees_its_slot(apify, redis):
+    lease = await admit(ACTOR, None)
+    run = await apify.actor(ACTOR).start({})
+    await lease.bind(run, 60)
+
+    await release_run(run)
+    await release_run(run)
+
+    await (await asyncio.wait_for(admit(ACTOR, None), 1)).release()
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.config import get_settings
+from src.services import apify_client
+from src.services.apify_client import ConnectionPool, close_apify_client, create_apify_client, init_apify_client
+from src.services.accounts import PooledApifyClient
+from src.services.metrics import APIFY_POOL_SIZE
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_long_polls_do_not_hold_the_pool():
+    pool = ConnectionPool("a", max_connections=1, max_long_polls=3, timeout_secs=0.1)
+    release = asyncio.Event()
+
+    async def call(**kwargs):
+        if kwargs.get("params", {}).get("waitForFinish"):
+            await release.wait()
+        return kwargs["method"]
+
+    pooled = pool.wrap(call)
+    polls = [asyncio.create_task(pooled(method="GET", params={"waitForFinish": 60})) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert await pooled(method="POST", params={}) == "POST"
+    release.set()
+    assert await asyncio.gather(*polls) == ["GET"] * 3
+
+
+async def test_long_polls_are_bounded_too():
+    pool = ConnectionPool("a", max_connections=1, max_long_polls=1, timeout_secs=0.05)
+    release = asyncio.Event()
+    sent = []
+
+    async def call(**kwargs):
+        sent.append(kwargs)
+        await release.wait()
+
+    pooled = pool.wrap(call)
+    polls = [asyncio.create_task(pooled(method="GET", params={"waitForFinish": 60})) for _ in range(2)]
+    await asyncio.sleep(0.1)
+
+    # The second long-poll waits past the request timeout for a free slot
+    assert len(sent) == 1
+    release.set()
+    await asyncio.gather(*polls)
+    assert len(sent) == 2
+
+
+async def test_other_calls_wait_for_a_free_connection():
+    pool = ConnectionPool("a", max_connections=1, max_long_polls=1, timeout_secs=0.05)
+    release = asyncio.Event()
+
+    async def call(**kwargs):
+        await release.wait()
+
+    pooled = pool.wrap(call)
+    first = asyncio.create_task(pooled(method="GET"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pooled(method="GET")
+    release.set()
+    await first
+
+
+async def test_pool_size_is_reported_per_account(monkeypatch):
+    monkeypatch.setattr(get_settings(), "apify_pool_max_connections", 7)
+    create_apify_client("token-a", "a")
+    create_apify_client("token-b", "b")
+
+    for account in ("a", "b"):
+        assert APIFY_POOL_SIZE.labels(account=account, kind="request")._value.get() == 7
+
+
+async def test_close_closes_every_account_client(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "apify_accounts", [{"name": "a", "token": "ta"}, {"name": "b", "token": "tb"}])
+    monkeypatch.setattr(apify_client, "_client", None)
+    closed = []
+
+    async def close(client):
+        closed.append(client)
+
+    monkeypatch.setattr(apify_client, "_close", close)
+    pool = init_apify_client()
+    assert isinstance(pool, PooledApifyClient)
+
+    await close_apify_client()
+
+    assert closed == [account.client for account in pool.accounts]
+    assert apify_client._client is None
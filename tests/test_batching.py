@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+from src.config import get_settings
+from src.services.batching import batch_call
+from src.services.entity_cache import EntitySpec, execute_actor_by_entity, first_field
+from src.services.run_options import RunOptions, get_run_options, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+OPERATION = "instagram.profile"
+SPEC = EntitySpec("usernames", entity_of=first_field("username"))
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "batching_enabled", True)
+    monkeypatch.setattr(settings, "batch_window_ms", 20)
+    monkeypatch.setattr(settings, "batch_max_size", 3)
+    monkeypatch.setattr(settings, "coalescing_enabled", False)
+    monkeypatch.setattr(settings, "run_reuse_enabled", False)
+    return settings
+
+
+class _Fetch:
+    """Records each batch fetched and the run options it was fetched under."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+        self.options: list[RunOptions] = []
+
+    async def __call__(self, entities: list[str]) -> list[str]:
+        self.batches.append(entities)
+        self.options.append(get_run_options())
+        return entities
+
+
+async def test_lookups_within_window_share_one_fetch():
+    fetch = _Fetch()
+
+    (first, shared), (second, _) = await asyncio.gather(
+        batch_call("k", ["a"], fetch, OPERATION),
+        batch_call("k", ["b", "a"], fetch, OPERATION),
+    )
+
+    assert fetch.batches == [["a", "b"]]
+    assert first == second == ["a", "b"]
+    assert shared
+
+
+async def test_lookups_after_window_are_fetched_apart():
+    fetch = _Fetch()
+
+    _, shared = await batch_call("k", ["a"], fetch, OPERATION)
+    await batch_call("k", ["b"], fetch, OPERATION)
+
+    assert fetch.batches == [["a"], ["b"]]
+    assert not shared
+
+
+async def test_full_batch_is_flushed_before_window():
+    fetch = _Fetch()
+
+    results = await asyncio.wait_for(asyncio.gather(
+        batch_call("k", ["a", "b"], fetch, OPERATION),
+        batch_call("k", ["c"], fetch, OPERATION),
+        # Would go past the max size, so it opens the next batch
+        batch_call("k", ["d"], fetch, OPERATION),
+    ), timeout=1)
+
+    assert fetch.batches == [["a", "b", "c"], ["d"]]
+    assert [shared for _, shared in results] == [True, True, False]
+
+
+async def test_lookup_of_max_size_is_fetched_directly():
+    fetch = _Fetch()
+    request = RunOptions(deadline=time.time() + 5, tenant="acme")
+
+    with use_run_options(request):
+        result, shared = await batch_call("k", ["a", "b", "c"], fetch, OPERATION)
+
+    assert result == ["a", "b", "c"] and not shared
+    assert fetch.options == [request]
+
+
+async def test_batch_runs_under_neutral_options():
+    fetch = _Fetch()
+
+    async def lookup(entity, tenant):
+        with use_run_options(RunOptions(deadline=time.time() + 5, interactive=True, tenant=tenant)):
+            return await batch_call("k", [entity], fetch, OPERATION)
+
+    await asyncio.gather(lookup("a", "acme"), lookup("b", "acme"))
+    await asyncio.gather(lookup("c", "acme"), lookup("d", "globex"))
+
+    assert fetch.options == [RunOptions(tenant="acme"), RunOptions()]
+
+
+async def test_batched_items_are_split_per_entity(apify, redis):
+    apify.items = [{"username": "natgeo", "n": 1}, {"username": "nasa", "n": 2}, {"username": "natgeo", "n": 3}]
+
+    natgeo, nasa = await asyncio.gather(
+        execute_actor_by_entity(apify, ACTOR, {"usernames": ["natgeo"]}, OPERATION, SPEC),
+        execute_actor_by_entity(apify, ACTOR, {"usernames": ["nasa"]}, OPERATION, SPEC),
+    )
+
+    [run] = apify.started
+    assert run["run_input"]["usernames"] == ["natgeo", "nasa"]
+    assert [item["n"] for item in natgeo.items] == [1, 3]
+    assert [item["n"] for item in nasa.items] == [2]
@@ -0,0 +1,86 @@
+import pytest
+
+from src.config import get_settings
+from src.services import budget
+from src.services.actor_runner import stream_actor
+from src.services.budget import BudgetExceeded, limits_for, reserve, settle
+from src.services.run_options import RunOptions, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+OPERATION = "tiktok.hashtag"
+INPUT = {"resultsPerPage": 10}
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "budget_platform_limits", {"tiktok": {"daily_usd": 1}})
+    monkeypatch.setattr(settings, "budget_tenant_limits", {})
+    monkeypatch.setattr(settings, "coalescing_enabled", False)
+    monkeypatch.setattr(settings, "run_reuse_enabled", False)
+
+    # 0.01 USD and 0.001 compute units per item asked for
+    async def unit_costs(operation):
+        return 0.01, 0.001
+
+    monkeypatch.setattr(budget, "unit_costs", unit_costs)
+    return settings
+
+
+async def _spent(redis) -> float:
+    [limit] = limits_for(OPERATION)
+    return float(await redis.hget(limit.key(budget.time.time()), "usd") or 0)
+
+
+async def test_estimate_is_settled_with_actual_cost(apify, redis):
+    reservation = await reserve(OPERATION, INPUT)
+    assert await _spent(redis) == pytest.approx(0.1)
+
+    run = await apify.actor(ACTOR).start(INPUT)
+    await reservation.bind(run)
+    run = apify.finish(run["id"], usageTotalUsd=0.3)
+    await settle(run)
+    await settle(run)
+
+    assert await _spent(redis) == pytest.approx(0.3)
+
+
+async def test_used_up_budget_refuses_runs(redis):
+    await reserve(OPERATION, {"resultsPerPage": 100})
+
+    with pytest.raises(BudgetExceeded):
+        await reserve(OPERATION, INPUT)
+
+    # The refused run's estimate is given back
+    assert await _spent(redis) == pytest.approx(1.0)
+
+
+async def test_requests_without_tenant_count_against_default(settings, monkeypatch):
+    monkeypatch.setattr(settings, "budget_platform_limits", {})
+    monkeypatch.setattr(settings, "budget_tenant_limits", {"*": {"daily_usd": 1}})
+
+    assert [limit.scope for limit in limits_for(OPERATION)] == ["tenant:default"]
+    with use_run_options(RunOptions(tenant="acme")):
+        assert [limit.scope for limit in limits_for(OPERATION)] == ["tenant:acme"]
+
+
+async def test_tight_budget_cuts_new_runs_only(apify, redis):
+    full = await stream_actor(apify, ACTOR, INPUT, OPERATION)
+    [item async for item in full.items]
+    await reserve(OPERATION, {"resultsPerPage": 85})
+
+    # Past the soft ratio: the cached result of the full input is still served
+    cached = await stream_actor(apify, ACTOR, INPUT, OPERATION)
+    assert cached.cached and not cached.partial
+    assert len(apify.started) == 1
+
+    # A new run is started with its item limit cut, and its result is not cached
+    cut = await stream_actor(apify, ACTOR, {"resultsPerPage": 8}, OPERATION)
+    [item async for item in cut.items]
+    assert cut.partial
+    assert apify.started[-1]["run_input"] == {"resultsPerPage": 4}
+
+    again = await stream_actor(apify, ACTOR, {"resultsPerPage": 8}, OPERATION)
+    assert not again.cached
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from src.config import get_settings
+from src.services import coalescing
+from src.services.actor_runner import stream_actor
+from src.services.coalescing import CoalescedRunError, coalesce_local, coalesce_remote
+from src.services.run_options import RunOptions, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "coalescing_enabled", True)
+    monkeypatch.setattr(settings, "coalesce_lock_ttl_secs", 5)
+    monkeypatch.setattr(settings, "dataset_tail_enabled", True)
+    monkeypatch.setattr(settings, "dataset_tail_poll_secs", 0)
+    return settings
+
+
+def _counting(run: dict, delay: float = 0.05):
+    calls = []
+
+    async def start_run():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return run
+
+    return calls, start_run
+
+
+async def test_followers_share_the_leaders_run(redis):
+    calls, start_run = _counting({"id": "run", "status": "SUCCEEDED", "defaultDatasetId": "ds", "extra": 1})
+
+    leader, follower = await asyncio.gather(
+        coalesce_remote("key", "actor", start_run),
+        coalesce_remote("key", "actor", start_run),
+    )
+
+    assert len(calls) == 1
+    assert leader["extra"] == 1
+    assert follower == {"id": "run", "status": "SUCCEEDED", "defaultDatasetId": "ds", "finishedAt": None}
+
+
+async def test_followers_get_the_leaders_error(redis):
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("actor broke")
+
+    leader, follower = await asyncio.gather(
+        coalesce_remote("key", "actor", failing),
+        coalesce_remote("key", "actor", failing),
+        return_exceptions=True,
+    )
+
+    assert isinstance(leader, ValueError)
+    assert isinstance(follower, CoalescedRunError)
+
+
+async def test_without_redis_every_caller_runs(no_redis):
+    calls, start_run = _counting({"id": "run"}, delay=0)
+
+    await asyncio.gather(coalesce_remote("key", "actor", start_run), coalesce_remote("key", "actor", start_run))
+
+    assert len(calls) == 2
+
+
+async def test_local_callers_share_one_call():
+    calls, start_run = _counting({"id": "run"})
+
+    runs = await asyncio.gather(*(coalesce_local("key", "actor", start_run) for _ in range(3)))
+
+    assert len(calls) == 1
+    assert runs == [{"id": "run"}] * 3
+
+
+@pytest.fixture
+def short_locks(settings, monkeypatch):
+    # fakeredis cannot run the Lua script that releases locks, so they have to expire
+    monkeypatch.setattr(settings, "coalesce_lock_ttl_secs", 0.1)
+
+
+async def _tail(apify, actor_input=None):
+    with use_run_options(RunOptions(tail=True, cache_bypass=True)):
+        return await stream_actor(apify, "actor", actor_input or {})
+
+
+async def test_tailed_calls_share_the_running_run(apify, redis, short_locks):
+    apify.start_status = "RUNNING"
+
+    first = await _tail(apify)
+    second = await _tail(apify)
+    other = await _tail(apify, {"q": 1})
+
+    assert [run["run_input"] for run in apify.started] == [{}, {"q": 1}]
+    assert second.run_id == first.run_id
+
+    apify.finish(first.run_id)
+    assert len([item async for item in first.items]) == 3
+    assert len([item async for item in second.items]) == 3
+    assert other.run_id != first.run_id
+
+    # Reported finished, the run is no longer handed out
+    third = await _tail(apify)
+    assert third.run_id not in (first.run_id, other.run_id)
+
+
+async def test_running_run_is_shared_across_processes(apify, redis, short_locks, monkeypatch):
+    apify.start_status = "RUNNING"
+    first = await _tail(apify)
+
+    # Another process only sees the run through Redis
+    monkeypatch.setattr(coalescing, "_running", {})
+    second = await _tail(apify)
+
+    assert len(apify.started) == 1
+    assert second.run_id == first.run_id
+
+
+async def test_run_that_finished_unreported_is_not_joined(apify, redis, short_locks):
+    apify.start_status = "RUNNING"
+    first = await _tail(apify)
+    apify.finish(first.run_id, "ABORTED")
+
+    second = await _tail(apify)
+
+    assert len(apify.started) == 2
+    assert second.run_id != first.run_id
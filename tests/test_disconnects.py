@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from src.config import get_settings
+from src.services import disconnects
+from src.services.disconnects import add_reader, release_reader
+from src.services.metrics import COMPUTE_UNITS_SAVED
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "abort_on_disconnect", True)
+    monkeypatch.setattr(disconnects, "_readers", {})
+    return settings
+
+
+async def _release(apify, run_id: str, finished: bool = False, reason: str = "disconnect") -> None:
+    release_reader(apify, run_id, finished, reason)
+    await asyncio.gather(*disconnects._abort_tasks)
+
+
+@pytest.mark.parametrize("store", ["redis", "no_redis"])
+async def test_run_is_aborted_when_its_last_reader_leaves(apify, store, request):
+    request.getfixturevalue(store)
+    apify.start_status = "RUNNING"
+    run = await apify.actor(ACTOR).start({})
+    await add_reader(run["id"])
+    await add_reader(run["id"])
+
+    await _release(apify, run["id"])
+    assert apify.aborted == []
+
+    await _release(apify, run["id"])
+    assert apify.aborted == [run["id"]]
+
+
+async def test_run_that_finished_is_not_aborted(apify, redis):
+    apify.start_status = "RUNNING"
+    run = await apify.actor(ACTOR).start({})
+    await add_reader(run["id"])
+
+    await _release(apify, run["id"], finished=True)
+
+    assert apify.aborted == []
+
+
+async def test_savings_are_counted_by_reason(apify, redis, monkeypatch):
+    async def abort_savings(run):
+        return "tiktok.hashtag", 1.5
+
+    monkeypatch.setattr(disconnects, "abort_savings", abort_savings)
+    deadline = COMPUTE_UNITS_SAVED.labels(operation="tiktok.hashtag", reason="deadline")
+    disconnect = COMPUTE_UNITS_SAVED.labels(operation="tiktok.hashtag", reason="disconnect")
+    before = deadline._value.get(), disconnect._value.get()
+    apify.start_status = "RUNNING"
+    run = await apify.actor(ACTOR).start({})
+    await add_reader(run["id"])
+
+    await _release(apify, run["id"], reason="deadline")
+
+    assert apify.aborted == [run["id"]]
+    assert (deadline._value.get(), disconnect._value.get()) == (before[0] + 1.5, before[1])
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.config import get_settings
+from src.services import entity_cache
+from src.services.actor_runner import ActorRunResult
+from src.services.cache import CACHE_PREFIX
+from src.services.entity_cache import EntitySpec, entity_key, execute_actor_by_entity, first_field
+from src.services.run_options import RunOptions, get_run_options, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+OPERATION = "instagram.profile"
+SPEC = EntitySpec("usernames", entity_of=first_field("username"))
+
+
+async def test_stale_entities_are_refreshed_under_neutral_options(apify, redis, monkeypatch):
+    actor_input = {"usernames": ["natgeo"]}
+    entry = {"run_id": "old", "dataset_id": "ds", "items": [], "ttl": 1, "cached_at": time.time() - 10}
+    await redis.set(CACHE_PREFIX + entity_key(ACTOR, actor_input, SPEC, "natgeo"), json.dumps(entry))
+    seen = []
+
+    async def fetch(client, actor_id, actor_input, operation, spec, entities):
+        seen.append(get_run_options())
+        return ActorRunResult(run_id="new", dataset_id="ds"), {}, []
+
+    monkeypatch.setattr(entity_cache, "_fetch", fetch)
+    request = RunOptions(deadline=time.time() + 1, interactive=True, tenant="acme")
+    with use_run_options(request):
+        result = await execute_actor_by_entity(apify, ACTOR, actor_input, OPERATION, SPEC)
+    await asyncio.gather(*entity_cache._refresh_tasks)
+
+    assert result.stale
+    [options] = seen
+    assert options.deadline is None and not options.interactive
+    assert options.cache_bypass and options.tenant == "acme"
+
+
+async def test_cached_entities_are_composed_with_fetched_ones(apify, redis, monkeypatch):
+    monkeypatch.setattr(get_settings(), "coalescing_enabled", False)
+    apify.items = [{"username": "natgeo", "n": 1}]
+    await execute_actor_by_entity(apify, ACTOR, {"usernames": ["natgeo"]}, OPERATION, SPEC)
+
+    apify.items = [{"username": "nasa", "n": 2}, {"username": "esa", "n": 3}]
+    result = await execute_actor_by_entity(
+        apify, ACTOR, {"usernames": ["esa", "NatGeo", "nasa"]}, OPERATION, SPEC
+    )
+
+    # The cached entity is served in its request position; the rest share one run
+    assert [run["run_input"]["usernames"] for run in apify.started] == [["natgeo"], ["esa", "nasa"]]
+    assert [item["n"] for item in result.items] == [3, 1, 2]
+    assert not result.cached
+
+
+async def test_entities_are_deduplicated_by_normalized_form(apify, redis, monkeypatch):
+    monkeypatch.setattr(get_settings(), "coalescing_enabled", False)
+    apify.items = [{"username": "natgeo", "n": 1}]
+
+    result = await execute_actor_by_entity(
+        apify, ACTOR, {"usernames": ["NatGeo", "natgeo"]}, OPERATION, SPEC
+    )
+
+    [run] = apify.started
+    assert run["run_input"]["usernames"] == ["NatGeo"]
+    assert [item["n"] for item in result.items] == [1]
+
+
+async def test_batches_are_keyed_by_per_entity_limits(apify, redis, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "coalescing_enabled", False)
+    monkeypatch.setattr(settings, "batching_enabled", True)
+    spec = EntitySpec("usernames", entity_of=first_field("username"), per_entity_limits=("maxItems",))
+
+    await asyncio.gather(
+        execute_actor_by_entity(apify, ACTOR, {"usernames": ["natgeo"], "maxItems": 5}, OPERATION, spec),
+        execute_actor_by_entity(apify, ACTOR, {"usernames": ["nasa"], "maxItems": 50}, OPERATION, spec),
+    )
+
+    assert sorted(run["run_input"]["maxItems"] for run in apify.started) == [5, 50]
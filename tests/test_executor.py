@@ -0,0 +1,35 @@
+import pytest
+
+from src.services.cache import set_cached
+from src.services.executor import ActorExecutor, fan_out, instrument
+from src.services.projection import Projection
+from src.services.run_keys import run_key
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+
+
+async def _cache(items):
+    await set_cached(Projection().cache_key(run_key(ACTOR, {})), {
+        "run_id": "cached-run", "dataset_id": "ds", "items": items,
+    }, 60)
+
+
+async def test_cached_result_is_served_by_the_chain(apify, redis):
+    await _cache([{"n": "cached"}])
+
+    result = await ActorExecutor("tiktok").collect(apify, ACTOR, {}, "hashtag")
+
+    assert result.cached and result.items == [{"n": "cached"}]
+    assert apify.started == []
+
+
+async def test_cache_lookup_can_be_left_out(apify, redis):
+    await _cache([{"n": "cached"}])
+    executor = ActorExecutor("tiktok", middleware=(instrument, fan_out))
+
+    result = await executor.collect(apify, ACTOR, {}, "hashtag")
+
+    assert not result.cached and len(result.items) == 3
+    assert len(apify.started) == 1
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from src.config import get_settings
+from src.services import actor_runner, hedging
+from src.services.actor_runner import _wait_hedged
+from src.services.hedging import hedge_delay
+from src.services.run_options import RunOptions, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+OPERATION = "tiktok.hashtag"
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "hedging_operations", ["tiktok"])
+    monkeypatch.setattr(settings, "run_sizing_min_samples", 3)
+    return settings
+
+
+@pytest.fixture
+def hedge_soon(monkeypatch):
+    """Hedge every run after 10ms, within budget."""
+    async def delay(actor_id, operation, actor_input):
+        return 0.01
+
+    async def take(operation):
+        return True
+
+    monkeypatch.setattr(actor_runner, "hedge_delay", delay)
+    monkeypatch.setattr(actor_runner, "take_hedge", take)
+
+
+async def _finish_when_started(apify, run_id: str) -> None:
+    while run_id not in apify.runs:
+        await asyncio.sleep(0.01)
+    apify.finish(run_id)
+
+
+async def _drain_aborts() -> None:
+    await asyncio.sleep(0.05)
+
+
+async def test_delay_is_the_p90_of_similar_runs(monkeypatch):
+    async def durations(actor_id, operation, actor_input):
+        return [float(n) for n in range(10, 0, -1)]
+
+    monkeypatch.setattr(hedging, "run_durations", durations)
+
+    with use_run_options(RunOptions(interactive=True)):
+        assert await hedge_delay(ACTOR, OPERATION, {}) == 9.0
+        assert await hedge_delay(ACTOR, "youtube.channel", {}) is None
+    # Jobs are not hedged
+    assert await hedge_delay(ACTOR, OPERATION, {}) is None
+
+
+async def test_no_delay_without_enough_history(monkeypatch):
+    async def durations(actor_id, operation, actor_input):
+        return [1.0, 2.0]
+
+    monkeypatch.setattr(hedging, "run_durations", durations)
+
+    with use_run_options(RunOptions(interactive=True)):
+        assert await hedge_delay(ACTOR, OPERATION, {}) is None
+
+
+async def test_hedge_wins_and_slow_run_is_aborted(apify, redis, hedge_soon):
+    apify.start_status = "RUNNING"
+    slow = await apify.actor(ACTOR).start({})
+    runs = [slow]
+
+    run, _ = await asyncio.gather(
+        _wait_hedged(apify, runs, ACTOR, {}, OPERATION),
+        _finish_when_started(apify, "run1"),
+    )
+    await _drain_aborts()
+
+    assert run["id"] == "run1"
+    assert [r["id"] for r in runs] == ["run0", "run1"]
+    assert apify.aborted == ["run0"]
+
+
+async def test_first_run_wins_and_hedge_is_aborted(apify, redis, hedge_soon):
+    apify.start_status = "RUNNING"
+    first = await apify.actor(ACTOR).start({})
+
+    async def finish_first():
+        while len(apify.started) < 2:
+            await asyncio.sleep(0.01)
+        apify.finish("run0")
+
+    run, _ = await asyncio.gather(
+        _wait_hedged(apify, [first], ACTOR, {}, OPERATION),
+        finish_first(),
+    )
+    await _drain_aborts()
+
+    assert run["id"] == "run0"
+    assert apify.aborted == ["run1"]
+
+
+async def test_hedge_waiting_for_admission_is_dropped(apify, redis, hedge_soon, monkeypatch):
+    admitting = asyncio.Event()
+
+    async def admit(actor_id, memory_mbytes, account=None):
+        admitting.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(actor_runner, "admit", admit)
+    apify.start_status = "RUNNING"
+    first = await apify.actor(ACTOR).start({})
+
+    async def finish_first():
+        await admitting.wait()
+        apify.finish("run0")
+
+    run, _ = await asyncio.wait_for(
+        asyncio.gather(_wait_hedged(apify, [first], ACTOR, {}, OPERATION), finish_first()),
+        timeout=1,
+    )
+
+    assert run["id"] == "run0"
+    assert len(apify.started) == 1
+    assert apify.aborted == []
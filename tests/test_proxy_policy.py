@@ -0,0 +1,71 @@
+import pytest
+
+from src.config import get_settings
+from src.services.proxy_policy import choose_proxy, record_proxy_outcome, remember_proxy
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+OPERATION = "instagram.profile"
+INPUT = {"username": "natgeo", "proxy": {"useApifyProxy": True}}
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "proxy_policy_enabled", True)
+    monkeypatch.setattr(settings, "proxy_groups", ["AUTO", "RESIDENTIAL"])
+    monkeypatch.setattr(settings, "proxy_group_overrides", {})
+    monkeypatch.setattr(settings, "proxy_min_samples", 3)
+    monkeypatch.setattr(settings, "proxy_min_success_rate", 0.8)
+    monkeypatch.setattr(settings, "proxy_max_p90_secs", 0.0)
+    monkeypatch.setattr(settings, "proxy_probe_ratio", 0.0)
+    return settings
+
+
+async def _run(apify, status: str) -> dict:
+    """Start a run on the chosen group and report it finished with ``status``."""
+    run_input, group = await choose_proxy(ACTOR, OPERATION, INPUT)
+    run = await apify.actor(ACTOR).start(run_input)
+    await remember_proxy(run, ACTOR, OPERATION, group)
+    await record_proxy_outcome(apify.finish(run["id"], status))
+    return run_input
+
+
+async def test_failing_runs_escalate(apify, redis):
+    for _ in range(3):
+        assert "apifyProxyGroups" not in (await _run(apify, "FAILED"))["proxy"]
+
+    run_input, group = await choose_proxy(ACTOR, OPERATION, INPUT)
+
+    assert group == "RESIDENTIAL"
+    assert run_input["proxy"]["apifyProxyGroups"] == ["RESIDENTIAL"]
+
+
+async def test_aborted_runs_do_not_escalate(apify, redis):
+    for _ in range(3):
+        await _run(apify, "ABORTED")
+
+    _, group = await choose_proxy(ACTOR, OPERATION, INPUT)
+
+    assert group == "AUTO"
+
+
+async def test_good_probes_demote(apify, redis, settings, monkeypatch):
+    for _ in range(3):
+        await _run(apify, "FAILED")
+
+    # Every run probes the group below, and succeeds there
+    monkeypatch.setattr(settings, "proxy_probe_ratio", 1.0)
+    for _ in range(3):
+        assert "apifyProxyGroups" not in (await _run(apify, "SUCCEEDED"))["proxy"]
+
+    monkeypatch.setattr(settings, "proxy_probe_ratio", 0.0)
+    _, group = await choose_proxy(ACTOR, OPERATION, INPUT)
+    assert group == "AUTO"
+
+
+async def test_inputs_without_apify_proxy_are_kept(redis):
+    actor_input = {"username": "natgeo"}
+
+    assert await choose_proxy(ACTOR, OPERATION, actor_input) == (actor_input, None)
@@ -0,0 +1,41 @@
+import httpx
+import pytest
+
+from src.config import get_settings
+from src.main import app
+from src.services.apify_client import get_apify_client
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def api(apify, redis, monkeypatch):
+    monkeypatch.setattr(get_settings(), "coalescing_enabled", False)
+    app.dependency_overrides[get_apify_client] = lambda: apify
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/tiktok/hashtag/cats",
+    "/api/v1/instagram/profile/someone",
+    "/api/v1/pinterest/search?q=cats",
+])
+async def test_platform_routes_stream_a_scrape_response(api, path):
+    async with api:
+        response = await api.get(path)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["totalResults"] == 3
+    assert body["runId"] == "run0"
+
+
+async def test_platform_routes_stream_ndjson(api):
+    async with api:
+        response = await api.get("/api/v1/tiktok/hashtag/cats?stream=ndjson")
+
+    lines = response.text.splitlines()
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(lines) == 4
@@ -0,0 +1,56 @@
+import pytest
+
+from src.config import get_settings
+from src.services.run_costs import record_run_cost, record_run_items, remember_cost, run_stats, unit_costs
+from src.services import run_costs
+from src.services.run_options import RunOptions, use_run_options
+
+pytestmark = pytest.mark.anyio
+
+
+async def _finished_run(apify, tenant=None, interactive=True, usd=0.2):
+    run = await apify.actor("actor").start({})
+    with use_run_options(RunOptions(tenant=tenant, interactive=interactive)):
+        await remember_cost(run, "actor", "tiktok.hashtag", {"resultsPerPage": 10})
+    run = apify.finish(run["id"], usageTotalUsd=usd, stats={"computeUnits": 0.1, "runTimeSecs": 20})
+    await record_run_cost(run)
+    await record_run_items(run, 10)
+    return run
+
+
+async def test_cost_is_recorded_once(apify, redis):
+    run = await _finished_run(apify)
+    await record_run_cost(run)
+
+    [stats] = await run_stats()
+    assert stats["runs"] == 1
+    assert stats["usd"] == pytest.approx(0.2)
+    assert stats["usd_per_item"] == pytest.approx(0.02)
+
+
+async def test_stats_split_by_tenant_and_caller(apify, redis):
+    await _finished_run(apify, tenant="acme")
+    await _finished_run(apify, tenant="acme", interactive=False)
+    await _finished_run(apify, tenant="other", usd=0.4)
+
+    [total] = await run_stats()
+    assert total["runs"] == 3 and total["tenant"] is None
+
+    by_tenant = {s["tenant"]: s for s in await run_stats(by_tenant=True)}
+    assert by_tenant["acme"]["runs"] == 2
+    assert by_tenant["other"]["usd"] == pytest.approx(0.4)
+
+    split = {(s["tenant"], s["caller"]) for s in await run_stats(by_caller=True, by_tenant=True)}
+    assert split == {("acme", "api"), ("acme", "job"), ("other", "api")}
+
+
+async def test_unit_costs_sum_every_tenant(apify, redis, monkeypatch):
+    monkeypatch.setattr(run_costs, "_unit_costs", {})
+    monkeypatch.setattr(get_settings(), "run_sizing_min_samples", 3)
+    for tenant in ("acme", None, "other"):
+        await _finished_run(apify, tenant=tenant)
+
+    usd, cu = await unit_costs("tiktok.hashtag")
+
+    assert usd == pytest.approx(0.2 / 10)
+    assert cu == pytest.approx(0.1 / 10)
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from src.config import get_settings
+from src.services import run_index
+from src.services.metrics import ACTOR_RUNS_REUSED
+from src.services.run_index import find_recent_run, record_run
+from src.services.run_keys import run_key
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+INPUT = {"resultsPerPage": 10}
+RUN = {"id": "listed-run", "defaultDatasetId": "ds"}
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "run_reuse_enabled", True)
+    monkeypatch.setattr(settings, "run_reuse_list_recent", True)
+    return settings
+
+
+async def test_runs_are_listed_off_the_request_path(apify, redis, monkeypatch):
+    listing = asyncio.Event()
+
+    async def index_recent_runs(client, actor_id):
+        await listing.wait()
+        await record_run(run_key(actor_id, INPUT), RUN, listed=True)
+
+    monkeypatch.setattr(run_index, "index_recent_runs", index_recent_runs)
+    reused = ACTOR_RUNS_REUSED.labels(actor_id=ACTOR, source="listed")
+    before = reused._value.get()
+
+    # The miss does not wait for the listing
+    assert await asyncio.wait_for(find_recent_run(apify, ACTOR, INPUT, 60), 0.5) is None
+
+    listing.set()
+    await asyncio.gather(*run_index._sync_tasks)
+    run = await find_recent_run(apify, ACTOR, INPUT, 60)
+
+    assert run["id"] == "listed-run" and "listed" not in run
+    assert reused._value.get() == before + 1
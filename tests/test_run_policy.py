@@ -0,0 +1,150 @@
+import pytest
+
+from src.config import get_settings
+from src.services.actor_runner import RunFailed, run_finished, stream_actor
+from src.services.executor import ActorExecutor
+from src.services.run_options import RunOptions, use_run_options
+from src.services.run_policy import (
+    FAILURES_PREFIX,
+    OPEN_PREFIX,
+    PROBE_PREFIX,
+    TRIAL_PREFIX,
+    CircuitOpen,
+    check_circuit,
+    record_failure,
+    record_outcome,
+    remember_run,
+)
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "breaker_failure_threshold", 2)
+    monkeypatch.setattr(settings, "run_retry_base_delay_secs", 0)
+    monkeypatch.setattr(settings, "run_retry_max_delay_secs", 0)
+    monkeypatch.setattr(settings, "dataset_tail_poll_secs", 0)
+    monkeypatch.setattr(settings, "coalescing_enabled", False)
+    monkeypatch.setattr(settings, "run_reuse_enabled", False)
+    return settings
+
+
+async def _half_open(redis):
+    """Open the circuit and let its cooldown pass."""
+    await record_failure(ACTOR)
+    await record_failure(ACTOR)
+    await redis.delete(OPEN_PREFIX + ACTOR)
+
+
+async def _finish_probe(apify, status: str) -> None:
+    run = await apify.actor(ACTOR).start({})
+    await remember_run(run, ACTOR, None, probe=True)
+    await record_outcome(apify.finish(run["id"], status))
+
+
+async def test_circuit_opens_past_threshold(redis):
+    await record_failure(ACTOR)
+    assert not await check_circuit(ACTOR)
+
+    await record_failure(ACTOR)
+    with pytest.raises(CircuitOpen):
+        await check_circuit(ACTOR)
+
+
+async def test_half_open_circuit_lets_one_probe_through(redis):
+    await _half_open(redis)
+
+    assert await check_circuit(ACTOR)
+    with pytest.raises(CircuitOpen):
+        await check_circuit(ACTOR)
+
+
+async def test_succeeded_probe_closes_circuit(apify, redis):
+    await _half_open(redis)
+    await check_circuit(ACTOR)
+
+    await _finish_probe(apify, "SUCCEEDED")
+
+    assert not await redis.exists(TRIAL_PREFIX + ACTOR, PROBE_PREFIX + ACTOR, FAILURES_PREFIX + ACTOR)
+    assert not await check_circuit(ACTOR)
+
+
+async def test_failed_probe_opens_circuit_again(apify, redis):
+    await _half_open(redis)
+    await check_circuit(ACTOR)
+
+    await _finish_probe(apify, "FAILED")
+
+    with pytest.raises(CircuitOpen):
+        await check_circuit(ACTOR)
+    assert await redis.exists(OPEN_PREFIX + ACTOR)
+
+
+async def test_aborted_probe_frees_the_probe(apify, redis):
+    await _half_open(redis)
+    await check_circuit(ACTOR)
+
+    await _finish_probe(apify, "ABORTED")
+
+    assert await check_circuit(ACTOR)
+
+
+async def test_outcome_is_reported_once(apify, redis):
+    run = await apify.actor(ACTOR).start({})
+    await remember_run(run, ACTOR, None, probe=False)
+    run = apify.finish(run["id"], "FAILED")
+
+    await run_finished(run)
+    await run_finished(run)
+
+    assert int(await redis.get(FAILURES_PREFIX + ACTOR)) == 1
+
+
+async def test_tailed_run_reports_its_outcome(apify, redis):
+    apify.start_status = "FAILED"
+    with use_run_options(RunOptions(tail=True, interactive=True)):
+        stream = await stream_actor(apify, ACTOR, {})
+        with pytest.raises(RunFailed):
+            [item async for item in stream.items]
+
+    assert int(await redis.get(FAILURES_PREFIX + ACTOR)) == 1
+
+
+async def test_job_retries_a_failed_tailed_run(apify, redis):
+    apify.start_statuses = ["FAILED"]
+    executor = ActorExecutor(None)
+
+    with use_run_options(RunOptions(tail=True)):
+        result = await executor.collect(apify, ACTOR, {}, "test.op")
+
+    assert len(apify.started) == 2
+    assert result.run_id == "run1"
+    assert len(result.items) == 3
+
+
+async def test_stream_that_sent_items_is_not_retried(apify, redis):
+    apify.start_status = "FAILED"
+    with use_run_options(RunOptions(tail=True, interactive=True)):
+        stream = await stream_actor(apify, ACTOR, {})
+        items = []
+        with pytest.raises(RunFailed):
+            async for item in stream.items:
+                items.append(item)
+
+    assert len(apify.started) == 1
+    assert len(items) == 3
+
+
+async def test_stream_without_items_is_retried(apify, redis):
+    apify.start_statuses = ["FAILED"]
+    apify.items = []
+    with use_run_options(RunOptions(tail=True, interactive=True)):
+        stream = await stream_actor(apify, ACTOR, {})
+        [item async for item in stream.items]
+
+    assert len(apify.started) == 2
+    assert stream.run_id == "run1"
@@ -0,0 +1,88 @@
+import pytest
+
+from src.config import get_settings
+from src.services import sharding
+from src.services.actor_runner import ActorRunResult
+from src.services.entity_cache import EntitySpec
+from src.services.sharding import dedupe_items, execute_sharded, merge_results, split_entities
+
+pytestmark = pytest.mark.anyio
+
+ACTOR = "someone/actor"
+OPERATION = "instagram.profile"
+SPEC = EntitySpec("usernames")
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "sharding_enabled", True)
+    monkeypatch.setattr(settings, "shard_size", 2)
+    monkeypatch.setattr(settings, "shard_size_overrides", {})
+    monkeypatch.setattr(settings, "coalescing_enabled", False)
+    monkeypatch.setattr(settings, "run_reuse_enabled", False)
+    return settings
+
+
+def _result(*items: dict) -> ActorRunResult:
+    return ActorRunResult(run_id="run", dataset_id="ds", items=list(items))
+
+
+async def test_entities_are_split_into_shards(settings, monkeypatch):
+    assert split_entities(list("abcde"), OPERATION) == [["a", "b"], ["c", "d"], ["e"]]
+    assert split_entities(list("ab"), OPERATION) == [["a", "b"]]
+
+    monkeypatch.setattr(settings, "shard_size_overrides", {"profile": 3})
+    assert split_entities(list("abcde"), OPERATION) == [["a", "b", "c"], ["d", "e"]]
+
+    monkeypatch.setattr(settings, "sharding_enabled", False)
+    assert split_entities(list("abcde"), OPERATION) == [list("abcde")]
+
+
+async def test_duplicate_items_are_dropped():
+    items = [{"id": 1, "n": 1}, {"url": "u"}, {"id": 1, "n": 2}, {"x": 1}, {"url": "u"}, {"x": 1}]
+
+    assert dedupe_items(items) == [{"id": 1, "n": 1}, {"url": "u"}, {"x": 1}]
+
+
+async def test_shard_results_are_merged_in_order():
+    merged = merge_results([_result({"id": 1}, {"id": 2}), _result({"id": 2}, {"id": 3})])
+
+    assert [item["id"] for item in merged.items] == [1, 2, 3]
+    assert not merged.partial
+
+
+async def test_failed_shards_leave_a_partial_result():
+    merged = merge_results([_result({"id": 1}), RuntimeError("boom"), _result({"id": 3})])
+
+    assert [item["id"] for item in merged.items] == [1, 3]
+    assert merged.partial
+
+    with pytest.raises(RuntimeError, match="boom"):
+        merge_results([RuntimeError("boom"), RuntimeError("again")])
+
+
+async def test_sharded_input_runs_each_shard(apify, redis):
+    actor_input = {"usernames": ["a", "b", "c", "a", "d", "e"], "maxItems": 1}
+
+    result = await execute_sharded(apify, ACTOR, actor_input, OPERATION, SPEC)
+
+    # Repeated entities are asked for once
+    assert [run["run_input"]["usernames"] for run in apify.started] == [["a", "b"], ["c", "d"], ["e"]]
+    # Every shard's dataset has the same items, so they are kept once
+    assert result.items == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert not result.partial
+
+
+async def test_failed_shard_is_left_out(apify, redis, monkeypatch):
+    async def execute_actor(client, actor_id, actor_input, operation, use_cache, projection):
+        if "c" in actor_input["usernames"]:
+            raise RuntimeError("shard failed")
+        return _result(*[{"id": u} for u in actor_input["usernames"]])
+
+    monkeypatch.setattr(sharding, "execute_actor", execute_actor)
+
+    result = await execute_sharded(apify, ACTOR, {"usernames": list("abcde")}, OPERATION, SPEC)
+
+    assert [item["id"] for item in result.items] == ["a", "b", "e"]
+    assert result.partial
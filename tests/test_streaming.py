@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from src.services.actor_runner import ActorRunStream
+from src.services.streaming import _json_body, _ndjson_body
+
+pytestmark = pytest.mark.anyio
+
+
+async def _items(count: int, fail: bool = False):
+    for n in range(count):
+        yield {"n": n}
+    if fail:
+        raise RuntimeError("dataset gone")
+
+
+async def _body(chunks) -> str:
+    return "".join([chunk async for chunk in chunks])
+
+
+async def test_json_body_is_a_scrape_response():
+    stream = ActorRunStream(run_id="run", dataset_id="ds", items=_items(3))
+
+    body = json.loads(await _body(_json_body(stream)))
+
+    assert body["success"] is True
+    assert body["data"] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert body["totalResults"] == 3
+    assert body["runId"] == "run"
+
+
+async def test_json_body_reports_a_failure_after_the_items():
+    stream = ActorRunStream(run_id="run", dataset_id="ds", items=_items(2, fail=True))
+
+    body = json.loads(await _body(_json_body(stream)))
+
+    assert body["success"] is False
+    assert body["error"] == "dataset gone"
+    assert body["totalResults"] == 2
+    assert len(body["data"]) == 2
+
+
+async def test_ndjson_trailer_reports_a_failure():
+    stream = ActorRunStream(run_id="run", dataset_id="ds", items=_items(1, fail=True))
+
+    lines = (await _body(_ndjson_body(stream))).splitlines()
+
+    assert json.loads(lines[0]) == {"n": 0}
+    assert json.loads(lines[-1])["_trailer"]["success"] is False
@@ -0,0 +1,70 @@
+"""Celery tasks, called in-process on the worker loop."""
+
+import pytest
+
+from src.services import webhooks
+from src.services.webhooks import handle_webhook, park_job
+from src.worker import tasks
+from src.worker.celery_app import celery_app, run_async
+
+
+class FakeBackend:
+    def __init__(self):
+        self.done: dict[str, dict] = {}
+        self.failed: dict[str, Exception] = {}
+
+    def mark_as_done(self, job_id, result):
+        self.done[job_id] = result
+
+    def mark_as_failure(self, job_id, error):
+        self.failed[job_id] = error
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(celery_app, "_backend_cache", backend)
+    return backend
+
+
+@pytest.fixture
+def resumes(apify, monkeypatch):
+    """Runs the webhook enqueued ``jobs.resume_parked`` for."""
+    resumes = []
+    monkeypatch.setattr(tasks, "get_apify_client", lambda: apify)
+    monkeypatch.setattr(webhooks, "_enqueue_resume", resumes.append)
+    return resumes
+
+
+def test_parked_job_resumes_from_webhook(apify, redis, backend, resumes):
+    apify.start_status = "RUNNING"
+    run = run_async(apify.actor("actor").start({}))
+    job = {"job_id": "job1", "actor_id": "actor", "actor_input": {}, "operation": "tiktok.hashtag"}
+    assert run_async(park_job(run, job))
+
+    # Still going: the webhook is ignored and the job stays parked
+    assert not run_async(handle_webhook(apify, {"resource": run}))
+    assert resumes == []
+
+    apify.finish(run["id"])
+    assert run_async(handle_webhook(apify, {"resource": run}))
+    [finished] = resumes
+    tasks.resume_parked_jobs(finished)
+
+    result = backend.done["job1"]
+    assert result["run_id"] == run["id"]
+    assert result["total_results"] == 3
+
+
+def test_job_of_failed_run_fails_when_out_of_attempts(apify, redis, backend, resumes):
+    apify.start_status = "RUNNING"
+    run = run_async(apify.actor("actor").start({}))
+    job = {"job_id": "job1", "actor_id": "actor", "actor_input": {}, "operation": "tiktok.hashtag"}
+    run_async(park_job(run, job))
+
+    apify.finish(run["id"], "ABORTED")
+    run_async(handle_webhook(apify, {"resource": run}))
+    tasks.resume_parked_jobs(resumes[0])
+
+    assert "job1" in backend.failed
+    assert backend.done == {}
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from src.config import get_settings
+from src.services import webhooks
+from src.services.webhooks import DONE_PREFIX, check_webhook_settings, handle_webhook, verify_token
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "webhook_completion_enabled", True)
+    monkeypatch.setattr(settings, "webhook_secret", "s3cr3t")
+    return settings
+
+
+def test_token_is_checked_against_secret(settings):
+    assert verify_token("s3cr3t")
+    assert not verify_token("wrong")
+    assert not verify_token(None)
+
+
+def test_no_token_is_valid_without_secret(settings, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_secret", None)
+    assert not verify_token(None)
+    assert not verify_token("anything")
+
+
+def test_webhook_mode_requires_secret(settings, monkeypatch):
+    check_webhook_settings()
+    monkeypatch.setattr(settings, "webhook_secret", None)
+    with pytest.raises(RuntimeError):
+        check_webhook_settings()
+    monkeypatch.setattr(settings, "webhook_completion_enabled", False)
+    check_webhook_settings()
+
+
+async def test_finished_run_is_fetched_from_apify(apify, redis):
+    run = await apify.actor("actor").start({})
+    apify.finish(run["id"], "SUCCEEDED", usageTotalUsd=0.5)
+    forged = {"id": run["id"], "status": "SUCCEEDED", "defaultDatasetId": "forged", "usageTotalUsd": -100}
+
+    assert await handle_webhook(apify, {"resource": forged})
+
+    done = json.loads(await redis.get(DONE_PREFIX + run["id"]))
+    assert done["defaultDatasetId"] == run["defaultDatasetId"]
+    assert done["usageTotalUsd"] == 0.5
+
+
+async def test_payload_status_is_not_trusted(apify, redis):
+    apify.start_status = "RUNNING"
+    run = await apify.actor("actor").start({})
+
+    assert not await handle_webhook(apify, {"resource": {**run, "status": "SUCCEEDED"}})
+    assert await redis.get(DONE_PREFIX + run["id"]) is None
+
+
+async def test_unknown_run_is_ignored(apify, redis):
+    assert not await handle_webhook(apify, {"eventData": {"actorRunId": "forged"}})
+
+
+async def test_run_id_is_required(apify, redis):
+    with pytest.raises(ValueError):
+        await handle_webhook(apify, {"resource": {"status": "SUCCEEDED"}})
+
+
+async def test_waiters_get_the_fetched_run(apify, redis):
+    run = await apify.actor("actor").start({})
+    apify.finish(run["id"])
+    future = asyncio.get_running_loop().create_future()
+    webhooks._waiters[run["id"]] = future
+
+    await handle_webhook(apify, {"eventData": {"actorRunId": run["id"]}, "resource": {"defaultDatasetId": "x"}})
+
+    assert future.result()["defaultDatasetId"] == run["defaultDatasetId"]